@@ -5,6 +5,7 @@ import yaml
 from django.apps import AppConfig
 
 from api_fhir_r4.configurations import ModuleConfiguration
+from api_fhir_r4.configurations.configurationSnapshot import ConfigurationSnapshot
 from api_fhir_r4.defaultConfig import DEFAULT_CFG
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,8 @@ class ApiFhirConfig(AppConfig):
         from core.models import ModuleConfiguration
         cfg = ModuleConfiguration.get_or_default(MODULE_NAME, DEFAULT_CFG)
         self.__configure_module(cfg)
+        self.__connect_configuration_reload()
+        self.__connect_resource_cache_invalidation()
         setup_yaml()
 
         from openIMIS.ExceptionHandlerRegistry import ExceptionHandlerRegistry
@@ -26,9 +29,34 @@ class ApiFhirConfig(AppConfig):
         ExceptionHandlerRegistry.register_exception_handler(MODULE_NAME, fhir_api_exception_handler)
 
     def __configure_module(self, cfg):
-        ModuleConfiguration.build_configuration(cfg)
+        # Configuration was just read from database, it is the version other processes may have published
+        ModuleConfiguration.build_configuration(cfg, version=ConfigurationSnapshot.get_published_version())
         logger.info(F'Module {MODULE_NAME} configured successfully')
 
+    def __connect_configuration_reload(self):
+        from django.db import transaction
+        from django.db.models.signals import post_save
+        from core.models import ModuleConfiguration as CoreModuleConfiguration
+
+        def on_module_configuration_saved(sender, instance, **kwargs):
+            if instance.module == MODULE_NAME:
+                transaction.on_commit(ModuleConfiguration.reload_configuration)
+
+        post_save.connect(on_module_configuration_saved, sender=CoreModuleConfiguration, weak=False,
+                          dispatch_uid='api_fhir_r4_configuration_reload')
+
+    def __connect_resource_cache_invalidation(self):
+        from api_fhir_r4.resource_cache import rendered_resource_cache
+        from api_fhir_r4.serializers import BaseFHIRSerializer
+
+        serializer_classes = []
+        pending = [BaseFHIRSerializer]
+        while pending:
+            subclasses = pending.pop().__subclasses__()
+            serializer_classes.extend(subclasses)
+            pending.extend(subclasses)
+        rendered_resource_cache.connect_serializers(serializer_classes)
+
 
 def setup_yaml():
     def represent_ordered_dict(dumper, data):
@@ -0,0 +1,71 @@
+import datetime
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+# Fields holding time of the last change of the record, HistoryModel and VersionedModel respectively
+VERSION_FIELDS = ('date_updated', 'validity_from')
+
+
+def get_object_version(obj):
+    for field in VERSION_FIELDS:
+        value = getattr(obj, field, None)
+        if value is not None:
+            return value
+    return None
+
+
+def build_resource_validators(objects, request, *variant, generations=None, searchset=False):
+    """
+    Returns tuple of weak ETag and Last-Modified timestamp for response representing given database objects.
+    ETag is derived from model, primary key and version of every object, `generations` of objects ({index:
+    generation}, changing with related objects, see RenderedResourceCache.get_generations()), query parameters
+    of the request and additional `variant` values affecting representation (e.g. reference type). Validators
+    are not available (None, None) if any of objects has no version.
+
+    Last-Modified is not available for `searchset` Bundles, time of the latest change of returned objects
+    doesn't change when an object is deleted or stops matching the search.
+    """
+    generations = generations or {}
+    last_modified = None
+    etag_source = [request.GET.urlencode(), *variant]
+    for idx, obj in enumerate(objects):
+        version = get_object_version(obj)
+        if version is None:
+            return None, None
+        timestamp = _to_timestamp(version)
+        last_modified = timestamp if last_modified is None else max(last_modified, timestamp)
+        etag_source.append((obj._meta.label_lower, str(obj.pk), version.isoformat(), generations.get(idx)))
+    etag = 'W/"%s"' % hashlib.md5(repr(etag_source).encode('utf8')).hexdigest()
+    return etag, None if searchset else last_modified
+
+
+def get_not_modified_response(request, etag, last_modified):
+    """
+    Returns 304 Not Modified response if request preconditions (If-None-Match, If-Modified-Since) are met,
+    None otherwise.
+    """
+    if etag is None and last_modified is None:
+        return None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def set_validator_headers(response, etag, last_modified):
+    if etag is not None:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _to_timestamp(value):
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, datetime.timezone.utc)
+    return int(value.timestamp())
@@ -97,3 +97,11 @@ class R4CoverageEligibilityConfiguration(CoverageEligibilityConfiguration):
     @classmethod
     def get_fhir_active_policy_status(cls):
         return cls.get_config_attribute("R4_fhir_coverage_eligibility_config").get('fhir_active_policy_status', ('A', 2))
+
+    @classmethod
+    def get_fhir_eligibility_engine(cls):
+        return cls.get_config_attribute("R4_fhir_coverage_eligibility_config").get('fhir_eligibility_engine', 'stored_procedure')
+
+    @classmethod
+    def get_fhir_eligibility_engine_cross_check(cls):
+        return cls.get_config_attribute("R4_fhir_coverage_eligibility_config").get('fhir_eligibility_engine_cross_check', False)
@@ -45,3 +45,23 @@ class R4SubscriptionConfig(SubscriptionConfiguration):
     def get_fhir_sub_criteria_key_resource_type(cls):
         return cls.get_config_attribute('R4_fhir_subscription_config').get('get_fhir_sub_criteria_key_resource_type',
                                                                            'resource_type')
+
+    @classmethod
+    def get_fhir_sub_notification_outbox(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('fhir_sub_notification_outbox', False)
+
+    @classmethod
+    def get_fhir_sub_notification_concurrency(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('fhir_sub_notification_concurrency', 10)
+
+    @classmethod
+    def get_fhir_sub_notification_max_attempts(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('fhir_sub_notification_max_attempts', 5)
+
+    @classmethod
+    def get_fhir_sub_notification_retry_delay(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('fhir_sub_notification_retry_delay', 60)
+
+    @classmethod
+    def get_fhir_sub_index_timeout(cls):
+        return cls.get_config_attribute('R4_fhir_subscription_config').get('fhir_sub_index_timeout', 60)
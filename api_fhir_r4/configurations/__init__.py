@@ -1,9 +1,13 @@
 import sys
+import threading
 
+from api_fhir_r4.configurations.configurationSnapshot import ConfigurationSnapshot
 from api_fhir_r4.defaultConfig import DEFAULT_CFG
 
 
 class BaseConfiguration(object):  # pragma: no cover
+    # Namespace the configuration is built into by ModuleConfiguration.build_configuration() in current thread
+    _building = threading.local()
 
     @classmethod
     def build_configuration(cls, cfg):
@@ -11,17 +15,25 @@ class BaseConfiguration(object):  # pragma: no cover
 
     @classmethod
     def get_config(cls):
+        building = getattr(BaseConfiguration._building, 'config', None)
+        if building is not None:
+            return building
         module_name = "api_fhir_r4"
         return sys.modules[module_name]
 
     @classmethod
     def get_config_attribute(cls, attribute, cfg=None):
+        snapshot = ConfigurationSnapshot.current
+        if snapshot is not None and attribute in snapshot.__dict__:
+            return snapshot.__dict__[attribute]
+
+        # Configurations not included in the snapshot are built on first use
         conf = cls.get_config()
         if conf and hasattr(conf, attribute):
             return conf.__getattribute__(attribute)
         else:
-            from core.models import ModuleConfiguration
-            cfg = cfg or ModuleConfiguration.get_or_default("api_fhir_r4", DEFAULT_CFG)
+            from core.models import ModuleConfiguration as CoreModuleConfiguration
+            cfg = cfg or CoreModuleConfiguration.get_or_default("api_fhir_r4", DEFAULT_CFG)
             cls.build_configuration(cfg)
             return conf.__getattribute__(attribute)
 
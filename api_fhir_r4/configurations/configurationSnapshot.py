@@ -0,0 +1,61 @@
+import uuid
+from types import MappingProxyType
+
+from django.core.cache import cache
+
+
+class ConfigurationSnapshot:
+    """
+    Immutable module configuration built by ModuleConfiguration.build_configuration(). Values set by
+    build_configuration() of configuration classes (e.g. `base_url`, `R4_fhir_identifier_type_config`) are
+    plain attributes of the snapshot, nested dictionaries and lists are read-only. Hot code paths read them
+    directly from the current snapshot, e.g. `ConfigurationSnapshot.current.base_url`.
+
+    The current snapshot is replaced as a whole when module configuration changes, readers holding a snapshot
+    never see partially built configuration. Version of the current snapshot is published in Django cache,
+    other processes pick up the change with ModuleConfiguration.refresh_if_changed().
+    """
+    version_cache_key = 'fhir-configuration-version'
+
+    current = None
+
+    def __init__(self, values, version=None):
+        self.__dict__.update({name: _freeze(value) for name, value in values.items()})
+        self.__dict__['version'] = version or uuid.uuid4().hex
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Configuration snapshot is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Configuration snapshot is immutable')
+
+    def __contains__(self, name):
+        return name in self.__dict__
+
+    @classmethod
+    def get_current(cls):
+        return cls.current
+
+    @classmethod
+    def set_current(cls, snapshot):
+        cls.current = snapshot
+
+    @classmethod
+    def get_published_version(cls):
+        return cache.get(cls.version_cache_key)
+
+    @classmethod
+    def publish(cls, snapshot):
+        """
+        Notifies other processes that configuration changed to `snapshot`, see
+        ModuleConfiguration.refresh_if_changed().
+        """
+        cache.set(cls.version_cache_key, snapshot.version, None)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
@@ -17,6 +17,22 @@ class GeneralConfiguration(BaseConfiguration):
         config.default_value_of_location_care_type = cfg['default_value_of_location_care_type']
         config.default_response_page_size = cfg['default_response_page_size']
         config.claim_rule_engine_validation = cfg['claim_rule_engine_validation']
+        config.bundle_streaming_min_page_size = cfg.get(
+            'bundle_streaming_min_page_size', DEFAULT_CFG['bundle_streaming_min_page_size'])
+        config.bundle_strict_validation = cfg.get(
+            'bundle_strict_validation', DEFAULT_CFG['bundle_strict_validation'])
+        config.keyset_pagination_default = cfg.get(
+            'keyset_pagination_default', DEFAULT_CFG['keyset_pagination_default'])
+        config.rendered_resource_cache_timeout = cfg.get(
+            'rendered_resource_cache_timeout', DEFAULT_CFG['rendered_resource_cache_timeout'])
+        config.rendered_resource_cache_lru_size = cfg.get(
+            'rendered_resource_cache_lru_size', DEFAULT_CFG['rendered_resource_cache_lru_size'])
+        config.reference_data_cache_timeout = cfg.get(
+            'reference_data_cache_timeout', DEFAULT_CFG['reference_data_cache_timeout'])
+        config.dict_emitter_resources = cfg.get(
+            'dict_emitter_resources', DEFAULT_CFG['dict_emitter_resources'])
+        config.eligibility_cache_timeout = cfg.get(
+            'eligibility_cache_timeout', DEFAULT_CFG['eligibility_cache_timeout'])
 
     @classmethod
     def get_default_audit_user_id(cls):
@@ -58,6 +74,50 @@ class GeneralConfiguration(BaseConfiguration):
     def get_claim_rule_engine_validation(cls):
         return cls.get_config_attribute("claim_rule_engine_validation")
 
+    @classmethod
+    def get_bundle_streaming_min_page_size(cls):
+        # Search Bundles with page size at least this big are streamed, None (default) disables streaming.
+        # Streamed Bundles are sent after the request transaction ends, so an error raised while converting
+        # an entry can only truncate the response
+        return cls.get_config_attribute("bundle_streaming_min_page_size")
+
+    @classmethod
+    def get_bundle_strict_validation(cls):
+        # Validate Bundle entries and links against FHIR model, entries built by converters are trusted otherwise
+        return cls.get_config_attribute("bundle_strict_validation")
+
+    @classmethod
+    def get_keyset_pagination_default(cls):
+        # Search Bundles without `page-offset` and `cursor` parameters are paginated with cursor
+        return cls.get_config_attribute("keyset_pagination_default")
+
+    @classmethod
+    def get_rendered_resource_cache_timeout(cls):
+        # Seconds for which converted resources are kept in the rendered resource cache, None or 0 disables the cache
+        return cls.get_config_attribute("rendered_resource_cache_timeout")
+
+    @classmethod
+    def get_rendered_resource_cache_lru_size(cls):
+        # Number of converted resources kept in memory of the process on top of the Django cache
+        return cls.get_config_attribute("rendered_resource_cache_lru_size")
+
+    @classmethod
+    def get_reference_data_cache_timeout(cls):
+        # Seconds for which objects of code tables (e.g. Education, Diagnosis) are kept in memory of the process,
+        # changes made by other processes (workers) are visible after it
+        return cls.get_config_attribute("reference_data_cache_timeout")
+
+    @classmethod
+    def get_dict_emitter_resources(cls):
+        # Types of resources serialised with FHIRDictEmitter instead of dict() of fhir.resources
+        return cls.get_config_attribute("dict_emitter_resources")
+
+    @classmethod
+    def get_eligibility_cache_timeout(cls):
+        # Seconds for which CoverageEligibilityResponses are reused for the same insuree, service and item. Changes
+        # bypassing model and service signals (e.g. queryset.update() of claim statuses) are visible after it
+        return cls.get_config_attribute("eligibility_cache_timeout")
+
     @classmethod
     def show_system(cls):
         return 1
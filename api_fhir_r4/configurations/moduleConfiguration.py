@@ -1,12 +1,63 @@
+import time
+from types import SimpleNamespace
+
 from api_fhir_r4.configurations import BaseConfiguration, GeneralConfiguration, R4ApiFhirConfig
+from api_fhir_r4.configurations.configurationSnapshot import ConfigurationSnapshot
+from api_fhir_r4.defaultConfig import DEFAULT_CFG
 
 
 class ModuleConfiguration(BaseConfiguration):
+    MODULE_NAME = "api_fhir_r4"
+    # Seconds between checks of the published configuration version in refresh_if_changed()
+    refresh_check_interval = 5
+
+    _next_refresh_check = 0
+
     @classmethod
-    def build_configuration(cls, cfg):
-        GeneralConfiguration.build_configuration(cfg)
-        cls.get_r4().build_configuration(cfg)
+    def build_configuration(cls, cfg, version=None):
+        """
+        Builds configuration snapshot from `cfg` and makes it current, see ConfigurationSnapshot.
+        """
+        BaseConfiguration._building.config = SimpleNamespace()
+        try:
+            GeneralConfiguration.build_configuration(cfg)
+            cls.get_r4().build_configuration(cfg)
+            values = vars(BaseConfiguration._building.config)
+        finally:
+            BaseConfiguration._building.config = None
+
+        # Module attributes are kept for code reading the configuration from the module
+        vars(cls.get_config()).update(values)
+        ConfigurationSnapshot.set_current(ConfigurationSnapshot(values, version))
 
     @classmethod
     def get_r4(cls):
         return R4ApiFhirConfig
+
+    @classmethod
+    def get_module_cfg(cls):
+        from core.models import ModuleConfiguration as CoreModuleConfiguration
+        return CoreModuleConfiguration.get_or_default(cls.MODULE_NAME, DEFAULT_CFG)
+
+    @classmethod
+    def reload_configuration(cls):
+        """
+        Rebuilds configuration stored in database and notifies other processes about the change.
+        """
+        cls.build_configuration(cls.get_module_cfg())
+        ConfigurationSnapshot.publish(ConfigurationSnapshot.get_current())
+
+    @classmethod
+    def refresh_if_changed(cls):
+        """
+        Rebuilds configuration if other process published a different version of it, see reload_configuration().
+        The published version is checked at most once per `refresh_check_interval` seconds in the process.
+        """
+        now = time.monotonic()
+        if now < ModuleConfiguration._next_refresh_check:
+            return
+        ModuleConfiguration._next_refresh_check = now + cls.refresh_check_interval
+        current = ConfigurationSnapshot.get_current()
+        published_version = ConfigurationSnapshot.get_published_version()
+        if current is not None and published_version is not None and published_version != current.version:
+            cls.build_configuration(cls.get_module_cfg(), version=published_version)
@@ -8,7 +8,9 @@ from fhir.resources.quantity import Quantity
 
 import core
 from api_fhir_r4.configurations import R4IdentifierConfig
+from api_fhir_r4.element_selection import ElementSelection
 from api_fhir_r4.exceptions import FHIRRequestProcessException
+from api_fhir_r4.fragments import fragment_cache
 from fhir.resources.codeableconcept import CodeableConcept
 from fhir.resources.contactpoint import ContactPoint
 from fhir.resources.address import Address
@@ -16,18 +18,49 @@ from fhir.resources.coding import Coding
 from fhir.resources.reference import Reference
 from fhir.resources.identifier import Identifier
 from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.utils import DbManagerUtils
 
 
 class BaseFHIRConverter(ABC):
+    # Relations of IMIS objects traversed by to_fhir_obj(), FHIR views load them together with the objects
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    # {StructureDefinition name: classmethod name} of extensions handled by to_imis_obj(), see
+    # get_imis_extension_handlers()
+    imis_extension_handlers = {}
 
     @classmethod
     def to_fhir_obj(cls, obj, reference_type):
         raise NotImplementedError('`toFhirObj()` must be implemented.')  # pragma: no cover
 
+    @classmethod
+    def to_fhir_many(cls, objects, reference_type):
+        """
+        Converts IMIS objects of a page or a list. Converters can override it to resolve data used by to_fhir_obj()
+        for all the objects with grouped queries instead of querying it for every object.
+        """
+        return [cls.to_fhir_obj(obj, reference_type) for obj in objects]
+
     @classmethod
     def to_imis_obj(cls, data, audit_user_id):
         raise NotImplementedError('`toImisObj()` must be implemented.')  # pragma: no cover
 
+    @classmethod
+    def get_imis_extension_handlers(cls):
+        """
+        Returns {extension url: handler} built from imis_extension_handlers. The table is compiled once per
+        converter and rebuilt only when the system base URL of the module configuration changes.
+        """
+        base_url = GeneralConfiguration.get_system_base_url()
+        compiled = cls.__dict__.get('_compiled_imis_extension_handlers')
+        if compiled is None or compiled[0] != base_url:
+            compiled = (base_url, {
+                f'{base_url}StructureDefinition/{name}': getattr(cls, handler)
+                for name, handler in cls.imis_extension_handlers.items()
+            })
+            cls._compiled_imis_extension_handlers = compiled
+        return compiled[1]
+
     @classmethod
     def get_fhir_code_identifier_type(cls):
         raise NotImplementedError('get_fhir_code_identifier_type() must be implemented')
@@ -50,6 +83,30 @@ class BaseFHIRConverter(ABC):
         elif reference_type == ReferenceConverterMixin.CODE_REFERENCE_TYPE:
             fhir_obj.id = resource.code
 
+    @classmethod
+    def get_prefetch_related_lookups(cls, element_selection=None):
+        """
+        Lookups passed to prefetch_related(), can be overridden to use Prefetch objects with custom querysets.
+        Lookups of elements excluded by `element_selection` (see ElementSelection) can be left out.
+        """
+        return cls.prefetch_related_fields
+
+    @classmethod
+    def apply_related_fields(cls, queryset, element_selection=None):
+        """
+        Adds relations used by the converter to queryset of IMIS objects, see DbManagerUtils.apply_related_fields().
+        """
+        return DbManagerUtils.apply_related_fields(
+            queryset, cls.select_related_fields, cls.get_prefetch_related_lookups(element_selection))
+
+    @classmethod
+    def is_element_requested(cls, fhir_obj, element):
+        """
+        Returns False if top level `element` of resource built by the converter is excluded by `_elements`
+        or `_summary` parameter, building of such element can be skipped.
+        """
+        return ElementSelection.is_requested(cls, fhir_obj.resource_type, element)
+
     @classmethod
     def valid_condition(cls, condition, error_message, errors=None):
         if errors is None:
@@ -153,8 +210,10 @@ class BaseFHIRConverter(ABC):
     @classmethod
     def build_fhir_identifier(cls, value, type_system, type_code):
         identifier = Identifier.construct()
-        type = cls.build_codeable_concept(type_code, type_system)
-        identifier.type = type
+        # Type of identifiers depends only on configuration, all identifiers of one type share the concept
+        identifier.type = fragment_cache.get(
+            ('identifier-type', type_system, type_code),
+            lambda: cls.build_codeable_concept(type_code, type_system))
         # OE0-18 - change into string type always
         identifier.value = str(value)
         return identifier
@@ -217,6 +276,15 @@ class BaseFHIRConverter(ABC):
 
     @classmethod
     def build_fhir_mapped_coding(cls, mapping) -> Coding:
+        """
+        Returns coding of a static mapping, the coding is shared by all resources and must not be modified.
+        """
+        return fragment_cache.get(
+            ('mapped-coding', mapping["system"], mapping["code"], mapping["display"]),
+            lambda: cls._build_fhir_mapped_coding(mapping))
+
+    @classmethod
+    def _build_fhir_mapped_coding(cls, mapping) -> Coding:
         coding = Coding.construct()
 
         if GeneralConfiguration.show_system():
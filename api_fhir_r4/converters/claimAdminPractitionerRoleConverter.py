@@ -8,6 +8,7 @@ from fhir.resources.practitionerrole import PractitionerRole
 
 
 class ClaimAdminPractitionerRoleConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin):
+    select_related_fields = ('health_facility',)
 
     @classmethod
     def to_fhir_obj(cls, imis_claim_admin, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
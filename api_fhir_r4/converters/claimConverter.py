@@ -8,6 +8,8 @@ from typing import Type
 from claim.services import ClaimElementSubmit
 from claim.apps import ClaimConfig
 from claim.models import Claim, ClaimItem, ClaimService, ClaimAttachment
+from django.db.models import Prefetch
+from insuree.models import InsureePolicy
 
 from api_fhir_r4.containedResources.converterUtils import get_from_contained_or_by_reference
 from api_fhir_r4.mapping.claimMapping import ClaimPriorityMapping, ClaimVisitTypeMapping
@@ -20,7 +22,9 @@ from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin, M
 from api_fhir_r4.converters.patientConverter import PatientConverter
 from api_fhir_r4.converters.healthFacilityOrganisationConverter import HealthFacilityOrganisationConverter
 from api_fhir_r4.converters.claimAdminPractitionerConverter import ClaimAdminPractitionerConverter
+from api_fhir_r4.element_selection import ElementSelection
 from api_fhir_r4.models import ClaimV2 as FHIRClaim, ClaimInsuranceV2 as ClaimInsurance
+from api_fhir_r4.reference_data import reference_data
 from fhir.resources.attachment import Attachment
 from fhir.resources.period import Period
 from fhir.resources.claim import ClaimDiagnosis, ClaimSupportingInfo, ClaimItem as FHIRClaimItem
@@ -29,24 +33,56 @@ from api_fhir_r4.utils import TimeUtils, FhirUtils, DbManagerUtils
 
 
 class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    select_related_fields = ('insuree', 'health_facility', 'admin', 'icd', 'icd_1', 'icd_2', 'icd_3', 'icd_4')
+
+    @classmethod
+    def get_prefetch_related_lookups(cls, element_selection=None):
+        lookups = [
+            Prefetch('insuree__insuree_policies',
+                     queryset=InsureePolicy.objects.filter(validity_to__isnull=True).select_related('policy')),
+        ]
+        if ElementSelection.includes_element(element_selection, 'Claim', 'item'):
+            lookups.extend(cls.get_provisions_prefetch_lookups())
+        return lookups
+
+    @classmethod
+    def get_provisions_prefetch_lookups(cls):
+        # Valid items and services of the claim together with medical items and services
+        return [
+            Prefetch('items', queryset=ClaimItem.objects.filter(validity_to__isnull=True).select_related('item')),
+            Prefetch('services',
+                     queryset=ClaimService.objects.filter(validity_to__isnull=True).select_related('service')),
+        ]
 
     @classmethod
     def to_fhir_obj(cls, imis_claim, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_claim = cls.build_fhir_obj_with_required_fields(imis_claim)
-        cls.build_fhir_identifiers(fhir_claim, imis_claim)
+        if cls.is_element_requested(fhir_claim, 'identifier'):
+            cls.build_fhir_identifiers(fhir_claim, imis_claim)
         cls.build_fhir_pk(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_provider(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_patient(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_enterer(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_type(fhir_claim, imis_claim)
-        cls.build_fhir_priority(fhir_claim)
-        cls.build_fhir_insurance(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_billable_period(fhir_claim, imis_claim)
-        cls.build_fhir_diagnoses(fhir_claim, imis_claim)
-        cls.build_fhir_total(fhir_claim, imis_claim)
-        cls.build_fhir_items(fhir_claim, imis_claim, reference_type)
-        cls.build_fhir_supporting_info(fhir_claim, imis_claim)
-        cls.build_fhir_attachments(fhir_claim, imis_claim)
+        if cls.is_element_requested(fhir_claim, 'provider'):
+            cls.build_fhir_provider(fhir_claim, imis_claim, reference_type)
+        if cls.is_element_requested(fhir_claim, 'patient'):
+            cls.build_fhir_patient(fhir_claim, imis_claim, reference_type)
+        if cls.is_element_requested(fhir_claim, 'enterer'):
+            cls.build_fhir_enterer(fhir_claim, imis_claim, reference_type)
+        if cls.is_element_requested(fhir_claim, 'type'):
+            cls.build_fhir_type(fhir_claim, imis_claim)
+        if cls.is_element_requested(fhir_claim, 'priority'):
+            cls.build_fhir_priority(fhir_claim)
+        if cls.is_element_requested(fhir_claim, 'insurance'):
+            cls.build_fhir_insurance(fhir_claim, imis_claim, reference_type)
+        if cls.is_element_requested(fhir_claim, 'billablePeriod'):
+            cls.build_fhir_billable_period(fhir_claim, imis_claim)
+        if cls.is_element_requested(fhir_claim, 'diagnosis'):
+            cls.build_fhir_diagnoses(fhir_claim, imis_claim)
+        if cls.is_element_requested(fhir_claim, 'total'):
+            cls.build_fhir_total(fhir_claim, imis_claim)
+        if cls.is_element_requested(fhir_claim, 'item'):
+            cls.build_fhir_items(fhir_claim, imis_claim, reference_type)
+        if cls.is_element_requested(fhir_claim, 'supportingInfo'):
+            cls.build_fhir_supporting_info(fhir_claim, imis_claim)
+            cls.build_fhir_attachments(fhir_claim, imis_claim)
         return fhir_claim
 
     @classmethod
@@ -193,7 +229,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def get_imis_diagnosis_by_code(cls, icd_code):
-        return Diagnosis.objects.get(code=icd_code)
+        return reference_data.get(Diagnosis, code=icd_code)
 
     @classmethod
     def get_imis_diagnosis_code(cls, diagnosis):
@@ -282,7 +318,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_items_for_imis_items(cls, fhir_claim, imis_claim, reference_type):
-        for claim_item in imis_claim.items.filter(validity_to=None).all():
+        for claim_item in DbManagerUtils.get_valid_related_objects(imis_claim, 'items', 'item'):
             if claim_item:
                 item_type = R4ClaimConfig.get_fhir_claim_item_code()
                 cls.build_fhir_item(fhir_claim, claim_item.item.code, item_type, claim_item, reference_type)
@@ -316,7 +352,7 @@ class ClaimConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_items_for_imis_services(cls, fhir_claim, imis_claim, reference_type):
-        for claim_service in imis_claim.services.filter(validity_to=None).all():
+        for claim_service in DbManagerUtils.get_valid_related_objects(imis_claim, 'services', 'service'):
             if claim_service:
                 item_type = R4ClaimConfig.get_fhir_claim_service_code()
                 cls.build_fhir_item(fhir_claim, claim_service.service.code, item_type, claim_service, reference_type)
@@ -17,10 +17,15 @@ from fhir.resources.claimresponse import ClaimResponseItem, ClaimResponseItemAdj
     ClaimResponseProcessNote, ClaimResponseTotal
 from fhir.resources.reference import Reference
 from fhir.resources.extension import Extension
-from api_fhir_r4.utils import TimeUtils, FhirUtils
+from api_fhir_r4.utils import TimeUtils, FhirUtils, DbManagerUtils
 
 
 class ClaimResponseConverter(BaseFHIRConverter):
+    select_related_fields = ('insuree', 'admin', 'feedback')
+
+    @classmethod
+    def get_prefetch_related_lookups(cls, element_selection=None):
+        return ClaimConverter.get_provisions_prefetch_lookups()
 
     @classmethod
     def to_fhir_obj(cls, imis_claim, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
@@ -234,14 +239,14 @@ class ClaimResponseConverter(BaseFHIRConverter):
 
     @classmethod
     def build_fhir_items_for_imis_services(cls, fhir_claim_response, imis_claim, reference_type):
-        for claim_service in imis_claim.services.filter(validity_to=None).all():
+        for claim_service in DbManagerUtils.get_valid_related_objects(imis_claim, 'services', 'service'):
             if claim_service:
                 item_type = R4ClaimConfig.get_fhir_claim_service_code()
                 cls.build_fhir_item(fhir_claim_response, claim_service, item_type, claim_service.rejection_reason, imis_claim, reference_type)
 
     @classmethod
     def build_fhir_items_for_imis_items(cls, fhir_claim_response, imis_claim, reference_type):
-        for claim_item in imis_claim.items.filter(validity_to=None).all():
+        for claim_item in DbManagerUtils.get_valid_related_objects(imis_claim, 'items', 'item'):
             if claim_item:
                 item_type = R4ClaimConfig.get_fhir_claim_item_code()
                 cls.build_fhir_item(fhir_claim_response, claim_item, item_type, claim_item.rejection_reason, imis_claim, reference_type)
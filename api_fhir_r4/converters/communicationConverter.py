@@ -10,6 +10,7 @@ from fhir.resources.extension import Extension
 
 
 class CommunicationConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    select_related_fields = ('claim__insuree',)
 
     @classmethod
     def to_fhir_obj(cls, imis_feedback, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
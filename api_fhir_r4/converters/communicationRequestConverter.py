@@ -9,6 +9,7 @@ from fhir.resources.extension import Extension
 
 
 class CommunicationRequestConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    select_related_fields = ('insuree', 'admin')
 
     @classmethod
     def to_fhir_obj(cls, imis_claim, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
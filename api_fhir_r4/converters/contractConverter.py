@@ -1,6 +1,6 @@
 import core
 
-from django.db.models import Q
+from django.db.models import Q, Prefetch
 from django.utils.translation import gettext as _
 from api_fhir_r4.configurations import GeneralConfiguration, R4CoverageConfig
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
@@ -24,6 +24,20 @@ from api_fhir_r4.utils import DbManagerUtils, TimeUtils
 
 
 class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    select_related_fields = ('product', 'officer', 'family__head_insuree', 'family__location')
+    # Nested extensions of the contract-premium extension of term assets
+    imis_contribution_handlers = {
+        'payer': 'build_imis_contribution_payer',
+        'amount': 'build_imis_contribution_amount',
+        'receipt': 'build_imis_contribution_receipt',
+        'date': 'build_imis_contribution_pay_date',
+        'type': 'build_imis_contribution_pay_type',
+    }
+
+    @classmethod
+    def get_prefetch_related_lookups(cls, element_selection=None):
+        return [Prefetch('insuree_policies', queryset=cls._get_current_insuree_policies_queryset())]
+
     @classmethod
     def to_fhir_obj(cls, imis_policy, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_contract = Contract.construct()
@@ -272,14 +286,11 @@ class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
     @classmethod
     def build_contract_asset_type_reference(cls, contract_asset, imis_policy, reference_type):
         # type reference - take insurees covered as a policy patient
-        from core import datetime
-        now = datetime.datetime.now()
-
-        list_insuree_policy = InsureePolicy.objects.filter(
-            Q(policy=imis_policy),
-            Q(validity_from__lte=now),
-            Q(validity_to__isnull=True) | Q(validity_to__gte=now),
-        ).only('insuree')
+        prefetched = getattr(imis_policy, '_prefetched_objects_cache', {})
+        if 'insuree_policies' in prefetched:
+            list_insuree_policy = prefetched['insuree_policies']
+        else:
+            list_insuree_policy = cls._get_current_insuree_policies_queryset().filter(policy=imis_policy)
 
         for insuree_policy in list_insuree_policy:
             insuree = insuree_policy.insuree
@@ -293,6 +304,15 @@ class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
         return contract_asset
 
+    @classmethod
+    def _get_current_insuree_policies_queryset(cls):
+        from core import datetime
+        now = datetime.datetime.now()
+        return InsureePolicy.objects.filter(
+            Q(validity_from__lte=now),
+            Q(validity_to__isnull=True) | Q(validity_to__gte=now),
+        ).select_related('insuree')
+
     @classmethod
     def build_imis_period(cls, imis_policy, fhir_contract, errors):
         for term in fhir_contract:
@@ -479,16 +499,9 @@ class ContractConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_imis_contribution(cls, fhir_contribution, imis_contribution):
-        if fhir_contribution.url == "payer":
-            cls.build_imis_contribution_payer(fhir_contribution, imis_contribution)
-        if fhir_contribution.url == "amount":
-            cls.build_imis_contribution_amount(fhir_contribution, imis_contribution)
-        if fhir_contribution.url == "receipt":
-            cls.build_imis_contribution_receipt(fhir_contribution, imis_contribution)
-        if fhir_contribution.url == "date":
-            cls.build_imis_contribution_pay_date(fhir_contribution, imis_contribution)
-        if fhir_contribution.url == "type":
-            cls.build_imis_contribution_pay_type(fhir_contribution, imis_contribution)
+        handler = cls.imis_contribution_handlers.get(fhir_contribution.url)
+        if handler:
+            getattr(cls, handler)(fhir_contribution, imis_contribution)
 
     @classmethod
     def build_imis_contribution_payer(cls, fhir_contribution, imis_contribution):
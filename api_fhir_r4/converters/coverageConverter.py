@@ -13,6 +13,7 @@ from api_fhir_r4.utils import TimeUtils
 
 
 class CoverageConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    select_related_fields = ('family__head_insuree', 'product')
 
     @classmethod
     def to_fhir_obj(cls, imis_policy, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
@@ -171,8 +172,8 @@ class CoverageConverter(BaseFHIRConverter, ReferenceConverterMixin):
         product_coverage = {}
         service_code = R4CoverageConfig.get_service_code()
         item_code = R4CoverageConfig.get_item_code()
-        product_items = ProductItem.objects.filter(product=product).all()
-        product_services = ProductService.objects.filter(product=product).all()
+        product_items = ProductItem.objects.filter(product=product).select_related('item')
+        product_services = ProductService.objects.filter(product=product).select_related('service')
         product_coverage[item_code] = [item.item.code for item in product_items]
         product_coverage[service_code] = [service.service.code for service in product_services]
         class_.value = product.code
@@ -1,3 +1,6 @@
+import logging
+from collections import defaultdict
+
 from django.db import connection
 from fhir.resources.coverageeligibilityresponse import (
     CoverageEligibilityResponse as FHIRCoverageEligibilityResponse,
@@ -18,6 +21,7 @@ from api_fhir_r4.converters import (
     ReferenceConverterMixin
 )
 from api_fhir_r4.defaultConfig import DEFAULT_CFG
+from api_fhir_r4.eligibility_engine import EligibilityEngine
 from api_fhir_r4.models import CoverageEligibilityRequestV2 as FHIRCoverageEligibilityRequest
 from api_fhir_r4.utils import TimeUtils
 from claim.models import (
@@ -39,18 +43,40 @@ from policy.services import (
 )
 from product.models import Product, ProductService, ProductItem
 
+logger = logging.getLogger(__name__)
+
 
 class CoverageEligibilityRequestConverter(BaseFHIRConverter):
 
     @classmethod
     def to_fhir_obj(cls, coverage_eligibility_response, coverage_eligibility_request,
                     reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
-        fhir_response = cls.build_fhir_obligatory_fields(coverage_eligibility_request)
-        fhir_response.patient = cls.build_fhir_patient(coverage_eligibility_request.chf_id)
-        for item in coverage_eligibility_response.items:
-            if item.status in Config.get_fhir_active_policy_status():
-                cls.build_fhir_insurance(fhir_response, item, coverage_eligibility_request)
-        return fhir_response
+        return cls.to_fhir_many([(coverage_eligibility_response, coverage_eligibility_request)], reference_type)[0]
+
+    @classmethod
+    def to_fhir_many(cls, objects, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
+        """
+        Converts list of (ByInsureeResponse, EligibilityRequest) pairs, e.g. entries of a batch Bundle.
+        Eligibility of every distinct request is evaluated once with one database cursor. Insurees, policies,
+        products and their services and items are loaded with one query each.
+        """
+        objects = [(request, cls.get_active_policy_items(response)) for response, request in objects]
+        eligibility_requests = {}
+        for request, items in objects:
+            if items:
+                eligibility_requests.setdefault(cls.get_eligibility_key(request), request)
+        evaluations = cls.evaluate_eligibility_requests(eligibility_requests)
+        lookups = cls.load_eligibility_lookups(objects, evaluations.values())
+
+        fhir_responses = []
+        for request, items in objects:
+            fhir_response = cls.build_fhir_obligatory_fields(request)
+            fhir_response.patient = cls.build_fhir_patient_reference(request.chf_id, lookups['insurees'])
+            for item in items:
+                evaluation = evaluations[cls.get_eligibility_key(request)]
+                cls.build_fhir_insurance(fhir_response, item, request, evaluation, lookups)
+            fhir_responses.append(fhir_response)
+        return fhir_responses
 
     @classmethod
     def to_imis_obj(cls, fhir_coverage_eligibility_request, audit_user_id):
@@ -59,6 +85,15 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         item_code, service_code = cls.build_imis_item_service(fhir_coverage_eligibility_request)
         return EligibilityRequest(chf_id, service_code, item_code)
 
+    @classmethod
+    def get_active_policy_items(cls, coverage_eligibility_response):
+        active_policy_status = Config.get_fhir_active_policy_status()
+        return [item for item in coverage_eligibility_response.items if item.status in active_policy_status]
+
+    @classmethod
+    def get_eligibility_key(cls, request):
+        return request.chf_id, request.service_code, request.item_code
+
     @classmethod
     def build_fhir_obligatory_fields(cls, coverage_eligibility_request):
         fhir_eligibility_response = {"status": 'active', "outcome": 'complete'}
@@ -79,99 +114,197 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         return FHIRCoverageEligibilityResponse(**fhir_eligibility_response)
 
     @classmethod
-    def build_fhir_patient(cls, chf_id):
-        insuree = Insuree.objects.filter(chf_id=chf_id, validity_to__isnull=True)
-        if insuree.count() == 1:
-            insuree = insuree.first()
-            reference = PatientConverter.build_fhir_resource_reference(
-                insuree,
+    def build_fhir_patient_reference(cls, chf_id, insurees):
+        # Reference is built only if chf_id identifies exactly one insuree
+        matching_insurees = insurees.get(chf_id, [])
+        if len(matching_insurees) == 1:
+            return PatientConverter.build_fhir_resource_reference(
+                matching_insurees[0],
                 type='Patient',
                 display=chf_id
             )
-            return reference
 
     @classmethod
-    def build_fhir_insurance(cls, fhir_response, item, request):
-        result = CoverageEligibilityResponseInsurance.construct()
-        cls.build_fhir_coverage(result, item.policy_uuid)
-        cls.build_fhir_benefit_period(result, item.start_date, item.expiry_date)
+    def evaluate_eligibility_requests(cls, eligibility_requests):
+        """
+        Returns {eligibility key: EligibilityResponse} computed by the engine selected by the
+        `fhir_eligibility_engine` configuration, either `stored_procedure` (`uspServiceItemEnquiry`, all the
+        requests are evaluated with one cursor) or `orm` (see EligibilityEngine).
+        """
+        if not eligibility_requests:
+            return {}
+        if Config.get_fhir_eligibility_engine() == 'orm':
+            evaluations = EligibilityEngine.evaluate_many(eligibility_requests)
+            evaluations = {key: evaluations.get(key) or cls.build_default_eligibility_response()
+                           for key in eligibility_requests}
+        else:
+            with connection.cursor() as cur:
+                evaluations = {key: cls.evaluate_eligibility(cur, request)
+                               for key, request in eligibility_requests.items()}
+        if Config.get_fhir_eligibility_engine_cross_check():
+            cls.cross_check_eligibility(eligibility_requests, evaluations)
+        return evaluations
+
+    @classmethod
+    def cross_check_eligibility(cls, eligibility_requests, evaluations):
+        """
+        Evaluates the requests with the engine which is not configured and logs a warning for every request
+        whose results of the stored procedure and of EligibilityEngine differ.
+        """
+        if Config.get_fhir_eligibility_engine() == 'orm':
+            orm_evaluations = evaluations
+            sp_evaluations = {}
+            with connection.cursor() as cur:
+                for key, request in eligibility_requests.items():
+                    try:
+                        sp_evaluations[key] = cls.call_eligibility_procedure(cur, request)
+                    except Exception as exception:
+                        logger.warning(f"Eligibility of {key} could not be cross-checked: {exception}")
+        else:
+            sp_evaluations = evaluations
+            orm_evaluations = EligibilityEngine.evaluate_many(eligibility_requests)
+
+        for key, sp_evaluation in sp_evaluations.items():
+            orm_evaluation = orm_evaluations.get(key) or cls.build_default_eligibility_response()
+            differences = {
+                field: (getattr(sp_evaluation, field), getattr(orm_evaluation, field))
+                for field in EligibilityEngine.compared_fields
+                if getattr(sp_evaluation, field) != getattr(orm_evaluation, field)
+            }
+            if differences:
+                logger.warning(f"Eligibility engines differ for {key}, (stored procedure, orm): {differences}")
+
+    @classmethod
+    def evaluate_eligibility(cls, cur, request):
         # get the data from SP
         try:
-            with connection.cursor() as cur:
-                sql = """\
-                            DECLARE @MinDateService DATE, @MinDateItem DATE,
-                                    @ServiceLeft INT, @ItemLeft INT,
-                                    @isItemOK BIT, @isServiceOK BIT;
-                            EXEC [dbo].[uspServiceItemEnquiry] @CHFID = %s, @ServiceCode = %s, @ItemCode = %s,
-                                 @MinDateService = @MinDateService OUTPUT, @MinDateItem = @MinDateItem OUTPUT,
-                                 @ServiceLeft = @ServiceLeft OUTPUT, @ItemLeft = @ItemLeft OUTPUT,
-                                 @isItemOK = @isItemOK OUTPUT, @isServiceOK = @isServiceOK OUTPUT;
-                            SELECT @MinDateService, @MinDateItem, @ServiceLeft, @ItemLeft, @isItemOK, @isServiceOK
-                        """
-                cur.execute(sql, (request.chf_id,
-                                  request.service_code,
-                                  request.item_code))
-                res = cur.fetchone()  # retrieve the stored proc @Result table
-
-                (prod_id, total_admissions_left, total_visits_left, total_consultations_left, total_surgeries_left,
-                 total_deliveries_left, total_antenatal_left, consultation_amount_left, surgery_amount_left,
-                 delivery_amount_left,
-                 hospitalization_amount_left, antenatal_amount_left) = res
-                cur.nextset()
-                (min_date_service, min_date_item, service_left,
-                 item_left, is_item_ok, is_service_ok) = cur.fetchone()
-                response_eligibility_sp = EligibilityResponse(
-                    eligibility_request=request,
-                    prod_id=prod_id or None,
-                    total_admissions_left=total_admissions_left or 0,
-                    total_visits_left=total_visits_left or 0,
-                    total_consultations_left=total_consultations_left or 0,
-                    total_surgeries_left=total_surgeries_left or 0,
-                    total_deliveries_left=total_deliveries_left or 0,
-                    total_antenatal_left=total_antenatal_left or 0,
-                    consultation_amount_left=consultation_amount_left or 0.0,
-                    surgery_amount_left=surgery_amount_left or 0.0,
-                    delivery_amount_left=delivery_amount_left or 0.0,
-                    hospitalization_amount_left=hospitalization_amount_left or 0.0,
-                    antenatal_amount_left=antenatal_amount_left or 0.0,
-                    min_date_service=min_date_service,
-                    min_date_item=min_date_item,
-                    service_left=service_left or 0,
-                    item_left=item_left or 0,
-                    is_item_ok=is_item_ok is True,
-                    is_service_ok=is_service_ok is True
-                )
+            return cls.call_eligibility_procedure(cur, request)
         except Exception:
-            response_eligibility_sp = EligibilityResponse(
-                eligibility_request=None,
-                prod_id=None,
-                total_admissions_left=0,
-                total_visits_left=0,
-                total_consultations_left=0,
-                total_surgeries_left=0,
-                total_deliveries_left=0,
-                total_antenatal_left=0,
-                consultation_amount_left=0.0,
-                surgery_amount_left=0.0,
-                delivery_amount_left=0.0,
-                hospitalization_amount_left=0.0,
-                antenatal_amount_left=0.0,
-                min_date_service=None,
-                min_date_item=None,
-                service_left=0,
-                item_left=0,
-                is_item_ok=False,
-                is_service_ok=False
-            )
+            return cls.build_default_eligibility_response()
+
+    @classmethod
+    def call_eligibility_procedure(cls, cur, request):
+        sql = """\
+                    DECLARE @MinDateService DATE, @MinDateItem DATE,
+                            @ServiceLeft INT, @ItemLeft INT,
+                            @isItemOK BIT, @isServiceOK BIT;
+                    EXEC [dbo].[uspServiceItemEnquiry] @CHFID = %s, @ServiceCode = %s, @ItemCode = %s,
+                         @MinDateService = @MinDateService OUTPUT, @MinDateItem = @MinDateItem OUTPUT,
+                         @ServiceLeft = @ServiceLeft OUTPUT, @ItemLeft = @ItemLeft OUTPUT,
+                         @isItemOK = @isItemOK OUTPUT, @isServiceOK = @isServiceOK OUTPUT;
+                    SELECT @MinDateService, @MinDateItem, @ServiceLeft, @ItemLeft, @isItemOK, @isServiceOK
+                """
+        cur.execute(sql, (request.chf_id,
+                          request.service_code,
+                          request.item_code))
+        res = cur.fetchone()  # retrieve the stored proc @Result table
+
+        (prod_id, total_admissions_left, total_visits_left, total_consultations_left, total_surgeries_left,
+         total_deliveries_left, total_antenatal_left, consultation_amount_left, surgery_amount_left,
+         delivery_amount_left,
+         hospitalization_amount_left, antenatal_amount_left) = res
+        cur.nextset()
+        (min_date_service, min_date_item, service_left,
+         item_left, is_item_ok, is_service_ok) = cur.fetchone()
+        return EligibilityResponse(
+            eligibility_request=request,
+            prod_id=prod_id or None,
+            total_admissions_left=total_admissions_left or 0,
+            total_visits_left=total_visits_left or 0,
+            total_consultations_left=total_consultations_left or 0,
+            total_surgeries_left=total_surgeries_left or 0,
+            total_deliveries_left=total_deliveries_left or 0,
+            total_antenatal_left=total_antenatal_left or 0,
+            consultation_amount_left=consultation_amount_left or 0.0,
+            surgery_amount_left=surgery_amount_left or 0.0,
+            delivery_amount_left=delivery_amount_left or 0.0,
+            hospitalization_amount_left=hospitalization_amount_left or 0.0,
+            antenatal_amount_left=antenatal_amount_left or 0.0,
+            min_date_service=min_date_service,
+            min_date_item=min_date_item,
+            service_left=service_left or 0,
+            item_left=item_left or 0,
+            is_item_ok=is_item_ok is True,
+            is_service_ok=is_service_ok is True
+        )
+
+    @classmethod
+    def build_default_eligibility_response(cls):
+        return EligibilityResponse(
+            eligibility_request=None,
+            prod_id=None,
+            total_admissions_left=0,
+            total_visits_left=0,
+            total_consultations_left=0,
+            total_surgeries_left=0,
+            total_deliveries_left=0,
+            total_antenatal_left=0,
+            consultation_amount_left=0.0,
+            surgery_amount_left=0.0,
+            delivery_amount_left=0.0,
+            hospitalization_amount_left=0.0,
+            antenatal_amount_left=0.0,
+            min_date_service=None,
+            min_date_item=None,
+            service_left=0,
+            item_left=0,
+            is_item_ok=False,
+            is_service_ok=False
+        )
+
+    @classmethod
+    def load_eligibility_lookups(cls, objects, evaluations):
+        """
+        Loads objects referenced by eligibility responses of all the requests, see to_fhir_many().
+        """
+        chf_ids = {request.chf_id for request, _ in objects}
+        insurees = defaultdict(list)
+        for insuree in Insuree.objects.filter(chf_id__in=chf_ids, validity_to__isnull=True):
+            insurees[insuree.chf_id].append(insuree)
+
+        policy_uuids = {str(item.policy_uuid) for _, items in objects for item in items}
+        policies = {}
+        for policy in Policy.objects.filter(uuid__in=policy_uuids, validity_to__isnull=True).order_by('id'):
+            policies.setdefault(str(policy.uuid).lower(), policy)
+
+        product_ids = {evaluation.prod_id for evaluation in evaluations if evaluation.prod_id}
+        products = {product.id: product for product in Product.objects.filter(id__in=product_ids, validity_to=None)}
+
+        service_codes = {request.service_code for request, _ in objects if request.service_code}
+        product_services = {}
+        for product_service in ProductService.objects \
+                .filter(product_id__in=product_ids, validity_to=None, service__code__in=service_codes) \
+                .select_related('service').order_by('id'):
+            product_services.setdefault((product_service.product_id, product_service.service.code), product_service)
+
+        item_codes = {request.item_code for request, _ in objects if request.item_code}
+        product_items = {}
+        for product_item in ProductItem.objects \
+                .filter(product_id__in=product_ids, validity_to=None, item__code__in=item_codes) \
+                .select_related('item').order_by('id'):
+            product_items.setdefault((product_item.product_id, product_item.item.code), product_item)
+
+        return {
+            'insurees': insurees,
+            'policies': policies,
+            'products': products,
+            'product_services': product_services,
+            'product_items': product_items,
+        }
+
+    @classmethod
+    def build_fhir_insurance(cls, fhir_response, item, request, response_eligibility_sp, lookups):
+        result = CoverageEligibilityResponseInsurance.construct()
+        cls.build_fhir_coverage(result, lookups['policies'].get(str(item.policy_uuid).lower()))
+        cls.build_fhir_benefit_period(result, item.start_date, item.expiry_date)
 
         # build coverag item - product/benefit
         result.item = []
-        cls.build_fhir_benefit_item_element(result, response_eligibility_sp)
+        prod_id = response_eligibility_sp.prod_id
+        cls.build_fhir_benefit_item_element(result, response_eligibility_sp, lookups['products'].get(prod_id))
         # check services and items etc
-        prod_service = ProductService.objects\
-            .filter(product=prod_id, validity_to=None, service__code=request.service_code).first()
-        prod_item = ProductItem.objects\
-            .filter(product=prod_id, validity_to=None, item__code=request.item_code).first()
+        prod_service = lookups['product_services'].get((prod_id, request.service_code))
+        prod_item = lookups['product_items'].get((prod_id, request.item_code))
         # build coverage item - service
         if prod_service:
             cls.build_fhir_benefit_item_service_element(result, response_eligibility_sp, prod_service.service)
@@ -184,10 +317,9 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
             fhir_response.insurance.append(result)
 
     @classmethod
-    def build_fhir_coverage(cls, insurance, policy_uuid):
+    def build_fhir_coverage(cls, insurance, policy):
         # Due to circular dependency import has to be done inside of method
         from api_fhir_r4.converters import CoverageConverter
-        policy = Policy.objects.filter(uuid=policy_uuid, validity_to__isnull=True).first()
         reference_coverage = CoverageConverter.build_fhir_resource_reference(
             policy,
             type='Coverage',
@@ -203,7 +335,7 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         insurance.benefitPeriod = benefit_period
 
     @classmethod
-    def build_fhir_benefit_item_element(cls, insurance, response):
+    def build_fhir_benefit_item_element(cls, insurance, response, product):
         item = CoverageEligibilityResponseInsuranceItem.construct()
         system = F"{GeneralConfiguration.get_system_base_url()}CodeSystem/coverage-item-category"
         item.category = cls.build_codeable_concept(
@@ -211,7 +343,7 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
             code="benefit",
             display="Benefit Package"
         )
-        cls.__build_item_product_name(fhir_item=item, prod_id=response.prod_id)
+        cls.__build_item_product_name(fhir_item=item, product=product)
         item.benefit = []
         if response.total_admissions_left:
             cls.build_fhir_int_item_benefit_element(
@@ -427,8 +559,6 @@ class CoverageEligibilityRequestConverter(BaseFHIRConverter):
         return policy, product
 
     @classmethod
-    def __build_item_product_name(cls, fhir_item, prod_id):
-        product_queryset = Product.objects.all().filter(id=prod_id, validity_to=None)
-        product = product_queryset.first()
+    def __build_item_product_name(cls, fhir_item, product):
         fhir_item.name = product.name
         fhir_item.description = product.code
@@ -9,6 +9,7 @@ from fhir.resources.practitionerrole import PractitionerRole
 
 
 class EnrolmentOfficerPractitionerRoleConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin):
+    select_related_fields = ('location', 'substitution_officer')
 
     @classmethod
     def to_fhir_obj(cls, imis_officer, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
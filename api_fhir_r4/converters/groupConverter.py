@@ -13,9 +13,18 @@ from fhir.resources.extension import Extension
 from fhir.resources.group import Group, GroupMember
 from api_fhir_r4.utils import DbManagerUtils
 from api_fhir_r4.exceptions import FHIRException
+from api_fhir_r4.identity_map import IdentityMap
+from api_fhir_r4.reference_data import reference_data
 
 
 class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    select_related_fields = ('head_insuree', 'family_type', 'confirmation_type', 'location__parent__parent__parent')
+    imis_extension_handlers = {
+        'group-address': 'build_imis_address_extension',
+        'group-poverty-status': 'build_imis_poverty_status_extension',
+        'group-type': 'build_imis_group_type_extension',
+        'group-confirmation': 'build_imis_confirmation_extension',
+    }
 
     @classmethod
     def to_fhir_obj(cls, imis_family, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
@@ -135,12 +144,15 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
         
     @classmethod
     def build_fhir_active(cls, fhir_family, imis_family):
-        number_of_active_policy = InsureePolicy.objects.filter(
-            Q(insuree__family__uuid=imis_family.uuid),
-            Q(policy__status=Policy.STATUS_ACTIVE),
-            Q(validity_to__isnull=True)
-        ).count()
-        fhir_family.active = True if number_of_active_policy > 0 else False
+        # Lists are annotated with has_active_policy and active_member_count, see GroupViewSet
+        has_active_policy = getattr(imis_family, 'has_active_policy', None)
+        if has_active_policy is None:
+            has_active_policy = InsureePolicy.objects.filter(
+                Q(insuree__family__uuid=imis_family.uuid),
+                Q(policy__status=Policy.STATUS_ACTIVE),
+                Q(validity_to__isnull=True)
+            ).exists()
+        fhir_family.active = bool(has_active_policy)
 
     @classmethod
     def build_fhir_member(cls,fhir_family, imis_family, reference_type):
@@ -148,7 +160,9 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_quantity(cls,fhir_family, imis_family):
-        quantity = Insuree.objects.filter(family__uuid=imis_family.uuid, validity_to__isnull=True).count()
+        quantity = getattr(imis_family, 'active_member_count', None)
+        if quantity is None:
+            quantity = Insuree.objects.filter(family__uuid=imis_family.uuid, validity_to__isnull=True).count()
         fhir_family.quantity = quantity
 
     @classmethod
@@ -195,45 +209,53 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
     @classmethod
     def build_imis_extentions(cls, imis_family, fhir_family):
         cls._validate_fhir_extension_is_exist(fhir_family)
+        handlers = cls.get_imis_extension_handlers()
         for extension in fhir_family.extension:
-            if extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/group-address":
-                address = extension.valueAddress
-                # insuree use temp address
-                if address and address.use == "home" and address.type == "physical":
-                    imis_family.address = address.text
-                    for ext in address.extension:
-                        if "StructureDefinition/address-location-reference" in ext.url:
-                            value = cls.get_location_reference(ext.valueReference.reference)
-                            if value:
-                                try:
-                                    imis_family.location = Location.objects.get(uuid=value, validity_to__isnull=True)
-                                except Location.DoesNotExist:
-                                    imis_family.location = None
-
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/group-poverty-status":
-                imis_family.poverty = extension.valueBoolean
-
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/group-type":
-                try:
-                    imis_family.family_type = FamilyType.objects.get(code=extension.valueCodeableConcept.coding[0].code)
-                except:
-                    imis_family.family_type = None
-
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/group-confirmation":
-                try:
-                    for ext in extension.extension:
-                        if ext.url == "number":
-                            fhir_family.confirmation_no = ext.valueString
-                        if ext.url == "type":
-                            fhir_family.confirmation_type = ConfirmationType.objects.get(
-                                code=ext.valueCodeableConcept.coding[0].code)
-                except:
-                    imis_family.confirmation_no = None
-                    imis_family.confirmation_type = None
-            else:
-                pass
+            handler = handlers.get(extension.url)
+            if handler:
+                handler(imis_family, fhir_family, extension)
         cls._validate_imis_family_location(imis_family)
 
+    @classmethod
+    def build_imis_address_extension(cls, imis_family, fhir_family, extension):
+        address = extension.valueAddress
+        # insuree use temp address
+        if address and address.use == "home" and address.type == "physical":
+            imis_family.address = address.text
+            for ext in address.extension:
+                if "StructureDefinition/address-location-reference" in ext.url:
+                    value = cls.get_location_reference(ext.valueReference.reference)
+                    if value:
+                        try:
+                            imis_family.location = Location.objects.get(uuid=value, validity_to__isnull=True)
+                        except Location.DoesNotExist:
+                            imis_family.location = None
+
+    @classmethod
+    def build_imis_poverty_status_extension(cls, imis_family, fhir_family, extension):
+        imis_family.poverty = extension.valueBoolean
+
+    @classmethod
+    def build_imis_group_type_extension(cls, imis_family, fhir_family, extension):
+        try:
+            imis_family.family_type = reference_data.get(
+                FamilyType, code=extension.valueCodeableConcept.coding[0].code)
+        except:
+            imis_family.family_type = None
+
+    @classmethod
+    def build_imis_confirmation_extension(cls, imis_family, fhir_family, extension):
+        try:
+            for ext in extension.extension:
+                if ext.url == "number":
+                    fhir_family.confirmation_no = ext.valueString
+                if ext.url == "type":
+                    fhir_family.confirmation_type = reference_data.get(
+                        ConfirmationType, code=ext.valueCodeableConcept.coding[0].code)
+        except:
+            imis_family.confirmation_no = None
+            imis_family.confirmation_type = None
+
     @classmethod
     def get_location_reference(cls, location):
         return location.rsplit('Location/', 1)[1]
@@ -243,12 +265,15 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
         extension.url = f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/group-address"
         family_address = cls.build_fhir_address(imis_family.address, "home", "physical")
         if imis_family.location:
-            family_address.state = imis_family.location.parent.parent.parent.name
-            family_address.district = imis_family.location.parent.parent.name
+            # Villages of families in one response share their municipalities, districts and regions
+            municipality = IdentityMap.get_related_object(imis_family.location, 'parent')
+            district = IdentityMap.get_related_object(municipality, 'parent')
+            family_address.state = IdentityMap.get_related_object(district, 'parent').name
+            family_address.district = district.name
             # municipality extension
             extension_address = Extension.construct()
             extension_address.url = f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/address-municipality"
-            extension_address.valueString = imis_family.location.parent.name
+            extension_address.valueString = municipality.name
             family_address.extension = [extension_address]
 
             # address location reference extension
@@ -294,7 +319,10 @@ class GroupConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_fhir_members(cls, family):
-        family_insurees = family.members.all()
+        # Lists include only active members, prefetched by GroupViewSet
+        family_insurees = getattr(family, 'active_members', None)
+        if family_insurees is None:
+            family_insurees = family.members.all()
         members = [cls._create_group_member(member) for member in family_insurees]
         return members
 
@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 
 from django.core.exceptions import MultipleObjectsReturned
 from location.models import HealthFacility, Location, HealthFacilityLegalForm
@@ -12,6 +13,7 @@ from fhir.resources.organization import OrganizationContact
 from fhir.resources.extension import Extension
 from api_fhir_r4.mapping.organizationMapping import HealthFacilityOrganizationTypeMapping
 from api_fhir_r4.models.imisModelEnums import ImisLocationType
+from api_fhir_r4.reference_data import reference_data
 from api_fhir_r4.utils import DbManagerUtils
 from django.utils.translation import gettext as _
 
@@ -19,6 +21,7 @@ logger = logging.getLogger(__name__)
 
 
 class HealthFacilityOrganisationConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin):
+    select_related_fields = ('location__parent', 'legal_form')
 
     @classmethod
     def to_fhir_obj(cls, imis_organisation: HealthFacility, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
@@ -33,6 +36,26 @@ class HealthFacilityOrganisationConverter(BaseFHIRConverter, PersonConverterMixi
         cls.build_contacts(fhir_organisation, imis_organisation)
         return fhir_organisation
 
+    @classmethod
+    def to_fhir_many(cls, imis_organisations, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
+        cls.load_claim_admins(imis_organisations)
+        return super().to_fhir_many(imis_organisations, reference_type)
+
+    @classmethod
+    def load_claim_admins(cls, imis_organisations):
+        """
+        Sets `valid_claim_admins` used by build_contacts() for all the health facilities with one query.
+        """
+        imis_organisations = [hf for hf in imis_organisations if not hasattr(hf, 'valid_claim_admins')]
+        if not imis_organisations:
+            return
+        claim_admins = defaultdict(list)
+        for admin in ClaimAdmin.objects \
+                .filter(health_facility__in=imis_organisations, validity_to__isnull=True).distinct():
+            claim_admins[admin.health_facility_id].append(admin)
+        for imis_organisation in imis_organisations:
+            imis_organisation.valid_claim_admins = claim_admins[imis_organisation.id]
+
     @classmethod
     def to_imis_obj(cls, fhir_organisation, audit_user_id):
         errors = []
@@ -146,8 +169,10 @@ class HealthFacilityOrganisationConverter(BaseFHIRConverter, PersonConverterMixi
     @classmethod
     def build_contacts(cls, fhir_organisation, imis_organisation):
         contracts = []
-        relevant_claim_admins = ClaimAdmin.objects\
-            .filter(health_facility=imis_organisation, validity_to__isnull=True).distinct()
+        relevant_claim_admins = getattr(imis_organisation, 'valid_claim_admins', None)
+        if relevant_claim_admins is None:
+            relevant_claim_admins = ClaimAdmin.objects\
+                .filter(health_facility=imis_organisation, validity_to__isnull=True).distinct()
 
         for admin in relevant_claim_admins:
             contracts.append(
@@ -319,7 +344,7 @@ class HealthFacilityOrganisationConverter(BaseFHIRConverter, PersonConverterMixi
                 'codes': HealthFacilityOrganizationTypeMapping.LEGAL_FORM_MAPPING.keys()},
             errors)
         if value:
-            legal_form = HealthFacilityLegalForm.objects.get(code=value)
+            legal_form = reference_data.get(HealthFacilityLegalForm, code=value)
             imis_hf.legal_form = legal_form
         else:
             cls.valid_condition(True, _("Extension with HF legal form not found"), errors)
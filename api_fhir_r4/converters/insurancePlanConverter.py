@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 import core
 
 from django.utils.translation import gettext as _
@@ -19,21 +21,39 @@ from api_fhir_r4.utils import DbManagerUtils, TimeUtils
 
 
 class InsurancePlanConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    select_related_fields = ('location', 'conversion_product')
+    imis_extension_handlers = {
+        'insurance-plan-conversion': 'build_imis_conversion_extensions',
+        'insurance-plan-max-installments': 'build_imis_max_installments_extensions',
+        # TODO - clarify this period extension and the same for discount extension
+        #  it is about handling the same extension object and how to assign values to particular one
+        'insurance-plan-period': 'build_imis_period_extensions',
+        'insurance-plan-discount': 'build_imis_discount_extensions',
+    }
 
     @classmethod
     def to_fhir_obj(cls, imis_product, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_insurance_plan = InsurancePlan.construct()
         # then create fhir object as usual
-        cls.build_fhir_identifiers(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'identifier'):
+            cls.build_fhir_identifiers(fhir_insurance_plan, imis_product)
         cls.build_fhir_pk(fhir_insurance_plan, imis_product.uuid)
-        cls.build_fhir_name(fhir_insurance_plan, imis_product)
-        cls.build_fhir_type(fhir_insurance_plan, imis_product)
-        cls.build_fhir_status(fhir_insurance_plan, imis_product)
-        cls.build_fhir_period(fhir_insurance_plan, imis_product)
-        cls.build_fhir_coverage_area(fhir_insurance_plan, imis_product)
-        cls.build_fhir_coverage(fhir_insurance_plan, imis_product)
-        cls.build_fhir_plan(fhir_insurance_plan, imis_product)
-        cls.build_fhir_extentions(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'name'):
+            cls.build_fhir_name(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'type'):
+            cls.build_fhir_type(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'status'):
+            cls.build_fhir_status(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'period'):
+            cls.build_fhir_period(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'coverageArea'):
+            cls.build_fhir_coverage_area(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'coverage'):
+            cls.build_fhir_coverage(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'plan'):
+            cls.build_fhir_plan(fhir_insurance_plan, imis_product)
+        if cls.is_element_requested(fhir_insurance_plan, 'extension'):
+            cls.build_fhir_extentions(fhir_insurance_plan, imis_product)
         return fhir_insurance_plan
 
     @classmethod
@@ -440,33 +460,35 @@ class InsurancePlanConverter(BaseFHIRConverter, ReferenceConverterMixin):
 
     @classmethod
     def build_imis_extentions(cls, imis_product, fhir_insurance_plan):
-        period_exts = []
-        discount_exts = []
+        # Extensions are passed to handlers grouped by url, period and discount extensions are assigned by their order
+        handlers = cls.get_imis_extension_handlers()
+        extensions_by_handler = defaultdict(list)
         for extension in fhir_insurance_plan.extension:
-            if "conversion" in extension.url:
-                reference = extension.valueReference.reference
-                code = cls.__get_product_code_reference(code=reference)
-                products = Product.objects.filter(code=code, validity_to__isnull=True)
-                if products:
-                    product = products.first()
-                    imis_product.conversion_product = product
-                else:
-                    imis_product.conversion_product = None
-            elif "max-installments" in extension.url:
-                    imis_product.max_installments = extension.valueUnsignedInt
-            # TODO - clarify this period extension and the same for discount extension
-            #  it is about handling the same extension object and how to assign values to particular one
-            elif "plan-period" in extension.url:
-                period_exts.append(extension)
-            elif "plan-discount" in extension.url:
-                discount_exts.append(extension)
+            handler = handlers.get(extension.url)
+            if handler:
+                extensions_by_handler[handler].append(extension)
+        for handler, extensions in extensions_by_handler.items():
+            handler(imis_product, extensions)
+
+    @classmethod
+    def build_imis_conversion_extensions(cls, imis_product, conversion_exts):
+        for extension in conversion_exts:
+            reference = extension.valueReference.reference
+            code = cls.__get_product_code_reference(code=reference)
+            products = Product.objects.filter(code=code, validity_to__isnull=True)
+            if products:
+                product = products.first()
+                imis_product.conversion_product = product
             else:
-                pass
-        cls.__build_period_extensions(imis_product, period_exts)
-        cls.__build_discount_extensions(imis_product, discount_exts)
+                imis_product.conversion_product = None
+
+    @classmethod
+    def build_imis_max_installments_extensions(cls, imis_product, max_installments_exts):
+        for extension in max_installments_exts:
+            imis_product.max_installments = extension.valueUnsignedInt
 
     @classmethod
-    def __build_period_extensions(cls, imis_product, period_exts):
+    def build_imis_period_extensions(cls, imis_product, period_exts):
         if len(period_exts) > 0:
             for i in range(len(period_exts)):
                 value = period_exts[i].valueQuantity.value
@@ -478,7 +500,7 @@ class InsurancePlanConverter(BaseFHIRConverter, ReferenceConverterMixin):
                     imis_product.grace_period_renewal = value
 
     @classmethod
-    def __build_discount_extensions(cls, imis_product, discount_exts):
+    def build_imis_discount_extensions(cls, imis_product, discount_exts):
         if len(discount_exts) > 0:
             for i in range(len(discount_exts)):
                 nested_extension = discount_exts[i].extension
@@ -8,6 +8,7 @@ from api_fhir_r4.utils import DbManagerUtils
 
 
 class LocationSiteConverter(BaseFHIRConverter, ReferenceConverterMixin):
+    select_related_fields = ('location',)
 
     @classmethod
     def to_fhir_obj(cls, imis_hf, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
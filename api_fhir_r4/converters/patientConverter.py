@@ -20,10 +20,22 @@ from fhir.resources.patient import Patient, PatientContact
 from fhir.resources.extension import Extension
 from fhir.resources.attachment import Attachment
 from api_fhir_r4.exceptions import FHIRException
+from api_fhir_r4.identity_map import IdentityMap
+from api_fhir_r4.reference_data import reference_data
 from api_fhir_r4.utils import TimeUtils, DbManagerUtils
 
 
 class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConverterMixin):
+    select_related_fields = ('gender', 'type_of_id', 'education', 'profession', 'relationship', 'health_facility',
+                             'family__head_insuree', 'family__location__parent__parent__parent',
+                             'current_village__parent__parent__parent')
+    imis_extension_handlers = {
+        'patient-is-head': 'build_imis_is_head_extension',
+        'patient-education-level': 'build_imis_education_extension',
+        'patient-profession': 'build_imis_profession_extension',
+        'patient-card-issued': 'build_imis_card_issued_extension',
+        'patient-identification': 'build_imis_identification_extension',
+    }
 
     @classmethod
     def to_fhir_obj1(cls, imis_insuree, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
@@ -53,17 +65,28 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
     def to_fhir_obj(cls, imis_insuree, reference_type=ReferenceConverterMixin.UUID_REFERENCE_TYPE):
         fhir_patient = Patient.construct()
         cls.build_fhir_pk(fhir_patient, imis_insuree, reference_type)
-        cls.build_human_names(fhir_patient, imis_insuree)
-        cls.build_fhir_identifiers(fhir_patient, imis_insuree)
-        cls.build_fhir_birth_date(fhir_patient, imis_insuree)
-        cls.build_fhir_gender(fhir_patient, imis_insuree)
-        cls.build_fhir_marital_status(fhir_patient, imis_insuree)
-        cls.build_fhir_telecom(fhir_patient, imis_insuree)
-        cls.build_fhir_addresses(fhir_patient, imis_insuree, reference_type)
-        cls.build_fhir_extentions(fhir_patient, imis_insuree, reference_type)
-        cls.build_fhir_contact(fhir_patient, imis_insuree)
-        cls.build_fhir_photo(fhir_patient, imis_insuree)
-        cls.build_fhir_general_practitioner(fhir_patient, imis_insuree, reference_type)
+        if cls.is_element_requested(fhir_patient, 'name'):
+            cls.build_human_names(fhir_patient, imis_insuree)
+        if cls.is_element_requested(fhir_patient, 'identifier'):
+            cls.build_fhir_identifiers(fhir_patient, imis_insuree)
+        if cls.is_element_requested(fhir_patient, 'birthDate'):
+            cls.build_fhir_birth_date(fhir_patient, imis_insuree)
+        if cls.is_element_requested(fhir_patient, 'gender'):
+            cls.build_fhir_gender(fhir_patient, imis_insuree)
+        if cls.is_element_requested(fhir_patient, 'maritalStatus'):
+            cls.build_fhir_marital_status(fhir_patient, imis_insuree)
+        if cls.is_element_requested(fhir_patient, 'telecom'):
+            cls.build_fhir_telecom(fhir_patient, imis_insuree)
+        if cls.is_element_requested(fhir_patient, 'address'):
+            cls.build_fhir_addresses(fhir_patient, imis_insuree, reference_type)
+        if cls.is_element_requested(fhir_patient, 'extension'):
+            cls.build_fhir_extentions(fhir_patient, imis_insuree, reference_type)
+        if cls.is_element_requested(fhir_patient, 'contact'):
+            cls.build_fhir_contact(fhir_patient, imis_insuree)
+        if cls.is_element_requested(fhir_patient, 'photo'):
+            cls.build_fhir_photo(fhir_patient, imis_insuree)
+        if cls.is_element_requested(fhir_patient, 'generalPractitioner'):
+            cls.build_fhir_general_practitioner(fhir_patient, imis_insuree, reference_type)
         return fhir_patient
 
     
@@ -113,41 +136,50 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
     @classmethod
     def build_imis_extentions(cls, imis_insuree, fhir_patient, errors):
         cls._validate_fhir_extension_is_exist(fhir_patient)
+        handlers = cls.get_imis_extension_handlers()
         for extension in fhir_patient.extension:
-            if extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-is-head":
-                imis_insuree.head = extension.valueBoolean
+            handler = handlers.get(extension.url)
+            if handler:
+                handler(imis_insuree, fhir_patient, extension)
+        cls._validate_imis_is_head(imis_insuree)
 
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-education-level":
-                try:
-                    imis_insuree.education = Education.objects.get(id=extension.valueCodeableConcept.coding[0].code)
-                except Exception:
-                    imis_insuree.education = None
+    @classmethod
+    def build_imis_is_head_extension(cls, imis_insuree, fhir_patient, extension):
+        imis_insuree.head = extension.valueBoolean
 
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-profession":
-                try:
-                    imis_insuree.profession = Profession.objects.get(id=extension.valueCodeableConcept.coding[0].code)
-                except Exception:
-                    imis_insuree.profession = None
+    @classmethod
+    def build_imis_education_extension(cls, imis_insuree, fhir_patient, extension):
+        try:
+            imis_insuree.education = reference_data.get(Education, id=extension.valueCodeableConcept.coding[0].code)
+        except Exception:
+            imis_insuree.education = None
 
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-card-issued":
-                try:
-                    imis_insuree.card_issued = extension.valueBoolean
-                except Exception:
-                    imis_insuree.card_issued = False
+    @classmethod
+    def build_imis_profession_extension(cls, imis_insuree, fhir_patient, extension):
+        try:
+            imis_insuree.profession = reference_data.get(Profession, id=extension.valueCodeableConcept.coding[0].code)
+        except Exception:
+            imis_insuree.profession = None
 
-            elif extension.url == f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-identification":
-                try:
-                    for ext in extension.extension:
-                        if ext.url == "number":
-                            imis_insuree.passport = ext.valueString
-                        if ext.url == "type":
-                            imis_insuree.type_of_id = IdentificationType.objects.get(code=ext.valueCodeableConcept.coding[0].code)
-                except Exception:
-                    imis_insuree.passport = None
-                    imis_insuree.type_of_id = None
-            else:
-                pass
-        cls._validate_imis_is_head(imis_insuree)
+    @classmethod
+    def build_imis_card_issued_extension(cls, imis_insuree, fhir_patient, extension):
+        try:
+            imis_insuree.card_issued = extension.valueBoolean
+        except Exception:
+            imis_insuree.card_issued = False
+
+    @classmethod
+    def build_imis_identification_extension(cls, imis_insuree, fhir_patient, extension):
+        try:
+            for ext in extension.extension:
+                if ext.url == "number":
+                    imis_insuree.passport = ext.valueString
+                if ext.url == "type":
+                    imis_insuree.type_of_id = reference_data.get(
+                        IdentificationType, code=ext.valueCodeableConcept.coding[0].code)
+        except Exception:
+            imis_insuree.passport = None
+            imis_insuree.type_of_id = None
     
     @classmethod
     def get_location_reference(cls, location):
@@ -277,7 +309,7 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
                             if "CodeSystem/patient-contact-relationship" in coding.system:
                                 relationship_name = coding.display
                     try:
-                        relation = Relation.objects.get(relation=relationship_name)
+                        relation = reference_data.get(Relation, relation=relationship_name)
                         imis_insuree.relationship = relation
                     except:
                         pass
@@ -349,11 +381,12 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
         addresses = []
 
         # If family doesn't have location assigned then use family location
-        if imis_insuree.current_village:
+        family = IdentityMap.get_related_object(imis_insuree, 'family')
+        if IdentityMap.get_related_object(imis_insuree, 'current_village'):
             insuree_address = cls._build_insuree_address(imis_insuree, reference_type)
             addresses.append(insuree_address)
-        elif imis_insuree.family and imis_insuree.family.location:
-            family_address = cls._build_insuree_family_address(imis_insuree.family, reference_type)
+        elif family and IdentityMap.get_related_object(family, 'location'):
+            family_address = cls._build_insuree_family_address(family, reference_type)
             addresses.append(family_address)
 
         fhir_patient.address = addresses
@@ -528,9 +561,10 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
     @classmethod
     def build_fhir_general_practitioner(cls, fhir_patient, imis_insuree, reference_type):
         from api_fhir_r4.converters import HealthFacilityOrganisationConverter
-        if imis_insuree.health_facility:
+        health_facility = IdentityMap.get_related_object(imis_insuree, 'health_facility')
+        if health_facility:
             hf = HealthFacilityOrganisationConverter.build_fhir_resource_reference(
-                imis_insuree.health_facility,
+                health_facility,
                 'Organization',
                 reference_type=reference_type
             )
@@ -760,15 +794,22 @@ class PatientConverter(BaseFHIRConverter, PersonConverterMixin, ReferenceConvert
 
     @classmethod
     def __state_name_from_physical_location(cls, insuree_family_location):
-        return insuree_family_location.parent.parent.parent.name
+        return cls.__get_location_ancestor(insuree_family_location, 3).name
 
     @classmethod
     def __district_name_from_physical_location(cls, insuree_family_location):
-        return insuree_family_location.parent.parent.name
+        return cls.__get_location_ancestor(insuree_family_location, 2).name
 
     @classmethod
     def __municipality_from_family_location(cls, insuree_family_location):
-        return insuree_family_location.parent.name
+        return cls.__get_location_ancestor(insuree_family_location, 1).name
+
+    @classmethod
+    def __get_location_ancestor(cls, location, level):
+        # Villages of patients in one response share their municipalities, districts and regions
+        for _ in range(level):
+            location = IdentityMap.get_related_object(location, 'parent')
+        return location
 
     @classmethod
     def __village_name_from_physical_location(cls, insuree_family_location):
@@ -4,6 +4,7 @@ import logging
 from typing import Tuple
 
 from api_fhir_r4.exceptions import FHIRRequestProcessException
+from api_fhir_r4.identity_map import IdentityMap
 from fhir.resources.reference import Reference
 
 
@@ -37,6 +38,17 @@ class ReferenceConverterMixin(object):
 
     @classmethod
     def build_fhir_resource_reference(cls, obj, type=None, display=None, reference_type=UUID_REFERENCE_TYPE):
+        identity_map = IdentityMap.get_active()
+        if identity_map is None or not hasattr(obj, '_meta') or obj.pk is None:
+            return cls._build_fhir_resource_reference(obj, type, display, reference_type)
+
+        # References to one object are built once per request, callers get a copy they can modify
+        key = (cls, obj._meta.label_lower, obj.pk, type, display, reference_type)
+        return identity_map.get_reference(
+            key, lambda: cls._build_fhir_resource_reference(obj, type, display, reference_type)).copy()
+
+    @classmethod
+    def _build_fhir_resource_reference(cls, obj, type, display, reference_type):
         reference = Reference.construct()
 
         resource_type = type if type else cls.__get_fhir_resource_type_as_string()
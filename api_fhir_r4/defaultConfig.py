@@ -12,6 +12,14 @@ DEFAULT_CFG = {
     "default_value_of_location_care_type": "B",
     "default_response_page_size": 10,
     "claim_rule_engine_validation": True,
+    "bundle_streaming_min_page_size": None,
+    "bundle_strict_validation": False,
+    "keyset_pagination_default": False,
+    "rendered_resource_cache_timeout": 600,
+    "rendered_resource_cache_lru_size": 1000,
+    "reference_data_cache_timeout": 300,
+    "dict_emitter_resources": ["Patient", "Claim", "ClaimResponse", "Coverage"],
+    "eligibility_cache_timeout": 60,
     "R4_fhir_identifier_type_config": {
         "system": "https://openimis.github.io/openimis_fhir_r4_ig/CodeSystem/openimis-identifiers",
         "fhir_code_for_imis_db_uuid_type": "UUID",
@@ -110,7 +118,9 @@ DEFAULT_CFG = {
         "fhir_is_service_ok_code": "is_service_ok",
         "fhir_balance_code": "balance",
         "fhir_balance_default_category": "medical",
-        "fhir_active_policy_status": ("A", 2)
+        "fhir_active_policy_status": ("A", 2),
+        "fhir_eligibility_engine": "stored_procedure",
+        "fhir_eligibility_engine_cross_check": False
     },
     "R4_fhir_communication_request_config": {
         "fhir_care_rendered_code": "CareRendered",
@@ -185,7 +195,12 @@ DEFAULT_CFG = {
         "fhir_sub_status_off": "off",
         "fhir_sub_status_active": "active",
         "get_fhir_sub_criteria_key_resource": "resource",
-        "get_fhir_sub_criteria_key_resource_type": "resource_type"
+        "get_fhir_sub_criteria_key_resource_type": "resource_type",
+        "fhir_sub_notification_outbox": False,
+        "fhir_sub_notification_concurrency": 10,
+        "fhir_sub_notification_max_attempts": 5,
+        "fhir_sub_notification_retry_delay": 60,
+        "fhir_sub_index_timeout": 60
     },
     "R4_fhir_payment_notice_config": {
         "get_fhir_payment_notice_status_active": "active",
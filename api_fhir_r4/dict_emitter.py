@@ -0,0 +1,80 @@
+from fhir.resources.fhirabstractmodel import FHIR_COMMENTS_FIELD_NAME, FHIRAbstractModel
+from pydantic.utils import ROOT_KEY, sequence_like
+
+
+class FHIRDictEmitter:
+    """
+    Fast equivalent of FHIRAbstractModel.dict() for resources built by converters. Elements emitted for every
+    model class (element order, aliases, primitive extensions) are compiled once, resources are then turned
+    into JSON-ready dicts without the per element reflection of fhir.resources.
+
+    Output is equal to resource.dict() with default arguments, see BaseFHIRSerializer.fhir_obj_to_dict().
+    """
+    _plans = {}
+
+    @classmethod
+    def emit(cls, fhir_obj: FHIRAbstractModel) -> dict:
+        return cls._emit_model(fhir_obj)
+
+    @classmethod
+    def _emit_model(cls, fhir_obj):
+        model_class = type(fhir_obj)
+        plan = cls._plans.get(model_class)
+        if plan is None:
+            plan = cls._plans[model_class] = cls._compile_plan(model_class)
+        has_resource_base, elements = plan
+
+        values = fhir_obj.__dict__
+        result = {}
+        if has_resource_base:
+            result['resourceType'] = fhir_obj.resource_type
+        for field_key, dict_key, ext_key, ext_dict_key in elements:
+            value = values.get(field_key)
+            if value is None:
+                continue
+            value = cls._emit_value(value)
+            if value is not None:
+                result[dict_key] = value
+            if ext_key is not None:
+                ext_value = values.get(ext_key)
+                if ext_value is not None:
+                    ext_value = cls._emit_value(ext_value)
+                    if ext_value:
+                        result[ext_dict_key] = ext_value
+        comments = values.get(FHIR_COMMENTS_FIELD_NAME)
+        if comments is not None:
+            result[FHIR_COMMENTS_FIELD_NAME] = comments
+        return result
+
+    @classmethod
+    def _emit_value(cls, value):
+        if isinstance(value, FHIRAbstractModel):
+            value = cls._emit_model(value)
+            if ROOT_KEY in value:
+                return value[ROOT_KEY]
+        elif isinstance(value, list):
+            value = [cls._emit_value(item) for item in value]
+        elif isinstance(value, dict):
+            value = {key: cls._emit_value(item) for key, item in value.items()}
+        elif sequence_like(value):
+            value = value.__class__(cls._emit_value(item) for item in value)
+        else:
+            return value
+        # Empty elements are omitted the same way as by dict()
+        return value if len(value) > 0 else None
+
+    @classmethod
+    def _compile_plan(cls, model_class):
+        alias_mapping = model_class.get_alias_mapping()
+        fields = model_class.__fields__
+        elements = []
+        for element in model_class.elements_sequence():
+            field_key = alias_mapping[element]
+            field = fields[field_key]
+            ext_key, ext_dict_key = None, None
+            if getattr(field.type_, 'is_primitive', lambda: False)() or field.type_ is bool:
+                ext_field = fields.get(f'{field_key}__ext')
+                if ext_field is not None:
+                    ext_key, ext_dict_key = ext_field.name, ext_field.alias or ext_field.name
+            elements.append((field_key, field.alias or field_key, ext_key, ext_dict_key))
+        return model_class.has_resource_base(), tuple(elements)
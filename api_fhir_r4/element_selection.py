@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from rest_framework.serializers import ValidationError
+
+# Element selection and converter class of the top level resource being converted
+_active_selection = ContextVar('fhir_element_selection', default=None)
+
+
+class ElementSelection:
+    """
+    Top level elements of returned resources requested with FHIR `_elements` or `_summary` parameter,
+    see http://hl7.org/fhir/R4/search.html#elements and http://hl7.org/fhir/R4/search.html#summary.
+    Converters skip building of elements which are not requested, representations are pruned afterwards.
+    """
+    elements_query_param = '_elements'
+    summary_query_param = '_summary'
+
+    SUMMARY_TRUE = 'true'
+    SUMMARY_TEXT = 'text'
+    SUMMARY_DATA = 'data'
+    SUMMARY_COUNT = 'count'
+    SUMMARY_FALSE = 'false'
+
+    # Elements returned regardless of the selection
+    mandatory_elements = ('resourceType', 'id', 'meta', 'implicitRules')
+    subsetted_tag = {'system': 'http://terminology.hl7.org/CodeSystem/v3-ObservationValue', 'code': 'SUBSETTED'}
+
+    # Elements marked as part of summary (isSummary) in FHIR R4, resources not listed are returned entirely
+    summary_elements = {
+        'Patient': {'identifier', 'active', 'name', 'telecom', 'gender', 'birthDate', 'deceasedBoolean',
+                    'deceasedDateTime', 'address', 'managingOrganization', 'link'},
+        'Group': {'identifier', 'active', 'type', 'actual', 'code', 'name', 'quantity', 'managingEntity'},
+        'Claim': {'status', 'type', 'use', 'patient', 'billablePeriod', 'created', 'insurer', 'provider', 'priority',
+                  'insurance'},
+        'ClaimResponse': {'status', 'type', 'use', 'patient', 'created', 'insurer', 'request', 'outcome', 'total'},
+        'Coverage': {'identifier', 'status', 'type', 'policyHolder', 'subscriber', 'subscriberId', 'beneficiary',
+                     'dependent', 'period', 'payor', 'order', 'network'},
+        'InsurancePlan': {'identifier', 'status', 'type', 'name', 'ownedBy', 'administeredBy', 'coverageArea'},
+        'Location': {'identifier', 'status', 'operationalStatus', 'name', 'description', 'mode', 'type',
+                     'physicalType', 'managingOrganization'},
+        'Medication': {'identifier', 'code', 'status', 'manufacturer', 'amount'},
+        'Organization': {'identifier', 'active', 'type', 'name', 'partOf'},
+        'Practitioner': {'identifier', 'active', 'name', 'telecom', 'address', 'gender', 'birthDate'},
+        'PractitionerRole': {'identifier', 'active', 'period', 'practitioner', 'organization', 'code', 'specialty',
+                             'location', 'healthcareService', 'telecom', 'endpoint'},
+        'Contract': {'identifier', 'url', 'version', 'status', 'legalState', 'instantiatesCanonical',
+                     'instantiatesUri', 'contentDerivative', 'issued', 'applies', 'expirationType', 'subject',
+                     'authority', 'domain', 'site', 'name', 'title', 'subtitle', 'alias', 'author', 'scope',
+                     'topicCodeableConcept', 'topicReference', 'type', 'subType'},
+    }
+
+    def __init__(self, elements=None, summary=None):
+        self.elements = frozenset(elements) if elements is not None else None
+        self.summary = summary
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Returns selection requested by query parameters, None if the whole resources are requested or there is
+        no request (e.g. queryset of a view built for schema generation).
+        """
+        if request is None:
+            return None
+        query_params = getattr(request, 'query_params', None)
+        if query_params is None:
+            query_params = request.GET
+        elements = query_params.get(cls.elements_query_param)
+        if elements:
+            return cls(elements={element.strip() for element in elements.split(',') if element.strip()})
+
+        summary = query_params.get(cls.summary_query_param)
+        if summary in (cls.SUMMARY_TRUE, cls.SUMMARY_TEXT, cls.SUMMARY_DATA):
+            return cls(summary=summary)
+        if summary not in (None, cls.SUMMARY_FALSE, cls.SUMMARY_COUNT):
+            raise ValidationError({cls.summary_query_param: f'Unsupported value: {summary}'})
+        return None
+
+    @classmethod
+    def includes_element(cls, selection, resource_type, element):
+        return selection is None or selection.includes(resource_type, element)
+
+    def includes(self, resource_type, element):
+        # Primitive extensions (e.g. `_birthDate`) follow the element
+        element = element.lstrip('_')
+        if element in self.mandatory_elements:
+            return True
+        if self.elements is not None:
+            return element in self.elements
+        if self.summary == self.SUMMARY_DATA:
+            return element != 'text'
+        if self.summary == self.SUMMARY_TEXT:
+            return element == 'text'
+        summary_elements = self.summary_elements.get(resource_type)
+        return summary_elements is None or element in summary_elements
+
+    def prune(self, fhir_dict):
+        resource_type = fhir_dict.get('resourceType')
+        pruned = {key: value for key, value in fhir_dict.items() if self.includes(resource_type, key)}
+        meta = dict(pruned.get('meta') or {})
+        meta['tag'] = [*meta.get('tag', []), dict(self.subsetted_tag)]
+        pruned['meta'] = meta
+        return pruned
+
+    @property
+    def cache_key(self):
+        if self.elements is not None:
+            return f"elements={','.join(sorted(self.elements))}"
+        return f'summary={self.summary}'
+
+    @contextmanager
+    def activate(self, converter):
+        """
+        Makes the selection available to `converter` building top level resource,
+        see BaseFHIRConverter.is_element_requested().
+        """
+        token = _active_selection.set((self, converter))
+        try:
+            yield self
+        finally:
+            _active_selection.reset(token)
+
+    @classmethod
+    def is_requested(cls, converter, resource_type, element):
+        active = _active_selection.get()
+        if active is None:
+            return True
+        selection, active_converter = active
+        # Resources nested in the top level one (e.g. contained) are built entirely
+        return converter is not active_converter or selection.includes(resource_type, element)
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.db.models.signals import post_delete, post_save
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from claim.models import Claim, ClaimItem, ClaimService
+from insuree.models import Insuree, InsureePolicy
+from policy.models import Policy
+
+
+class EligibilityResponseCache:
+    """
+    Process wide cache of CoverageEligibilityResponses keyed by (chf_id, service_code, item_code, reference_type).
+    Entries expire after `eligibility_cache_timeout` seconds. Entries of an insuree are dropped in the process
+    when the insuree, policy of its family, its insuree policy, its claim or an item or service of the claim is
+    saved or deleted, and after insuree, policy and claim services (see signals.bind_service_signals). Changes
+    bypassing both (e.g. queryset.update() of claim or policy statuses) and changes made by other processes
+    are picked up when the entry expires.
+    """
+    # Least recently used entries are evicted once the cache grows over this size
+    max_entries = 10000
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._connected = False
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, fhir_response, chf_id):
+        timeout = GeneralConfiguration.get_eligibility_cache_timeout()
+        if not timeout:
+            return
+        self._connect_invalidation()
+        insurees = Insuree.objects.filter(chf_id=chf_id).values_list('id', 'family_id')
+        insuree_ids = frozenset(insuree_id for insuree_id, _ in insurees)
+        family_ids = frozenset(family_id for _, family_id in insurees if family_id is not None)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = OrderedDict(
+                    (key, entry) for key, entry in self._entries.items() if entry[3] > now)
+            self._entries[key] = (fhir_response, insuree_ids, family_ids, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, insuree_id=None, family_id=None, chf_id=None):
+        if not self._entries:
+            return
+        with self._lock:
+            self._entries = OrderedDict(
+                (key, entry) for key, entry in self._entries.items()
+                if key[0] != chf_id and insuree_id not in entry[1] and family_id not in entry[2]
+            )
+
+    def invalidate_claim(self, claim_id):
+        if not self._entries:
+            return
+        insuree_id = Claim.objects.filter(id=claim_id).values_list('insuree_id', flat=True).first()
+        if insuree_id is not None:
+            self.invalidate(insuree_id=insuree_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+
+    def _connect_invalidation(self):
+        if self._connected:
+            return
+        with self._lock:
+            if self._connected:
+                return
+            for signal in (post_save, post_delete):
+                signal.connect(self._on_insuree_changed, sender=Insuree, weak=False)
+                signal.connect(self._on_policy_changed, sender=Policy, weak=False)
+                signal.connect(self._on_insuree_related_changed, sender=InsureePolicy, weak=False)
+                signal.connect(self._on_insuree_related_changed, sender=Claim, weak=False)
+                signal.connect(self._on_claim_detail_changed, sender=ClaimItem, weak=False)
+                signal.connect(self._on_claim_detail_changed, sender=ClaimService, weak=False)
+            self._connected = True
+
+    def _on_insuree_changed(self, sender, instance, **kwargs):
+        self.invalidate(insuree_id=instance.id, family_id=instance.family_id, chf_id=instance.chf_id)
+
+    def _on_policy_changed(self, sender, instance, **kwargs):
+        self.invalidate(family_id=instance.family_id)
+
+    def _on_insuree_related_changed(self, sender, instance, **kwargs):
+        self.invalidate(insuree_id=instance.insuree_id)
+
+    def _on_claim_detail_changed(self, sender, instance, **kwargs):
+        self.invalidate_claim(instance.claim_id)
+
+
+eligibility_response_cache = EligibilityResponseCache()
@@ -0,0 +1,283 @@
+import calendar
+from collections import defaultdict
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, Lower
+
+from api_fhir_r4.utils import TimeUtils
+from claim.models import Claim, ClaimItem, ClaimService
+from insuree.models import Insuree, InsureePolicy
+from medical.models import Item, Service
+from policy.models import Policy
+from policy.services import EligibilityResponse
+
+
+class EligibilityEngine:
+    """
+    Python implementation of `uspServiceItemEnquiry` working on any database backend. Remaining admissions,
+    visits, amounts and service/item limits of all the requests are computed with a fixed number of queries,
+    regardless of the number of requests. Rules follow policy.services.NativeEligibilityService, except that
+    a service/item not covered by any active policy of the insuree has no use left.
+
+    Values are normalised the same way as results of the stored procedure, see
+    CoverageEligibilityRequestConverter.evaluate_eligibility().
+    """
+    # Attributes compared when results are cross-checked against the stored procedure
+    compared_fields = (
+        'prod_id', 'total_admissions_left', 'total_visits_left', 'total_consultations_left',
+        'total_surgeries_left', 'total_deliveries_left', 'total_antenatal_left', 'consultation_amount_left',
+        'surgery_amount_left', 'delivery_amount_left', 'hospitalization_amount_left', 'antenatal_amount_left',
+        'min_date_service', 'min_date_item', 'service_left', 'item_left', 'is_item_ok', 'is_service_ok'
+    )
+
+    total_categories = {
+        'total_admissions': Service.CATEGORY_HOSPITALIZATION,
+        'total_visits': Service.CATEGORY_VISIT,
+        'total_consultations': Service.CATEGORY_CONSULTATION,
+        'total_surgeries': Service.CATEGORY_SURGERY,
+        'total_deliveries': Service.CATEGORY_DELIVERY,
+        'total_antenatal': Service.CATEGORY_ANTENATAL,
+    }
+
+    total_limit_fields = {
+        'total_admissions': 'policy__product__max_no_hospitalization',
+        'total_visits': 'policy__product__max_no_visits',
+        'total_consultations': 'policy__product__max_no_consultation',
+        'total_surgeries': 'policy__product__max_no_surgery',
+        'total_deliveries': 'policy__product__max_no_delivery',
+        'total_antenatal': 'policy__product__max_no_antenatal',
+    }
+
+    amount_fields = {
+        'consultation_amount_left': 'policy__product__max_amount_consultation',
+        'surgery_amount_left': 'policy__product__max_amount_surgery',
+        'delivery_amount_left': 'policy__product__max_amount_delivery',
+        'hospitalization_amount_left': 'policy__product__max_amount_hospitalization',
+        'antenatal_amount_left': 'policy__product__max_amount_antenatal',
+    }
+
+    # Service categories also limited by the total number of claims and the max amount of the product
+    service_category_limits = {
+        Service.CATEGORY_SURGERY: ('total_surgeries_left', 'policy__product__max_amount_surgery'),
+        Service.CATEGORY_CONSULTATION: ('total_consultations_left', 'policy__product__max_amount_consultation'),
+        Service.CATEGORY_DELIVERY: ('total_deliveries_left', 'policy__product__max_amount_delivery'),
+    }
+
+    @classmethod
+    def evaluate_many(cls, eligibility_requests):
+        """
+        Returns {key: EligibilityResponse} for {key: EligibilityRequest}. Requests which can't be evaluated
+        (unknown insuree, service or item) are left out of the result.
+        """
+        if not eligibility_requests:
+            return {}
+        today = TimeUtils.date()
+        insurees = cls.load_insurees({request.chf_id for request in eligibility_requests.values()})
+        insuree_ids = {insuree.id for insuree in insurees.values()}
+        totals = cls.load_totals(insuree_ids)
+        services = cls.load_by_code(Service, {r.service_code for r in eligibility_requests.values() if r.service_code})
+        items = cls.load_by_code(Item, {r.item_code for r in eligibility_requests.values() if r.item_code})
+        service_limits = cls.load_limits('service', insuree_ids, {service.id for service in services.values()})
+        item_limits = cls.load_limits('item', insuree_ids, {item.id for item in items.values()})
+        service_usage = cls.load_usage(ClaimService, 'service', insuree_ids, {s.id for s in services.values()})
+        item_usage = cls.load_usage(ClaimItem, 'item', insuree_ids, {i.id for i in items.values()})
+
+        evaluations = {}
+        for key, request in eligibility_requests.items():
+            insuree = insurees.get(request.chf_id)
+            service = services.get(request.service_code) if request.service_code else None
+            item = items.get(request.item_code) if request.item_code else None
+            if insuree is None or (request.service_code and service is None) or (request.item_code and item is None):
+                continue
+            is_adult = bool(insuree.is_adult())
+            min_date_service, service_left = cls.get_limit(
+                service, service_limits[insuree.id], service_usage[insuree.id], is_adult, today)
+            min_date_item, item_left = cls.get_limit(
+                item, item_limits[insuree.id], item_usage[insuree.id], is_adult, today)
+            evaluations[key] = cls.build_response(
+                request, totals.get(insuree.id), service, min_date_service, service_left, item, min_date_item,
+                item_left, today)
+        return evaluations
+
+    @classmethod
+    def load_insurees(cls, chf_ids):
+        insurees = {}
+        for insuree in Insuree.objects.filter(chf_id__in=chf_ids, validity_to__isnull=True).order_by('id'):
+            insurees.setdefault(insuree.chf_id, insuree)
+        return insurees
+
+    @classmethod
+    def load_by_code(cls, model, codes):
+        """
+        Returns {requested code: Service/Item}, the exact code is preferred over a case insensitive match.
+        """
+        if not codes:
+            return {}
+        objects = {}
+        for obj in model.objects.filter(code__in=codes, validity_to__isnull=True).order_by('id'):
+            objects.setdefault(obj.code, obj)
+        missing_codes = {code.lower(): code for code in codes if code not in objects}
+        if missing_codes:
+            for obj in model.objects.annotate(code_lower=Lower('code')) \
+                    .filter(code_lower__in=missing_codes.keys(), validity_to__isnull=True).order_by('id'):
+                objects.setdefault(missing_codes[obj.code_lower], obj)
+        return objects
+
+    @classmethod
+    def load_totals(cls, insuree_ids):
+        """
+        Returns {insuree id: row} of the policy with the latest expiry date of each insuree. Rows hold product
+        limits and the number of claims of the insuree per total category.
+        """
+        rows = InsureePolicy.objects \
+            .filter(insuree_id__in=insuree_ids, validity_to__isnull=True, policy__validity_to__isnull=True,
+                    policy__product__validity_to__isnull=True) \
+            .values('insuree_id', 'expiry_date', 'policy__product_id', *cls.total_limit_fields.values(),
+                    *cls.amount_fields.values()) \
+            .annotate(**{
+                total: Count('insuree__claim', filter=cls.get_total_filter(category), distinct=True)
+                for total, category in cls.total_categories.items()
+            }) \
+            .order_by('insuree_id', F('expiry_date').desc(nulls_last=True))
+        totals = {}
+        for row in rows:
+            totals.setdefault(row['insuree_id'], row)
+        return totals
+
+    @classmethod
+    def get_total_filter(cls, category):
+        return Q(
+            insuree__claim__status__gt=Claim.STATUS_ENTERED,
+            insuree__claim__category=category,
+            insuree__claim__validity_to__isnull=True,
+            insuree__claim__services__validity_to__isnull=True,
+        ) & (
+            Q(insuree__claim__services__rejection_reason=0)
+            | Q(insuree__claim__services__rejection_reason__isnull=True)
+        )
+
+    @classmethod
+    def load_limits(cls, item_or_service, insuree_ids, target_ids):
+        """
+        Returns {insuree id: {service/item id: [row]}} with waiting periods and limits of the service/item in
+        every active policy of the insuree.
+        """
+        limits = defaultdict(lambda: defaultdict(list))
+        if not target_ids:
+            return limits
+        prefix = f'policy__product__{item_or_service}s__'
+        rows = InsureePolicy.objects \
+            .filter(**{
+                'insuree_id__in': insuree_ids,
+                'validity_to__isnull': True,
+                'policy__status': Policy.STATUS_ACTIVE,
+                'policy__validity_to__isnull': True,
+                f'{prefix}validity_to__isnull': True,
+                f'{prefix}{item_or_service}_id__in': target_ids,
+            }) \
+            .values(
+                'insuree_id', 'effective_date',
+                target_id=F(f'{prefix}{item_or_service}_id'),
+                waiting_period_adult=F(f'{prefix}waiting_period_adult'),
+                waiting_period_child=F(f'{prefix}waiting_period_child'),
+                limit_no_adult=F(f'{prefix}limit_no_adult'),
+                limit_no_child=F(f'{prefix}limit_no_child'),
+            )
+        for row in rows:
+            limits[row['insuree_id']][row['target_id']].append(row)
+        return limits
+
+    @classmethod
+    def load_usage(cls, model, item_or_service, insuree_ids, target_ids):
+        """
+        Returns {insuree id: {service/item id: quantity}} of the service/item in claims of the insuree.
+        """
+        usage = defaultdict(dict)
+        if not target_ids:
+            return usage
+        rows = model.objects \
+            .filter(**{
+                'claim__insuree_id__in': insuree_ids,
+                f'{item_or_service}_id__in': target_ids,
+                'validity_to__isnull': True,
+                'claim__validity_to__isnull': True,
+                'claim__status__gt': Claim.STATUS_ENTERED,
+            }) \
+            .filter(Q(status=model.STATUS_PASSED) | Q(status__isnull=True)) \
+            .values('claim__insuree_id', f'{item_or_service}_id') \
+            .annotate(quantity=Sum(Coalesce('qty_approved', 'qty_provided'))) \
+            .order_by()
+        for row in rows:
+            usage[row['claim__insuree_id']][row[f'{item_or_service}_id']] = row['quantity'] or 0
+        return usage
+
+    @classmethod
+    def get_limit(cls, target, limits, usage, is_adult, today):
+        """
+        Returns (min date, left) of a service/item. Left is None if the use of the service/item is unlimited.
+        """
+        if target is None:
+            return None, None
+        used = usage.get(target.id, 0)
+        rows = []
+        for row in limits.get(target.id, []):
+            waiting_period = row['waiting_period_adult'] if is_adult else row['waiting_period_child']
+            limit = row['limit_no_adult'] if is_adult else row['limit_no_child']
+            min_date = cls.add_months(row['effective_date'], waiting_period or 0) \
+                if row['effective_date'] else None
+            rows.append((min_date, limit))
+
+        min_dates = [min_date for min_date, _ in rows if min_date is not None]
+        started_min_dates = [min_date for min_date in min_dates if min_date <= today]
+        min_date = min(started_min_dates or min_dates, default=None)
+
+        available = [(min_date, limit) for min_date, limit in rows if min_date is None or min_date <= today]
+        if not rows:
+            left = 0
+        elif any(limit is None for min_date, limit in available if min_date is not None):
+            left = None
+        else:
+            lefts = [max(int(limit - used), 0) for _, limit in available if limit is not None]
+            left = max(lefts) if lefts else (None if available else 0)
+        return min_date, left
+
+    @classmethod
+    def add_months(cls, value, months):
+        month_index = value.month - 1 + months
+        year, month = value.year + month_index // 12, month_index % 12 + 1
+        return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+    @classmethod
+    def build_response(cls, request, total, service, min_date_service, service_left, item, min_date_item,
+                       item_left, today):
+        if total is None:
+            return EligibilityResponse(eligibility_request=request, min_date_service=min_date_service,
+                                       min_date_item=min_date_item)
+
+        totals_left = {}
+        for name, limit_field in cls.total_limit_fields.items():
+            limit = total[limit_field]
+            totals_left[f'{name}_left'] = max(limit - total[name], 0) if limit is not None else None
+
+        is_service_ok = True
+        if service:
+            is_service_ok = service_left != 0 and not (min_date_service and min_date_service > today)
+            if service.category in cls.service_category_limits:
+                total_left_field, max_amount_field = cls.service_category_limits[service.category]
+                max_amount = total[max_amount_field]
+                is_service_ok = is_service_ok and totals_left[total_left_field] != 0 \
+                    and not (max_amount is not None and max_amount <= 0)
+        is_item_ok = item_left != 0 and not (min_date_item and min_date_item > today)
+
+        return EligibilityResponse(
+            eligibility_request=request,
+            prod_id=total['policy__product_id'],
+            min_date_service=min_date_service,
+            min_date_item=min_date_item,
+            service_left=service_left or 0,
+            item_left=item_left or 0,
+            is_item_ok=is_item_ok,
+            is_service_ok=is_service_ok,
+            **{name: value or 0 for name, value in totals_left.items()},
+            **{name: total[field] or 0.0 for name, field in cls.amount_fields.items()},
+        )
@@ -0,0 +1,51 @@
+import threading
+
+from api_fhir_r4.configurations.configurationSnapshot import ConfigurationSnapshot
+
+
+class FragmentCache:
+    """
+    Process wide flyweight cache of FHIR fragments which depend only on module configuration, e.g. type of
+    identifiers or codings of static mappings. Converters share one instance of such fragment between all
+    resources they build, fragments taken from the cache are read-only and must never be modified.
+
+    The cache is dropped when a new module configuration snapshot is built, see
+    ModuleConfiguration.build_configuration().
+    """
+
+    def __init__(self):
+        self._version = None
+        self._fragments = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, builder):
+        """
+        Returns fragment stored under `key`, `builder` is called only for fragments which are not built yet
+        for the current configuration.
+        """
+        version = self._get_configuration_version()
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._fragments = {}
+                    self._version = version
+
+        fragments = self._fragments
+        fragment = fragments.get(key)
+        if fragment is None:
+            fragment = builder()
+            fragments[key] = fragment
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._fragments = {}
+            self._version = None
+
+    @classmethod
+    def _get_configuration_version(cls):
+        snapshot = ConfigurationSnapshot.get_current()
+        return snapshot.version if snapshot is not None else None
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Identity map of the request which resources are being converted
+_active_identity_map = ContextVar('fhir_identity_map', default=None)
+
+
+class IdentityMap:
+    """
+    Request scoped map of IMIS objects and FHIR references built for them. Objects referenced by many resources
+    of one response (e.g. health facility of claims, village of patients) are loaded and turned into a Reference
+    once. Only GET requests have identity map, objects modified by the request are never taken from it.
+    """
+    request_attribute = '_fhir_identity_map'
+
+    def __init__(self):
+        self._objects = {}
+        self._references = {}
+
+    @classmethod
+    def for_request(cls, request):
+        """
+        Returns identity map of the request, None if the request can't use one.
+        """
+        if request is None or request.method != 'GET':
+            return None
+        identity_map = getattr(request, cls.request_attribute, None)
+        if identity_map is None:
+            identity_map = cls()
+            setattr(request, cls.request_attribute, identity_map)
+        return identity_map
+
+    @classmethod
+    def get_active(cls):
+        return _active_identity_map.get()
+
+    @contextmanager
+    def activate(self):
+        """
+        Makes the identity map available to converters, see get_related_object() and
+        ReferenceConverterMixin.build_fhir_resource_reference().
+        """
+        token = _active_identity_map.set(self)
+        try:
+            yield self
+        finally:
+            _active_identity_map.reset(token)
+
+    @classmethod
+    @contextmanager
+    def activate_for_request(cls, request):
+        # Resources nested in the converted one (e.g. contained) use identity map of the top level resource
+        identity_map = cls.get_active() or cls.for_request(request)
+        if identity_map is None or identity_map is cls.get_active():
+            yield identity_map
+        else:
+            with identity_map.activate():
+                yield identity_map
+
+    def get_object(self, model, field_name, value, loader):
+        """
+        Returns object of `model` with `field_name` equal to `value`, `loader` is called only for objects
+        which are not in the map yet.
+        """
+        key = (model._meta.label_lower, field_name, value)
+        if key not in self._objects:
+            self._objects[key] = loader()
+        return self._objects[key]
+
+    def get_reference(self, key, builder):
+        """
+        Returns reference stored under `key`, `builder` is called only for references which are not built yet.
+        """
+        if key not in self._references:
+            self._references[key] = builder()
+        return self._references[key]
+
+    @classmethod
+    def get_related_object(cls, obj, field_name):
+        """
+        Equivalent of getattr(obj, field_name) for foreign keys. Related objects not loaded together with `obj`
+        (e.g. with select_related) are taken from the active identity map.
+        """
+        identity_map = cls.get_active()
+        field = obj._meta.get_field(field_name)
+        related_value = getattr(obj, field.attname)
+        if identity_map is None or related_value is None or field.is_cached(obj):
+            return getattr(obj, field_name)
+
+        related = identity_map.get_object(
+            field.related_model, field.target_field.attname, related_value, lambda: getattr(obj, field_name))
+        field.set_cached_value(obj, related)
+        return related
@@ -0,0 +1,46 @@
+
+from django.core.management.base import BaseCommand
+
+from api_fhir_r4.subscriptions.notificationOutbox import SubscriptionNotificationOutboxWorker
+
+
+class Command(BaseCommand):
+    help = (
+        "This command sends FHIR subscription notifications stored in the outbox. It runs until stopped, "
+        "several instances can run at the same time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            dest="once",
+            help="Exit when no notification is due instead of waiting for new ones",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of notifications claimed at once, by default 100",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Number of notifications sent at the same time, "
+                 "by default fhir_sub_notification_concurrency of the module configuration",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when no notification is due, by default 5",
+        )
+
+    def handle(self, *args, **options):
+        worker = SubscriptionNotificationOutboxWorker(
+            batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+        )
+        processed = worker.run(poll_interval=options["poll_interval"], once=options["once"])
+        self.stdout.write(f"Processed {processed} subscription notifications")
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-17 10:00
+
+import core.datetimes.ad_datetime
+import core.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_fhir_r4', '0006_add_subsription_perms_imis_admin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionNotificationOutbox',
+            fields=[
+                ('id', models.UUIDField(db_column='UUID', default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('payload', models.TextField(db_column='Payload')),
+                ('created_time', core.fields.DateTimeField(db_column='CreatedTime', default=core.datetimes.ad_datetime.AdDatetime.now)),
+                ('next_attempt_time', core.fields.DateTimeField(db_column='NextAttemptTime', db_index=True, default=core.datetimes.ad_datetime.AdDatetime.now)),
+                ('attempts', models.SmallIntegerField(db_column='Attempts', default=0)),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications_pending', to='api_fhir_r4.subscription')),
+            ],
+            options={
+                'db_table': 'tblSubscriptionNotificationOutbox',
+                'managed': True,
+            },
+        ),
+    ]
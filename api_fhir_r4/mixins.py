@@ -7,6 +7,7 @@ from django.http import Http404
 
 from rest_framework import mixins
 
+from api_fhir_r4.conditional_requests import get_not_modified_response, set_validator_headers
 from api_fhir_r4.model_retrievers import GenericModelRetriever
 from rest_framework.response import Response
 
@@ -49,7 +50,12 @@ class MultiIdentifierRetrieverMixin(mixins.RetrieveModelMixin, GenericMultiIdent
     def retrieve(self, request, *args, **kwargs):
         ref_type, instance = self._get_object_with_first_valid_retriever(kwargs['identifier'])
         serializer = self.get_serializer(instance, reference_type=ref_type)
-        return Response(serializer.data)
+        # Conditional request is resolved before the resource is converted
+        etag, last_modified = serializer.get_resource_validators([instance], self.request, ref_type)
+        not_modified = get_not_modified_response(self.request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validator_headers(Response(serializer.data), etag, last_modified)
 
 
 class MultiIdentifierUpdateMixin(mixins.UpdateModelMixin, GenericMultiIdentifierMixin, ABC):
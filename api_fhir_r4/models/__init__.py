@@ -12,5 +12,22 @@ from api_fhir_r4.models.fhirModels import (
 from api_fhir_r4.models.imisModelEnums import BundleType
 from api_fhir_r4.models.subscription import (
     Subscription,
-    SubscriptionNotificationResult
+    SubscriptionNotificationResult,
+    SubscriptionNotificationOutbox
 )
+
+__all__ = [
+    'OperationOutcomeV2',
+    'UsageContextV2',
+    'CoverageV2',
+    'CoverageClassV2',
+    'ContractSignerV2',
+    'ClaimV2',
+    'ClaimInsuranceV2',
+    'ClaimResponseV2',
+    'CoverageEligibilityRequestV2',
+    'BundleType',
+    'Subscription',
+    'SubscriptionNotificationResult',
+    'SubscriptionNotificationOutbox',
+]
@@ -51,3 +51,29 @@ class SubscriptionNotificationResult(models.Model):
     class Meta:
         managed = True
         db_table = 'tblSubscriptionNotificationResult'
+
+
+class SubscriptionNotificationOutboxManager(models.Manager):
+    def due(self, now=None):
+        return self.get_queryset().filter(next_attempt_time__lte=now or ad_datetime.AdDatetime.now())
+
+
+class SubscriptionNotificationOutbox(models.Model):
+    """
+    Notification waiting for delivery to a subscriber. Entries are written in the transaction of the change
+    they notify about and are delivered by the `deliver_subscription_notifications` command.
+    """
+    id = models.UUIDField(primary_key=True, db_column="UUID", default=uuid.uuid4, editable=False)
+    subscription = models.ForeignKey(
+        Subscription, on_delete=models.CASCADE, related_name='notifications_pending', null=False)
+    payload = models.TextField(db_column='Payload', null=False)
+    created_time = DateTimeField(db_column='CreatedTime', null=False, default=ad_datetime.AdDatetime.now)
+    next_attempt_time = DateTimeField(
+        db_column='NextAttemptTime', null=False, default=ad_datetime.AdDatetime.now, db_index=True)
+    attempts = models.SmallIntegerField(db_column='Attempts', null=False, default=0)
+
+    objects = SubscriptionNotificationOutboxManager()
+
+    class Meta:
+        managed = True
+        db_table = 'tblSubscriptionNotificationOutbox'
@@ -201,74 +201,64 @@ class MultiSerializerCreateModelMixin(GenericMultiSerializerViewsetMixin, ABC):
         self.validate_single_eligible_serializer()
 
 
-class _JoinedQuerysets:
+class JoinedQuerysets:
+    """
+    Querysets (or lists) concatenated into single sequence which can be paginated. Slices are pushed down to the
+    underlying querysets as LIMIT/OFFSET, only querysets preceding the requested slice are counted.
+    """
     def __init__(self, *qs):
         self.querysets = qs
+        self._counts = {}
 
     def __iter__(self):
-        return chain(self.querysets)
+        return chain(*self.querysets)
 
     def __len__(self):
-        return sum([len(qs) for qs in self.querysets])
+        return self.count()
 
     def __getitem__(self, k):
-        if not isinstance(k, (int, slice)):
-            raise TypeError
-
-        return self.__get_queryset_for_item(k)
-
-    def __get_queryset_for_item(self, k):
         if isinstance(k, int):
-            return self.__get_queryset_for_index(k)
-        else:
-            # slice
-            if k.step:
-                raise ValidationError("Step not supported in joined queryset context.")
-            start, end = int(k.start) if k else None, int(k.stop) if k else None
-            intersection = [None, None]
-            final_query = []
-            if start:
-                start_qs, qs_idx = self.__get_queryset_for_index(start)
-                intersection[0] = self.querysets.index(start_qs) + 1
-                start_qs = start_qs.all()[qs_idx:]
-            if end:
-                end_qs, qs_idx = self.__get_queryset_for_index(end)
-                intersection[1] = self.querysets.index(end_qs)
-                end_qs = end_qs.all()[:qs_idx]
-
-            if start:
-                final_query.append(start_qs)
-
-            final_query.extend(self.querysets[intersection[0]:intersection[1]])
-
-            if end:
-                final_query.append(end_qs)
-
-            return list(chain(*final_query))
-
-    def __get_queryset_for_index(self, k):
-        """
-        Return queryset for which given index is relevant. If given index is out of range it raises IndexEr
-        Args:
-            k: index of element.
+            if k < 0:
+                raise IndexError(f"for index {k}")
+            items = self[k:k + 1]
+            if not items:
+                raise IndexError(f"for index {k}")
+            return items[0]
+        if not isinstance(k, slice):
+            raise TypeError
+        if k.step:
+            raise ValidationError("Step not supported in joined queryset context.")
+        if (k.start is not None and k.start < 0) or (k.stop is not None and k.stop < 0):
+            raise ValidationError("Negative indexing not supported in joined queryset context.")
+        return self.__get_slice(k.start or 0, k.stop)
 
-        Returns:
-            Tuple of queryset and index k relative for given queryset
+    def __get_slice(self, start, stop):
+        results = []
+        for idx, qs in enumerate(self.querysets):
+            if stop is not None and stop <= 0:
+                break
+            if start > 0:
+                qs_count = self.__count_queryset(idx)
+                if start >= qs_count:
+                    # Whole queryset precedes the slice
+                    start -= qs_count
+                    stop = stop - qs_count if stop is not None else None
+                    continue
+            chunk = list(qs[start:stop])
+            results.extend(chunk)
+            # Queryset is exhausted if chunk is shorter than requested, next one starts from its beginning
+            stop = stop - start - len(chunk) if stop is not None else None
+            start = 0
+        return results
 
-        """
-        next_queryset_last_index = 0
-        for qs in self.querysets:
-            qs_len = qs.count()
-            next_queryset_last_index += qs_len
-            if k < next_queryset_last_index:
-                index_in_queryset = k - (next_queryset_last_index - qs_len)
-                return qs, index_in_queryset
-            if k == next_queryset_last_index:
-                return qs, 0
-        raise IndexError(f"for index {k}")
+    def __count_queryset(self, idx):
+        if idx not in self._counts:
+            qs = self.querysets[idx]
+            self._counts[idx] = qs.count() if isinstance(qs, QuerySet) else len(qs)
+        return self._counts[idx]
 
     def count(self):
-        return sum([qs.count() for qs in self.querysets])
+        return sum(self.__count_queryset(idx) for idx in range(len(self.querysets)))
 
 
 class MultiSerializerListModelMixin(GenericMultiSerializerViewsetMixin, ABC):
@@ -329,10 +319,7 @@ class MultiSerializerListModelMixin(GenericMultiSerializerViewsetMixin, ABC):
         elif len(querysets) == 1:
             return querysets[0]
         else:
-            # Inefficient due to pulling every entry and not only paginated chunk
-            chained = _JoinedQuerysets(*querysets)
-            # Chain doesn't provide len, but it's required by paginator
-            return chained
+            return JoinedQuerysets(*querysets)
 
 
 class MultiSerializerRetrieveModelMixin(GenericMultiSerializerViewsetMixin, ABC):
@@ -1,11 +1,26 @@
+import datetime
+import decimal
 import hashlib
+import json
 import urllib
+import uuid
+from urllib.parse import urlparse
+
 from api_fhir_r4.configurations import GeneralConfiguration
-from fhir.resources.bundle import Bundle, BundleEntry, BundleLink
+from api_fhir_r4.renderers import FHIRJSONRenderer
+from fhir.resources.bundle import Bundle, BundleEntry
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.serializers import ValidationError
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from django.core import signing
 from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import F, Q
 from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
 
 
 class FhirBundleResultsSetPagination(PageNumberPagination):
@@ -13,20 +28,110 @@ class FhirBundleResultsSetPagination(PageNumberPagination):
     page_size = GeneralConfiguration.get_default_response_page_size()
     page_query_param = 'page-offset'
     page_size_query_param = '_count'
+    cursor_query_param = 'cursor'
+    cursor_salt = 'api_fhir_r4.paginations.FhirBundleResultsSetPagination.cursor'
+
+    total_query_param = '_total'
+    summary_query_param = '_summary'
+
+    TOTAL_NONE = 'none'
+    TOTAL_ESTIMATE = 'estimate'
+    TOTAL_ACCURATE = 'accurate'
+    total_strategies = (TOTAL_NONE, TOTAL_ESTIMATE, TOTAL_ACCURATE)
+
+    cursor_ordering = None
+    cursor_next_position = None
+    bundle_total = None
+    total_strategy = TOTAL_ACCURATE
+    summary_count = False
+    # Absolute URL of the request and base URL of its resources, computed once per request
+    _request_urls = (None, None, None)
 
     def get_paginated_response(self, data):
-        return Response(self.build_bundle_set(data).dict())
+        return Response(self.build_bundle_set(data))
+
+    def get_serializer_paginated_response(self, serializer):
+        """
+        Returns Bundle response for serializer built on top of the current page. Unlike get_paginated_response()
+        the serializer data is not evaluated upfront, so large pages can be streamed entry by entry.
+        """
+        if self.is_streaming_response(serializer):
+            return self.get_streaming_paginated_response(serializer)
+        return self.get_paginated_response(serializer.data)
+
+    def is_streaming_response(self, serializer):
+        min_page_size = GeneralConfiguration.get_bundle_streaming_min_page_size()
+        if min_page_size is None or serializer.instance is None or not hasattr(serializer, 'child'):
+            return False
+        # Streamed entries are always encoded compactly, pretty printed Bundles are rendered in one go
+        if self.summary_count or FHIRJSONRenderer().is_pretty({'request': self.request}):
+            return False
+        return self.get_page_size(self.request) >= min_page_size
+
+    def get_streaming_paginated_response(self, serializer):
+        content_type = getattr(self.request, 'accepted_media_type', None) or FHIRJSONRenderer.media_type
+        return StreamingHttpResponse(self.stream_bundle_set(serializer), content_type=content_type)
+
+    def stream_bundle_set(self, serializer):
+        """
+        Yields Bundle JSON in chunks, the envelope first and then every entry as soon as it's converted.
+        Output is the same as for build_bundle_set(), without keeping the whole searchset in memory.
+        """
+        strict_validation = GeneralConfiguration.get_bundle_strict_validation()
+        bundle = self.build_bundle_envelope()
+        if strict_validation:
+            Bundle(**bundle)
+        # Envelope is opened by dropping closing bracket, entries are appended to it
+        yield self.encode_json(bundle)[:-1]
+
+        separator = b',"entry":['
+        for resource in self.iter_serializer_representation(serializer):
+            entry = self.build_bundle_entry_dict(resource)
+            if strict_validation:
+                entry = BundleEntry(**entry).dict()
+            yield separator + self.encode_json(entry)
+            separator = b','
+        yield b'}' if separator != b',' else b']}'
+
+    def iter_serializer_representation(self, serializer):
+        if hasattr(serializer, 'iter_representation'):
+            return serializer.iter_representation(serializer.instance)
+        return (serializer.child.to_representation(obj) for obj in serializer.instance)
+
+    def build_bundle_entry_dict(self, resource):
+        entry = {}
+        full_url = self.build_full_url_for_resource(resource)
+        if full_url:
+            entry['fullUrl'] = full_url
+        entry['resource'] = resource
+        return entry
+
+    def encode_json(self, data):
+        # Encoding is the same as in renderer used for non streamed responses
+        return FHIRJSONRenderer.dumps(data)
 
     def build_bundle_set(self, data):
-        bundle = Bundle.construct()
-        bundle.type = "searchset"
-        bundle.total = self.page.paginator.count
-        self.build_bundle_links(bundle)
+        """
+        Builds searchset Bundle as plain dict. Resources are already converted by FHIR converters, so they are
+        not validated again unless `bundle_strict_validation` is enabled in the module configuration.
+        """
+        bundle = self.build_bundle_envelope()
         self.build_bundle_entry(bundle, data)
+        if GeneralConfiguration.get_bundle_strict_validation():
+            return Bundle(**bundle).dict()
+        return bundle
+
+    def build_bundle_envelope(self):
+        # Keys follow the order of Bundle elements, the same as in Bundle.dict()
+        bundle = {'resourceType': 'Bundle', 'type': 'searchset'}
+        total = self.get_bundle_total()
+        if total is not None:
+            bundle['total'] = total
+        self.build_bundle_links(bundle)
         return bundle
 
     def build_bundle_links(self, bundle):
-        self.build_bundle_link(bundle, "self", self.request.build_absolute_uri())
+        self.build_bundle_link(bundle, "self", self.get_request_url())
         next_link = self.get_next_link()
         if next_link:
             self.build_bundle_link(bundle, "next", next_link)
@@ -34,33 +139,60 @@ class FhirBundleResultsSetPagination(PageNumberPagination):
         if previous_link:
             self.build_bundle_link(bundle, "previous", previous_link)
 
+    def get_bundle_total(self):
+        return self.bundle_total
+
+    def get_next_link(self):
+        if self.summary_count:
+            return None
+        if self.cursor_ordering:
+            return self.get_next_cursor_link()
+        if not self.page.has_next():
+            return None
+        return replace_query_param(self.get_request_url(), self.page_query_param, self.page.next_page_number())
+
+    def get_previous_link(self):
+        if self.summary_count:
+            return None
+        if self.cursor_ordering:
+            # Cursor pages are meant for forward synchronisation, previous pages are available through page-offset
+            return None
+        if not self.page.has_previous():
+            return None
+        page_number = self.page.previous_page_number()
+        if page_number == 1:
+            return remove_query_param(self.get_request_url(), self.page_query_param)
+        return replace_query_param(self.get_request_url(), self.page_query_param, page_number)
+
     def build_bundle_link(self, bundle, relation, url):
         self_link = {}
-        self_link['url'] = urllib.parse.quote_plus(url)
         self_link['relation'] = relation
-        bundle_link = BundleLink(**self_link)
-        if type(bundle.link) is not list:
-           bundle.link = [bundle_link]
-        else:
-           bundle.link.append(bundle_link)
+        self_link['url'] = urllib.parse.quote_plus(url)
+        bundle.setdefault('link', []).append(self_link)
 
     def build_bundle_entry(self, bundle, data):
-        bundle.entry = []
-        for obj in data:
-            entry = {}
-            entry['fullUrl'] = self.build_full_url_for_resource(obj)
-            entry['resource'] = obj
-            bundle_entry = BundleEntry(**entry)
-            bundle.entry.append(bundle_entry)
+        entries = [self.build_bundle_entry_dict(obj) for obj in data]
+        if entries:
+            bundle['entry'] = entries
 
     def build_full_url_for_resource(self, fhir_object):
-        url = None
         resource_pk = self.get_object_pk(fhir_object)
         if resource_pk:
+            return self.get_resource_base_url() + resource_pk
+        return None
+
+    def get_request_url(self):
+        return self._get_request_urls()[1]
+
+    def get_resource_base_url(self):
+        return self._get_request_urls()[2]
+
+    def _get_request_urls(self):
+        request, _, _ = self._request_urls
+        if request is not self.request:
             url = self.request.build_absolute_uri()
-            url = self.exclude_query_parameter_from_url(url)
-            url = url + resource_pk
-        return url
+            self._request_urls = (self.request, url, self.exclude_query_parameter_from_url(url))
+        return self._request_urls
 
     def get_object_pk(self, fhir_object):
         pk_id = None
@@ -69,29 +201,265 @@ class FhirBundleResultsSetPagination(PageNumberPagination):
         return str(pk_id) if pk_id else None
 
     def exclude_query_parameter_from_url(self, url):
-        try:
-            from urllib.parse import urlparse  # Python 3
-        except ImportError:
-            from urlparse import urlparse  # Python 2
-        o = urlparse(url)
-        return o._replace(query=None).geturl()
+        return urlparse(url)._replace(query=None).geturl()
 
-    def paginate_queryset(self, queryset, *args, **kwargs):
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor_ordering = None
+        self.bundle_total = None
+        self.total_strategy = self.get_total_strategy(request)
+        self.summary_count = self.is_summary_count(request)
         if isinstance(queryset, QuerySet) and hasattr(queryset, 'count'):
             queryset = CachedCountQueryset(queryset)
-        return super().paginate_queryset(queryset, *args, **kwargs)
+            if self.is_cursor_pagination_requested(request):
+                self.cursor_ordering = self.get_keyset_ordering(queryset)
+
+        if self.summary_count:
+            # Only Bundle.total is returned, no entries are fetched
+            self.cursor_ordering = None
+            self.bundle_total = self.get_queryset_total(queryset)
+            return []
+        if self.cursor_ordering or self.total_strategy != self.TOTAL_ACCURATE:
+            self.bundle_total = self.get_queryset_total(queryset)
+        if self.cursor_ordering:
+            return self.paginate_queryset_by_cursor(queryset, request)
+
+        # Without accurate total the page is determined without counting all the rows
+        self.django_paginator_class = DjangoPaginator \
+            if self.total_strategy == self.TOTAL_ACCURATE else UncountedPaginator
+        results = super().paginate_queryset(queryset, request, view)
+        if results is not None and self.total_strategy == self.TOTAL_ACCURATE:
+            self.bundle_total = self.page.paginator.count
+        return results
+
+    def is_cursor_pagination_requested(self, request):
+        """
+        Keyset pagination is used for requests with `cursor` parameter (empty for the first page) or, if
+        `keyset_pagination_default` is enabled, for all the requests without `page-offset`.
+        """
+        if self.page_query_param in request.query_params:
+            return False
+        return self.cursor_query_param in request.query_params \
+            or bool(GeneralConfiguration.get_keyset_pagination_default())
+
+    def get_total_strategy(self, request):
+        total_strategy = request.query_params.get(self.total_query_param, self.TOTAL_ACCURATE)
+        if total_strategy not in self.total_strategies:
+            raise ValidationError({self.total_query_param: f'Supported values: {", ".join(self.total_strategies)}'})
+        return total_strategy
+
+    def is_summary_count(self, request):
+        return request.query_params.get(self.summary_query_param) == 'count'
+
+    def get_queryset_total(self, queryset):
+        """
+        Returns total number of matches according to `_total` parameter. For `_summary=count` the total is
+        always determined, estimated one if requested.
+        """
+        if self.total_strategy == self.TOTAL_NONE and not self.summary_count:
+            return None
+        if not isinstance(queryset, QuerySet):
+            return len(queryset)
+        if self.total_strategy == self.TOTAL_ESTIMATE:
+            estimate = estimate_queryset_count(queryset)
+            if estimate is not None:
+                return estimate
+        return queryset.count()
+
+    def paginate_queryset_by_cursor(self, queryset, request):
+        """
+        Keyset pagination, instead of OFFSET the page starts right after the last row of the previous page.
+        Position of that row is carried in the signed `cursor` parameter of the Bundle `next` link.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            self.cursor_ordering = None
+            return None
+
+        self.cursor_next_position = None
+        keyset_queryset = queryset.order_by(*self.build_keyset_order_by(queryset.model))
+        position = self.decode_cursor(request)
+        if position is not None:
+            keyset_queryset = keyset_queryset.filter(self.build_keyset_filter(queryset.model, position))
+
+        # One additional row is fetched to determine if next page exists
+        results = list(keyset_queryset[:page_size + 1])
+        if len(results) > page_size:
+            results = results[:page_size]
+            self.cursor_next_position = self.get_keyset_position(results[-1])
+        return results
+
+    def get_keyset_ordering(self, queryset):
+        """
+        Returns ordering of queryset extended with primary key as tie breaker, e.g. ('validity_from', 'id').
+        If queryset ordering can't be used for keyset pagination None is returned.
+        """
+        ordering = list(queryset.query.order_by)
+        if not ordering or queryset.query.distinct_fields:
+            return None
+
+        opts = queryset.model._meta
+        for field in ordering:
+            if not isinstance(field, str) or field == '?' or '__' in field:
+                return None
+            try:
+                model_field = opts.get_field(self._get_keyset_field_name(queryset.model, field))
+            except FieldDoesNotExist:
+                return None
+            if model_field.is_relation:
+                return None
+
+        field_names = [self._get_keyset_field_name(queryset.model, field) for field in ordering]
+        if opts.pk.name not in field_names:
+            descending = ordering[-1].startswith('-')
+            ordering.append(f'-{opts.pk.name}' if descending else opts.pk.name)
+        return tuple(ordering)
+
+    def build_keyset_order_by(self, model):
+        # Nullable fields have explicit NULL ordering to keep keyset comparisons consistent between databases
+        order_by = []
+        for field in self.cursor_ordering:
+            name = self._get_keyset_field_name(model, field)
+            if not self._is_keyset_field_nullable(model, name):
+                order_by.append(field)
+            elif field.startswith('-'):
+                order_by.append(F(name).desc(nulls_last=True))
+            else:
+                order_by.append(F(name).asc(nulls_first=True))
+        return order_by
+
+    def build_keyset_filter(self, model, position):
+        """
+        Builds condition matching rows placed after given position, for ordering (a, b) it's
+        `a > a0 OR (a = a0 AND b > b0)`.
+        """
+        keyset_filter = Q()
+        preceding_equal = Q()
+        for field, value in zip(self.cursor_ordering, position):
+            name = self._get_keyset_field_name(model, field)
+            after = self._build_keyset_after_condition(model, name, field.startswith('-'), value)
+            if after is not None:
+                keyset_filter |= preceding_equal & after
+            preceding_equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return keyset_filter
+
+    def _build_keyset_after_condition(self, model, name, descending, value):
+        if value is None:
+            # NULLs are placed first in ascending and last in descending ordering
+            return None if descending else Q(**{f'{name}__isnull': False})
+        after = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+        if descending and self._is_keyset_field_nullable(model, name):
+            after |= Q(**{f'{name}__isnull': True})
+        return after
+
+    def get_keyset_position(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.cursor_ordering]
+
+    def get_next_cursor_link(self):
+        if self.cursor_next_position is None:
+            return None
+        url = remove_query_param(self.get_request_url(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.cursor_next_position))
+
+    def encode_cursor(self, position):
+        payload = {
+            'o': list(self.cursor_ordering),
+            'p': [self._serialize_cursor_value(value) for value in position]
+        }
+        return signing.dumps(payload, salt=self.cursor_salt, compress=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = signing.loads(encoded, salt=self.cursor_salt)
+        except signing.BadSignature:
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+
+        if not isinstance(payload, dict):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+        position = payload.get('p')
+        if payload.get('o') != list(self.cursor_ordering) or not isinstance(position, list) \
+                or len(position) != len(self.cursor_ordering):
+            raise ValidationError({self.cursor_query_param: 'Cursor does not match ordering of the resource'})
+        return position
+
+    def _serialize_cursor_value(self, value):
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, (uuid.UUID, decimal.Decimal)):
+            return str(value)
+        return value
+
+    def _get_keyset_field_name(self, model, field):
+        name = field.lstrip('-')
+        return model._meta.pk.name if name == 'pk' else name
+
+    def _is_keyset_field_nullable(self, model, name):
+        return model._meta.get_field(name).null
+
+
+class UncountedPaginator(DjangoPaginator):
+    """
+    Paginator which doesn't count all the rows. One additional row is fetched to determine if next page exists.
+    """
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage('That page contains no results')
+        # Number of rows known so far is enough for Page.has_next() and Page.has_previous()
+        self.__dict__['count'] = bottom + len(object_list)
+        return self._get_page(object_list[:self.per_page], number, self)
+
+
+def estimate_queryset_count(queryset):
+    """
+    Returns number of rows estimated by the PostgreSQL planner, None for databases without such statistics.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
 
 
 def CachedCountQueryset(queryset, timeout=60*60, cache_name='default'):
     """
         Return copy of queryset with queryset.count() wrapped to cache result for `timeout` seconds.
+        Cached counts are dropped for the whole model by invalidate_cached_counts().
+        Counts of models not invalidated by the module signals expire after `timeout` only.
     """
     cache = caches[cache_name]
     queryset = queryset._chain()
     real_count = queryset.count
+    query_hash = None
 
     def count(queryset):
-        cache_key = 'query-count:' + hashlib.md5(str(queryset.query).encode('utf8')).hexdigest()
+        nonlocal query_hash
+        if query_hash is None:
+            query_hash = hashlib.md5(str(queryset.query).encode('utf8')).hexdigest()
+        generation = cache.get_or_set(_get_count_generation_key(queryset.model), _new_count_generation, None)
+        cache_key = f'query-count:{generation}:{query_hash}'
 
         # return existing value, if any
         value = cache.get(cache_key)
@@ -104,4 +472,19 @@ def CachedCountQueryset(queryset, timeout=60*60, cache_name='default'):
         return value
 
     queryset.count = count.__get__(queryset, type(queryset))
-    return queryset
\ No newline at end of file
+    return queryset
+
+
+def invalidate_cached_counts(model, cache_name='default'):
+    """
+        Drop counts cached by CachedCountQueryset for querysets of given model.
+    """
+    caches[cache_name].set(_get_count_generation_key(model), _new_count_generation(), None)
+
+
+def _get_count_generation_key(model):
+    return f'query-count-generation:{model._meta.label_lower}'
+
+
+def _new_count_generation():
+    return uuid.uuid4().hex
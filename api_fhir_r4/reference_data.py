@@ -0,0 +1,73 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.db.models.signals import post_delete, post_save
+
+from api_fhir_r4.configurations import GeneralConfiguration
+
+
+class ReferenceDataResolver:
+    """
+    Process wide cache of objects of nearly static IMIS code tables (e.g. Education, FamilyType, Diagnosis)
+    looked up by converters. Entries of a model are dropped when any of its objects is saved or deleted in the
+    process, changes made by other processes are picked up after `reference_data_cache_timeout` seconds. At most
+    `max_entries` recently used objects are kept, large tables like Diagnosis keep only the codes in use.
+    """
+    max_entries = 1000
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._connected_models = set()
+        self._lock = threading.Lock()
+
+    def get(self, model, **lookup):
+        """
+        Equivalent of model.objects.get(**lookup), raises model.DoesNotExist and model.MultipleObjectsReturned
+        the same way. Lookup values are compared as strings, e.g. `id=1` and `id='1'` share the entry. Every call
+        returns a copy of the cached object, changes made by the caller are not shared with other requests.
+        """
+        timeout = GeneralConfiguration.get_reference_data_cache_timeout()
+        if not timeout:
+            return model.objects.get(**lookup)
+
+        key = (model._meta.label_lower, tuple(sorted((field, str(value)) for field, value in lookup.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                return copy.copy(entry[0])
+
+        self._connect_invalidation(model)
+        obj = model.objects.get(**lookup)
+        with self._lock:
+            self._entries[key] = (obj, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return copy.copy(obj)
+
+    def invalidate(self, model=None):
+        with self._lock:
+            if model is None:
+                self._entries.clear()
+            else:
+                label = model._meta.label_lower
+                self._entries = OrderedDict((key, entry) for key, entry in self._entries.items() if key[0] != label)
+
+    def _connect_invalidation(self, model):
+        if model in self._connected_models:
+            return
+        with self._lock:
+            if model in self._connected_models:
+                return
+            for signal in (post_save, post_delete):
+                signal.connect(self._on_model_changed, sender=model, weak=False)
+            self._connected_models.add(model)
+
+    def _on_model_changed(self, sender, **kwargs):
+        self.invalidate(sender)
+
+
+reference_data = ReferenceDataResolver()
@@ -0,0 +1,75 @@
+import decimal
+
+import orjson
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+class FHIRJSONRenderer(BaseRenderer):
+    """
+    Renderer for FHIR JSON representation based on orjson. UUID, datetime, date and time are
+    serialized by orjson natively, other types fall back to the rest_framework JSONEncoder.
+    Output is indented when `_pretty=true` is requested.
+    """
+    media_type = 'application/fhir+json'
+    format = 'json'
+    charset = None
+    # Values of FHIR `_format` parameter handled by the renderer, see http://hl7.org/fhir/R4/http.html#mime-type
+    format_aliases = ('json', 'application/fhir+json')
+    pretty_query_param = '_pretty'
+
+    _base_options = orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return self.dumps(data, pretty=self.is_pretty(renderer_context))
+
+    @classmethod
+    def dumps(cls, data, pretty=False):
+        options = (cls._base_options | orjson.OPT_INDENT_2) if pretty else cls._base_options
+        return orjson.dumps(data, default=_default, option=options)
+
+    def is_pretty(self, renderer_context):
+        request = (renderer_context or {}).get('request')
+        if request is None:
+            return False
+        return str(request.query_params.get(self.pretty_query_param, '')).lower() == 'true'
+
+
+class FHIRApplicationJSONRenderer(FHIRJSONRenderer):
+    """
+    The same content as FHIRJSONRenderer, used for clients explicitly accepting only application/json.
+    """
+    media_type = 'application/json'
+    format_aliases = ('application/json',)
+
+
+class FHIRContentNegotiation(DefaultContentNegotiation):
+    """
+    Content negotiation honouring FHIR `_format` parameter, which takes precedence over the Accept header.
+    """
+    format_query_param = '_format'
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        fhir_format = request.query_params.get(self.format_query_param)
+        if not fhir_format:
+            return super().select_renderer(request, renderers, format_suffix)
+
+        # `+` from not encoded `application/fhir+json` is decoded as space
+        fhir_format = fhir_format.strip().replace(' ', '+')
+        for renderer in renderers:
+            if fhir_format in getattr(renderer, 'format_aliases', (renderer.format,)):
+                return renderer, renderer.media_type
+        raise NotAcceptable(f"Format '{fhir_format}' is not supported")
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return _fallback_encoder.default(obj)
+
+
+_fallback_encoder = encoders.JSONEncoder()
@@ -0,0 +1,217 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+
+import orjson
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from api_fhir_r4.conditional_requests import get_object_version
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.renderers import FHIRJSONRenderer
+
+
+class LRUCache:
+    """
+    Thread safe in-process cache keeping at most `max_size` recently used entries.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not self.max_size:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RenderedResourceCache:
+    """
+    Cache of FHIR JSON representations of database objects, kept in Django cache and in in-process LRU.
+    Entries are keyed by version of the object, converter and reference type and by generation tokens of the
+    object and of related objects the representation depends on (`dependencies`, lookups relative to the
+    object, e.g. 'family__location'). Generation tokens are stored in Django cache, replacing one in
+    invalidate() drops the entries of the object and of all the objects depending on it in all the processes.
+    Objects are invalidated on save and delete of models of serializers with `cache_resources` and of their
+    dependencies, connected when the application is ready, see connect_serializers(). Changes bypassing model
+    signals (e.g. queryset.update()) are visible after `rendered_resource_cache_timeout`.
+    """
+    entry_key_prefix = 'fhir-resource'
+    generation_key_prefix = 'fhir-resource-generation'
+
+    def __init__(self, cache_name='default'):
+        self.cache_name = cache_name
+        self._lru = None
+        self._connected_models = set()
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_name]
+
+    @property
+    def lru(self):
+        if self._lru is None:
+            self._lru = LRUCache(GeneralConfiguration.get_rendered_resource_cache_lru_size())
+        return self._lru
+
+    @classmethod
+    def is_enabled(cls):
+        return bool(GeneralConfiguration.get_rendered_resource_cache_timeout())
+
+    @classmethod
+    def is_cacheable(cls, obj):
+        return hasattr(obj, '_meta') and obj.pk is not None and get_object_version(obj) is not None
+
+    def get_many(self, objects, variant, dependencies=()):
+        """
+        Returns {index: representation} for objects which representation with given variant (e.g. converter and
+        reference type) is cached. Returned entry keys allow storing missing representations with set_many().
+        """
+        entry_keys = self.get_entry_keys(objects, variant, dependencies)
+        cached = {}
+        missing_keys = {}
+        for idx, entry_key in entry_keys.items():
+            value = self.lru.get(entry_key)
+            if value is not None:
+                cached[idx] = orjson.loads(value)
+            else:
+                missing_keys[entry_key] = idx
+
+        if missing_keys:
+            for entry_key, value in self.cache.get_many(list(missing_keys)).items():
+                self.lru.set(entry_key, value)
+                cached[missing_keys[entry_key]] = orjson.loads(value)
+        return cached, entry_keys
+
+    def set_many(self, representations, entry_keys):
+        """
+        Stores {index: representation} under entry keys returned by get_many().
+        """
+        entries = {}
+        for idx, representation in representations.items():
+            if idx in entry_keys:
+                entries[entry_keys[idx]] = FHIRJSONRenderer.dumps(representation)
+        if not entries:
+            return
+        self.cache.set_many(entries, GeneralConfiguration.get_rendered_resource_cache_timeout())
+        for entry_key, value in entries.items():
+            self.lru.set(entry_key, value)
+
+    def get_entry_keys(self, objects, variant, dependencies=()):
+        generations = self.get_generations(objects, dependencies)
+        variant_key = ':'.join(str(part) for part in variant)
+        return {
+            idx: f'{self.entry_key_prefix}:{generation}:{get_object_version(objects[idx]).isoformat()}:{variant_key}'
+            for idx, generation in generations.items()
+        }
+
+    def get_generations(self, objects, dependencies=()):
+        """
+        Returns {index: generation} of cacheable objects, generation changes whenever the object or any of the
+        related objects given by `dependencies` is invalidated.
+        """
+        cacheable = {idx: obj for idx, obj in enumerate(objects) if self.is_cacheable(obj)}
+        if not cacheable:
+            return {}
+        model = type(next(iter(cacheable.values())))
+        related_models = [self.get_related_model(model, dependency) for dependency in dependencies]
+        self._connect_invalidation([model, *related_models])
+
+        related_pks = self._get_related_pks(model, cacheable, dependencies)
+        generation_keys = {}
+        for idx, obj in cacheable.items():
+            generation_keys[idx] = [self._get_generation_key(model, obj.pk)] + [
+                self._get_generation_key(related_model, pk) if pk is not None else None
+                for related_model, pk in zip(related_models, related_pks.get(obj.pk, [None] * len(dependencies)))
+            ]
+        all_keys = {key for keys in generation_keys.values() for key in keys if key is not None}
+        tokens = self.cache.get_many(list(all_keys))
+
+        # Objects without generation have no entries yet
+        new_tokens = {key: uuid.uuid4().hex for key in all_keys if key not in tokens}
+        if new_tokens:
+            self.cache.set_many(new_tokens, None)
+            tokens.update(new_tokens)
+
+        generations = {}
+        for idx, keys in generation_keys.items():
+            generation = ':'.join(tokens[key] if key is not None else '-' for key in keys)
+            generations[idx] = hashlib.md5(generation.encode('utf8')).hexdigest() if dependencies else generation
+        return generations
+
+    @classmethod
+    def get_related_model(cls, model, lookup):
+        for field_name in lookup.split('__'):
+            model = model._meta.get_field(field_name).related_model
+        return model
+
+    def invalidate(self, obj):
+        if obj.pk is None:
+            return
+        self.cache.set(self._get_generation_key(type(obj), obj.pk), uuid.uuid4().hex, None)
+
+    def connect_serializers(self, serializer_classes):
+        """
+        Connects invalidation of `resource_cache_model` and `resource_cache_dependencies` models of serializers
+        with `cache_resources`. Writes handled by a process invalidate representations cached by other
+        processes even if the process hasn't read any of them yet.
+        """
+        models = []
+        for serializer_class in serializer_classes:
+            model = serializer_class.resource_cache_model
+            if not serializer_class.cache_resources or model is None:
+                continue
+            models.append(model)
+            models.extend(self.get_related_model(model, dependency)
+                          for dependency in serializer_class.resource_cache_dependencies)
+        self._connect_invalidation(models)
+
+    def _get_related_pks(self, model, cacheable, dependencies):
+        """
+        Returns {object pk: [pk of related object of every dependency]}, loaded with one query.
+        """
+        if not dependencies:
+            return {}
+        rows = model.objects.filter(pk__in=[obj.pk for obj in cacheable.values()]).values_list('pk', *dependencies)
+        return {row[0]: list(row[1:]) for row in rows}
+
+    def _get_generation_key(self, model, pk):
+        return f'{self.generation_key_prefix}:{model._meta.label_lower}:{pk}'
+
+    def _connect_invalidation(self, models):
+        if self._connected_models.issuperset(models):
+            return
+        with self._lock:
+            for model in models:
+                if model in self._connected_models:
+                    continue
+                post_save.connect(self._on_object_changed, sender=model, weak=False)
+                post_delete.connect(self._on_object_changed, sender=model, weak=False)
+                self._connected_models.add(model)
+
+    def _on_object_changed(self, sender, instance, **kwargs):
+        self.invalidate(instance)
+        # Other processes may cache the previous representation before the change is committed
+        transaction.on_commit(lambda: self.invalidate(instance))
+
+rendered_resource_cache = RenderedResourceCache()
@@ -1,12 +1,20 @@
 import logging
+from contextlib import contextmanager
+from itertools import islice
 from typing import Union
 
+from django.db import models
 from django.http.response import HttpResponseBase
 from fhir.resources.fhirabstractmodel import FHIRAbstractModel
 from rest_framework import serializers
 
+from api_fhir_r4.conditional_requests import build_resource_validators
 from api_fhir_r4.configurations import GeneralConfiguration
 from api_fhir_r4.converters import BaseFHIRConverter, OperationOutcomeConverter, ReferenceConverterMixin
+from api_fhir_r4.dict_emitter import FHIRDictEmitter
+from api_fhir_r4.element_selection import ElementSelection
+from api_fhir_r4.identity_map import IdentityMap
+from api_fhir_r4.resource_cache import rendered_resource_cache
 from core.models import User, TechnicalUser
 
 
@@ -14,20 +22,167 @@ from core.models import User, TechnicalUser
 logger = logging.getLogger(__name__)
 
 
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+class FHIRListSerializer(serializers.ListSerializer):
+    """
+    List serializer taking representations of cached resources from the rendered resource cache,
+    the remaining objects are converted together with converter's to_fhir_many(). Objects are converted
+    in chunks of `conversion_chunk_size`, entries of a chunk are yielded before the next one is converted.
+    """
+
+    def to_representation(self, data):
+        return list(self.iter_representation(data))
+
+    def iter_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        if self.child.is_resource_cache_used():
+            yield from self.child.iter_cached_representation(iterable)
+        elif self.child.is_bulk_conversion_supported():
+            for chunk in iter_chunks(iterable, self.child.conversion_chunk_size):
+                yield from self.child.to_fhir_representations(chunk)
+        else:
+            for item in iterable:
+                yield self.child.to_representation(item)
+
+
 class BaseFHIRSerializer(serializers.Serializer):
     fhirConverter = BaseFHIRConverter()
+    # Representations are stored in rendered resource cache, see api_fhir_r4.resource_cache, and conditional
+    # requests are answered with 304 Not Modified. Not to be enabled for representations depending on the current
+    # time (e.g. InsurancePlan status derived from date_from and date_to)
+    cache_resources = False
+    # Model of cached objects, invalidation of its objects and of related objects is connected at startup
+    resource_cache_model = None
+    # Lookups of related objects the representation depends on, their changes invalidate cached representation
+    resource_cache_dependencies = ()
+    # Maximum number of objects converted together by list serializer
+    conversion_chunk_size = 100
+
+    class Meta:
+        list_serializer_class = FHIRListSerializer
 
     def __init__(self, *args, **kwargs):
         self._reference_type = kwargs.pop('reference_type', ReferenceConverterMixin.UUID_REFERENCE_TYPE)
         super().__init__(*args, **kwargs)
 
     def to_representation(self, obj):
+        if self.is_resource_cache_used() and rendered_resource_cache.is_cacheable(obj):
+            return list(self.iter_cached_representation([obj]))[0]
+        return self.to_fhir_representation(obj)
+
+    def is_resource_cache_used(self):
+        return self.cache_resources and rendered_resource_cache.is_enabled()
+
+    def is_bulk_conversion_supported(self):
+        # Serializers customizing representation of a single object convert objects one by one
+        return type(self).to_representation is BaseFHIRSerializer.to_representation
+
+    def iter_cached_representation(self, objects):
+        for chunk in iter_chunks(objects, self.conversion_chunk_size):
+            cached, entry_keys = rendered_resource_cache.get_many(
+                chunk, self.get_resource_cache_variant(), self.resource_cache_dependencies)
+            missing = [idx for idx in range(len(chunk)) if idx not in cached]
+            if self.is_bulk_conversion_supported():
+                converted = dict(zip(missing, self.to_fhir_representations([chunk[idx] for idx in missing])))
+            else:
+                converted = {idx: self.to_fhir_representation(chunk[idx]) for idx in missing}
+            rendered_resource_cache.set_many(converted, entry_keys)
+            for idx in range(len(chunk)):
+                yield cached[idx] if idx in cached else converted[idx]
+
+    def get_resource_validators(self, objects, request, *variant, searchset=False):
+        """
+        Returns (ETag, Last-Modified) of representation of objects. Validators are available only for
+        serializers with `cache_resources`, which representation depends on the object and declared
+        `resource_cache_dependencies` only.
+        """
+        if not self.cache_resources:
+            return None, None
+        generations = rendered_resource_cache.get_generations(objects, self.resource_cache_dependencies)
+        return build_resource_validators(objects, request, *variant, generations=generations, searchset=searchset)
+
+    def get_resource_cache_variant(self):
+        element_selection = self.get_element_selection()
+        if element_selection is not None:
+            return type(self.fhirConverter).__name__, self.reference_type, element_selection.cache_key
+        return type(self.fhirConverter).__name__, self.reference_type
+
+    def get_element_selection(self):
+        """
+        Returns selection of elements requested with `_elements` or `_summary` parameter of the request
+        in serializer context, None if the whole resources are requested.
+        """
+        context = self.context
+        if 'element_selection' not in context:
+            request = context.get('request')
+            context['element_selection'] = ElementSelection.from_request(request) \
+                if request is not None and request.method == 'GET' else None
+        return context['element_selection']
+
+    @contextmanager
+    def activate_conversion_context(self):
+        """
+        Makes element selection and identity map of the request available to converters.
+        """
+        element_selection = self.get_element_selection()
+        with IdentityMap.activate_for_request(self.context.get('request')):
+            if element_selection is None:
+                yield
+            else:
+                with element_selection.activate(type(self.fhirConverter)):
+                    yield
+
+    def convert_to_fhir_obj(self, obj):
+        with self.activate_conversion_context():
+            return self.fhirConverter.to_fhir_obj(obj, self.reference_type)
+
+    def convert_to_fhir_objs(self, objects):
+        with self.activate_conversion_context():
+            return self.fhirConverter.to_fhir_many(objects, self.reference_type)
+
+    def prune_fhir_elements(self, fhir_dict):
+        element_selection = self.get_element_selection()
+        return element_selection.prune(fhir_dict) if element_selection is not None else fhir_dict
+
+    def to_fhir_representation(self, obj):
         try:
             if isinstance(obj, HttpResponseBase):
                 return OperationOutcomeConverter.to_fhir_obj(obj).dict()
             elif isinstance(obj, FHIRAbstractModel):
-                return obj.dict()
-            return self.fhirConverter.to_fhir_obj(obj, self.reference_type).dict()
+                return self.fhir_obj_to_dict(obj)
+            return self.prune_fhir_elements(self.fhir_obj_to_dict(self.convert_to_fhir_obj(obj)))
+        except Exception as e:
+            from django.conf import settings
+            if settings.DEBUG:
+                self._print_debug_log(e)
+            raise e
+
+    def fhir_obj_to_dict(self, fhir_obj):
+        """
+        Returns JSON-ready dict of a converted resource. Resource types listed in `dict_emitter_resources`
+        are emitted with FHIRDictEmitter, which gives the same output as dict() of fhir.resources.
+        """
+        if fhir_obj.resource_type in GeneralConfiguration.get_dict_emitter_resources():
+            return FHIRDictEmitter.emit(fhir_obj)
+        return fhir_obj.dict()
+
+    def to_fhir_representations(self, objects):
+        """
+        Equivalent of to_fhir_representation() for list of objects, objects are converted together with
+        converter's to_fhir_many().
+        """
+        if any(isinstance(obj, (HttpResponseBase, FHIRAbstractModel)) for obj in objects):
+            return [self.to_fhir_representation(obj) for obj in objects]
+        try:
+            return [self.prune_fhir_elements(self.fhir_obj_to_dict(fhir_obj))
+                    for fhir_obj in self.convert_to_fhir_objs(objects)]
         except Exception as e:
             from django.conf import settings
             if settings.DEBUG:
@@ -13,6 +13,7 @@ from django.shortcuts import get_object_or_404
 from api_fhir_r4.configurations import R4ClaimConfig, GeneralConfiguration
 from api_fhir_r4.converters import ClaimResponseConverter, OperationOutcomeConverter, ReferenceConverterMixin as r
 from api_fhir_r4.converters.claimConverter import ClaimConverter
+from api_fhir_r4.identity_map import IdentityMap
 from fhir.resources.fhirabstractmodel import FHIRAbstractModel
 from api_fhir_r4.serializers import BaseFHIRSerializer
 
@@ -24,12 +25,13 @@ class ClaimSerializer(ContainedContentSerializerMixin, BaseFHIRSerializer):
     contained_resources = ClaimContainedResources
 
     def fhir_object_reference_fields(self, fhir_obj: FHIRClaim) -> List[FHIRAbstractModel]:
-        return [
+        # Elements excluded by `_elements` or `_summary` parameter are not built
+        return [field for field in [
             fhir_obj.patient,
             fhir_obj.provider,
             fhir_obj.enterer,
-            *[item.extension[0].valueReference for item in fhir_obj.item]
-        ]
+            *[item.extension[0].valueReference for item in fhir_obj.item or []]
+        ] if field is not None]
 
     def create(self, validated_data):
         from_contained = self._create_or_update_contained(self.initial_data)
@@ -48,17 +50,19 @@ class ClaimSerializer(ContainedContentSerializerMixin, BaseFHIRSerializer):
         if isinstance(obj, HttpResponseBase):
             return OperationOutcomeConverter.to_fhir_obj(obj).dict()
         elif isinstance(obj, FHIRAbstractModel):
-            return obj.dict()
+            return self.fhir_obj_to_dict(obj)
 
-        fhir_obj = self.fhirConverter.to_fhir_obj(obj, self._reference_type)
+        fhir_obj = self.convert_to_fhir_obj(obj)
         self.remove_attachment_data(fhir_obj)
         
         if self.context.get('contained', None):
             self._add_contained_references(fhir_obj)
 
-        fhir_dict = fhir_obj.dict()
+        fhir_dict = self.prune_fhir_elements(self.fhir_obj_to_dict(fhir_obj))
         if self.context.get('contained', False):
-            fhir_dict['contained'] = self._create_contained_obj_dict(obj)
+            # Contained resources share references and related objects with other claims of the request
+            with IdentityMap.activate_for_request(self.context.get('request')):
+                fhir_dict['contained'] = self._create_contained_obj_dict(obj)
         return fhir_dict
 
     def remove_attachment_data(self, fhir_obj):
@@ -81,7 +85,7 @@ class ClaimSerializer(ContainedContentSerializerMixin, BaseFHIRSerializer):
 
     def __get_attachments(self, fhir_obj):
         attachment_category = R4ClaimConfig.get_fhir_claim_attachment_code()
-        return [a.valueAttachment for a in fhir_obj.supportingInfo if a.category.text == attachment_category]
+        return [a.valueAttachment for a in fhir_obj.supportingInfo or [] if a.category.text == attachment_category]
 
     def __set_contained_resource_reference_types(self, reference_type):
         self._contained_definitions.update_reference_type(reference_type)
@@ -1,4 +1,8 @@
 import logging
+from collections import defaultdict
+from types import SimpleNamespace
+
+from insuree.models import InsureePolicy
 from policy.services import EligibilityRequest, EligibilityService, EligibilityResponse, StoredProcEligibilityService
 from policy.services import ByInsureeRequest, ByInsureeService, ByInsureeResponse
 from api_fhir_r4.converters import CoverageEligibilityRequestConverter
@@ -6,6 +10,9 @@ from api_fhir_r4.serializers import BaseFHIRSerializer
 from django.http.response import HttpResponseBase
 from fhir.resources.fhirabstractmodel import FHIRAbstractModel
 from api_fhir_r4.converters import OperationOutcomeConverter
+from api_fhir_r4.eligibility_cache import eligibility_response_cache
+from api_fhir_r4.exceptions import FHIRException
+from api_fhir_r4.models import BundleType
 
 
 class CoverageEligibilityRequestSerializer(BaseFHIRSerializer):
@@ -18,7 +25,13 @@ class CoverageEligibilityRequestSerializer(BaseFHIRSerializer):
             return OperationOutcomeConverter.to_fhir_obj(obj).dict()
         elif isinstance(obj, FHIRAbstractModel):
             return obj.dict()
-        return CoverageEligibilityRequestConverter.to_fhir_obj(obj[0], obj[1]).dict()
+        elif isinstance(obj, dict):
+            # Response taken from eligibility response cache
+            return obj
+        fhir_response = self.fhir_obj_to_dict(
+            CoverageEligibilityRequestConverter.to_fhir_obj(obj[0], obj[1], self.reference_type))
+        eligibility_response_cache.set(self.get_eligibility_cache_key(obj[1]), fhir_response, obj[1].chf_id)
+        return fhir_response
 
     def create(self, validated_data):
         eligibility_request_sp = EligibilityRequest(
@@ -26,17 +39,135 @@ class CoverageEligibilityRequestSerializer(BaseFHIRSerializer):
             service_code=validated_data.get('service_code'),
             item_code=validated_data.get('item_code')
         )
-        eligibility_request = ByInsureeRequest(chf_id=validated_data.get('chf_id'))
+        cached_response = eligibility_response_cache.get(self.get_eligibility_cache_key(eligibility_request_sp))
+        if cached_response is not None:
+            return cached_response
+        response = self.get_insuree_eligibility_response(validated_data.get('chf_id'))
+        output_response = [response, eligibility_request_sp]
+        return output_response
+
+    def create_bundle(self, bundle):
+        """
+        Evaluates CoverageEligibilityRequests of a `batch` Bundle and returns `batch-response` Bundle
+        of CoverageEligibilityResponses, entries are in the order of the requests. Responses of all the
+        requests are built together, see CoverageEligibilityRequestConverter.to_fhir_many().
+        """
+        if not isinstance(bundle, dict) or bundle.get('resourceType') != 'Bundle' \
+                or bundle.get('type') != BundleType.BATCH.value:
+            raise FHIRException('Expected Bundle of type `batch` with CoverageEligibilityRequest entries')
+
+        audit_user_id = self.get_audit_user_id()
+        entries = []
+        for entry in bundle.get('entry') or []:
+            try:
+                resource = entry.get('resource') or {}
+                if resource.get('resourceType') != 'CoverageEligibilityRequest':
+                    raise FHIRException('Bundle entry is not a CoverageEligibilityRequest')
+                entries.append(self.fhirConverter.to_imis_obj(resource, audit_user_id))
+            except Exception as e:
+                entries.append(e)
+
+        pending = {}
+        results = []
+        for idx, request in enumerate(entries):
+            if not isinstance(request, EligibilityRequest):
+                results.append(request)
+                continue
+            cached_response = eligibility_response_cache.get(self.get_eligibility_cache_key(request))
+            results.append(cached_response)
+            if cached_response is None:
+                pending[idx] = request
+
+        # Policies of all the insurees in the batch are loaded together
+        insuree_responses = self.get_insurees_eligibility_responses({request.chf_id for request in pending.values()})
+        pairs = {idx: (insuree_responses[request.chf_id], request) for idx, request in pending.items()}
+
+        for idx, result in zip(pairs, self.convert_eligibility_requests(list(pairs.values()))):
+            if not isinstance(result, Exception):
+                request = pairs[idx][1]
+                result = self.fhir_obj_to_dict(result)
+                eligibility_response_cache.set(self.get_eligibility_cache_key(request), result, request.chf_id)
+            results[idx] = result
+
+        return {
+            'resourceType': 'Bundle',
+            'type': BundleType.BATCH_RESPONSE.value,
+            'entry': [self.build_bundle_response_entry(result) for result in results]
+        }
+
+    def convert_eligibility_requests(self, pairs):
+        try:
+            return self.fhirConverter.to_fhir_many(pairs, self.reference_type)
+        except Exception:
+            # Failure of one request doesn't fail the others
+            return [self.convert_eligibility_request(response, request) for response, request in pairs]
+
+    def convert_eligibility_request(self, response, request):
+        try:
+            return self.fhirConverter.to_fhir_obj(response, request, self.reference_type)
+        except Exception as e:
+            return e
+
+    def build_bundle_response_entry(self, result):
+        if isinstance(result, Exception):
+            return {
+                'resource': OperationOutcomeConverter.to_fhir_obj(result).dict(),
+                'response': {'status': '400 Bad Request'}
+            }
+        return {
+            'resource': result,
+            'response': {'status': '200 OK'}
+        }
+
+    def get_eligibility_cache_key(self, request):
+        return request.chf_id, request.service_code, request.item_code, self.reference_type
+
+    def get_insuree_eligibility_response(self, chf_id):
+        eligibility_request = ByInsureeRequest(chf_id=chf_id)
         request = self.context.get("request")
         try:
-            response = ByInsureeService(request.user).request(eligibility_request)
+            return ByInsureeService(request.user).request(eligibility_request)
         except TypeError:
             self.logger.warning('The insuree with chfid `{}` is not connected with policy. '
                                 'The default eligibility response will be used.'
-                                .format(validated_data.get('chfid')))
-            response = self.create_default_eligibility_response()
-        output_response = [response, eligibility_request_sp]
-        return output_response
+                                .format(chf_id))
+            return self.create_default_eligibility_response()
+
+    def get_insurees_eligibility_responses(self, chf_ids):
+        """
+        Returns {chf_id: ByInsureeResponse} like get_insuree_eligibility_response(), policies of all the
+        insurees are loaded with one query instead of one ByInsureeService request per insuree.
+        """
+        if not chf_ids:
+            return {}
+        insuree_policies = defaultdict(set)
+        for chf_id, policy_id in InsureePolicy.objects \
+                .filter(insuree__chf_id__in=chf_ids).values_list('insuree__chf_id', 'policy_id'):
+            insuree_policies[chf_id].add(policy_id)
+
+        request = self.context.get("request")
+        # Query of ByInsureeService without the filter by a single chf_id
+        policies_request = SimpleNamespace(show_history=False, target_date=None, active_or_last_expired_only=False)
+        policies = ByInsureeService(request.user).build_query(policies_request) \
+            .filter(id__in={policy_id for policy_ids in insuree_policies.values() for policy_id in policy_ids}) \
+            .select_related('contribution_plan').prefetch_related('family__members')
+        policies = {policy.id: policy for policy in policies}
+
+        responses = {}
+        for chf_id in chf_ids:
+            try:
+                items = [ByInsureeService._to_item(policies[policy_id])
+                         for policy_id in insuree_policies.get(chf_id, ()) if policy_id in policies]
+                responses[chf_id] = ByInsureeResponse(
+                    by_insuree_request=ByInsureeRequest(chf_id=chf_id),
+                    items=sorted(items, key=lambda item: item.expiry_date)
+                )
+            except TypeError:
+                self.logger.warning('The insuree with chfid `{}` is not connected with policy. '
+                                    'The default eligibility response will be used.'
+                                    .format(chf_id))
+                responses[chf_id] = self.create_default_eligibility_response()
+        return responses
 
     def create_default_eligibility_response(self):
         return ByInsureeResponse(
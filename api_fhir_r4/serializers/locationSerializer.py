@@ -8,6 +8,9 @@ from api_fhir_r4.serializers import BaseFHIRSerializer
 
 class LocationSerializer(BaseFHIRSerializer):
     fhirConverter = LocationConverter()
+    cache_resources = True
+    resource_cache_model = Location
+    resource_cache_dependencies = ('parent',)
 
     def create(self, validated_data):
         copied_data = copy.deepcopy(validated_data)
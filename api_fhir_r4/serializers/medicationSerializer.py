@@ -9,6 +9,8 @@ from api_fhir_r4.serializers import BaseFHIRSerializer
 
 class MedicationSerializer(BaseFHIRSerializer):
     fhirConverter = MedicationConverter()
+    cache_resources = True
+    resource_cache_model = Item
 
     def create(self, validated_data):
         code = validated_data.get('code')
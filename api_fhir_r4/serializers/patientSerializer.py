@@ -12,6 +12,13 @@ from insuree.services import InsureeService
 
 class PatientSerializer(BaseFHIRSerializer):
     fhirConverter = PatientConverter()
+    cache_resources = True
+    resource_cache_model = Insuree
+    resource_cache_dependencies = (
+        'family', 'family__location', 'family__location__parent', 'family__location__parent__parent',
+        'family__location__parent__parent__parent', 'current_village', 'current_village__parent',
+        'current_village__parent__parent', 'current_village__parent__parent__parent', 'health_facility', 'photo',
+    )
 
     def create(self, validated_data):
         self._validate_data(validated_data.get('chf_id'))
@@ -14,10 +14,14 @@ import logging
 import requests
 import json
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 
+from api_fhir_r4.configurations import R4SubscriptionConfig
 from api_fhir_r4.converters import PatientConverter, BillInvoiceConverter, InvoiceConverter, \
     HealthFacilityOrganisationConverter
 from api_fhir_r4.mapping.invoiceMapping import InvoiceTypeMapping, BillTypeMapping
+from api_fhir_r4.paginations import invalidate_cached_counts
+from api_fhir_r4.eligibility_cache import eligibility_response_cache
 from api_fhir_r4.subscriptions.notificationManager import RestSubscriptionNotificationManager
 from api_fhir_r4.subscriptions.subscriptionCriteriaFilter import SubscriptionCriteriaFilter
 from core.service_signals import ServiceSignalBindType
@@ -36,6 +40,9 @@ def bind_service_signals():
         def on_insuree_create_or_update(**kwargs):
             model = kwargs.get('result', None)
             if model:
+                transaction.on_commit(lambda: invalidate_cached_counts(type(model)))
+                eligibility_response_cache.invalidate(
+                    insuree_id=model.id, family_id=model.family_id, chf_id=model.chf_id)
                 _resource_to_fhirr(model)
                 
         bind_service_signal(
@@ -50,14 +57,57 @@ def bind_service_signals():
             bind_type=ServiceSignalBindType.AFTER
         )
 
+        def on_insuree_delete(**kwargs):
+            args, _ = kwargs.get('data', ((), {}))
+            insuree = args[0] if args else None
+            if insuree:
+                eligibility_response_cache.invalidate(
+                    insuree_id=insuree.id, family_id=insuree.family_id, chf_id=insuree.chf_id)
+
+        bind_service_signal(
+            'insuree_service.delete',
+            on_insuree_delete,
+            bind_type=ServiceSignalBindType.AFTER
+        )
+
     def _resource_to_fhirr(imis_resource: Union[HistoryModel, VersionedModel]) -> dict:
         return PatientConverter().to_fhir_obj1(imis_resource, ReferenceConverterMixin.UUID_REFERENCE_TYPE).dict()
 
     
+    if 'policy' in imis_modules:
+        def on_policy_create_or_update(**kwargs):
+            policy = kwargs.get('result', None)
+            if policy and hasattr(policy, 'family_id'):
+                eligibility_response_cache.invalidate(family_id=policy.family_id)
+
+        for signal_name in ('policy_service.create_or_update', 'policy_service.create', 'policy_service.update'):
+            bind_service_signal(
+                signal_name,
+                on_policy_create_or_update,
+                bind_type=ServiceSignalBindType.AFTER
+            )
+
+    if 'claim' in imis_modules:
+        def on_claim_enter_or_submit(**kwargs):
+            claim = kwargs.get('result', None)
+            # Submission returns (claim, validation errors)
+            if isinstance(claim, tuple):
+                claim = claim[0] if claim else None
+            if claim and hasattr(claim, 'insuree_id'):
+                eligibility_response_cache.invalidate(insuree_id=claim.insuree_id)
+
+        for signal_name in ('claim.enter_claim', 'claim.submit_claim', 'claim.enter_and_submit_claim'):
+            bind_service_signal(
+                signal_name,
+                on_claim_enter_or_submit,
+                bind_type=ServiceSignalBindType.AFTER
+            )
+
     if 'location' in imis_modules:
         def on_hf_create_or_update(*args, **kwargs):
             model = kwargs.get('result', None)
             if model:
+                transaction.on_commit(lambda: invalidate_cached_counts(type(model)))
                 notify_subscribers(model, HealthFacilityOrganisationConverter(), 'Organisation', 'bus')
 
         bind_service_signal(
@@ -75,6 +125,7 @@ def bind_service_signals():
                 model_uuid = result['data']['uuid']
                 try:
                     model = Bill.objects.get(uuid=model_uuid)
+                    transaction.on_commit(lambda: invalidate_cached_counts(Bill))
                     notify_subscribers(model, BillInvoiceConverter(), 'Invoice',
                                        BillTypeMapping.invoice_type[model.subject_type.model])
                 except ObjectDoesNotExist:
@@ -88,6 +139,7 @@ def bind_service_signals():
                 model_uuid = result['data']['uuid']
                 try:
                     model = Invoice.objects.get(uuid=model_uuid)
+                    transaction.on_commit(lambda: invalidate_cached_counts(Invoice))
                     notify_subscribers(model, InvoiceConverter(), 'Invoice',
                                        InvoiceTypeMapping.invoice_type[model.subject_type.model])
                 except ObjectDoesNotExist:
@@ -111,7 +163,13 @@ def notify_subscribers(model, converter, resource_name, resource_type_name):
     try:
         subscriptions = SubscriptionCriteriaFilter(model, resource_name,
                                                    resource_type_name).get_filtered_subscriptions()
-        RestSubscriptionNotificationManager(converter).notify_subscribers_with_resource(model, subscriptions)
+        manager = RestSubscriptionNotificationManager(converter)
+        if R4SubscriptionConfig.get_fhir_sub_notification_outbox():
+            # Failed enqueue is rolled back to the savepoint, leaving the transaction of the request usable
+            with transaction.atomic():
+                manager.enqueue_notifications_with_resource(model, subscriptions)
+        else:
+            manager.notify_subscribers_with_resource(model, subscriptions)
     except Exception as e:
         logger.error(f'Notifying subscribers failed: {e}')
         import traceback
@@ -8,7 +8,7 @@ from dataclasses import dataclass
 
 import aiohttp
 
-from typing import Union, Dict, List, Any, TypeVar, Generic, Iterable
+from typing import Union, Dict, List, Any, TypeVar, Generic, Iterable, Tuple
 
 import orjson
 
@@ -48,6 +48,41 @@ class AbstractAsyncSubscriptionNotificationClient(
             result = await asyncio.gather(*tasks)
             return result
 
+    def send_notifications(self, notifications: List[Tuple[CLIENT_ACCEPTABLE_CONTENT_TYPE, Subscription]],
+                           concurrency: int = None) -> Iterable[NOTIFICATION_OUTPUT_TYPE]:
+        """
+        Create new asyncio event loop and call send_notifications_async.
+
+        Args:
+            notifications: Pairs of normalized content and recipient, e.g. entries of the notification outbox
+            concurrency: Maximum number of notifications being sent at the same time, unlimited if not given
+
+        Returns:
+            List of responses or errors occurred during notifying subscribers, in order of notifications
+        """
+        return asyncio.run(self.send_notifications_async(notifications, concurrency))
+
+    async def send_notifications_async(
+            self, notifications: List[Tuple[CLIENT_ACCEPTABLE_CONTENT_TYPE, Subscription]], concurrency: int = None)\
+            -> Iterable[NOTIFICATION_OUTPUT_TYPE]:
+        semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+        async with aiohttp.ClientSession() as session:
+            async def send(content, subscriber):
+                if semaphore is None:
+                    return await self._send_notification_async(content, subscriber, session)
+                async with semaphore:
+                    return await self._send_notification_async(content, subscriber, session)
+
+            return await asyncio.gather(*[send(content, sub) for content, sub in notifications])
+
+    def serialize_notification(self, notification_content: NOTIFICATION_CONTENT_TYPE) -> str:
+        """
+        Transforms content of notification to text accepted by send_notifications, e.g. to store it until
+        the notification is sent.
+        """
+        payload = self._normalize_payload(notification_content)
+        return payload.decode('utf-8') if isinstance(payload, bytes) else payload
+
     @abstractmethod
     def _normalize_payload(self, payload: NOTIFICATION_CONTENT_TYPE) -> CLIENT_ACCEPTABLE_CONTENT_TYPE:
         """
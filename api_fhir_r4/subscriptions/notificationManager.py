@@ -6,7 +6,7 @@ from django.core.validators import URLValidator
 
 import core.datetimes.ad_datetime
 from api_fhir_r4.converters import BaseFHIRConverter, ReferenceConverterMixin
-from api_fhir_r4.models import Subscription, SubscriptionNotificationResult
+from api_fhir_r4.models import Subscription, SubscriptionNotificationResult, SubscriptionNotificationOutbox
 from api_fhir_r4.subscriptions.notificationClient import RestSubscriptionNotificationClient, \
     SubscriberNotificationOutput
 from core.models import HistoryModel, VersionedModel
@@ -30,6 +30,22 @@ class RestSubscriptionNotificationManager:
         combined_result = [*result, *rejected]
         return self._handle_notification_results(combined_result)
 
+    def enqueue_notifications_with_resource(
+            self, imis_resource: Union[HistoryModel, VersionedModel], subscribers: List[Subscription])\
+            -> Iterable[SubscriptionNotificationOutbox]:
+        """
+        Stores notifications for valid subscribers in the outbox, in the current transaction. Notifications are
+        sent by SubscriptionNotificationOutboxWorker. Results of rejected subscribers are saved right away.
+        """
+        valid, rejected = self._validate_subscribers(subscribers)
+        self._handle_notification_results(rejected)
+        if not valid:
+            return []
+        payload = self.client.serialize_notification(self._resource_to_fhir(imis_resource))
+        return SubscriptionNotificationOutbox.objects.bulk_create([
+            SubscriptionNotificationOutbox(subscription=subscriber, payload=payload) for subscriber in valid
+        ])
+
     def _validate_subscribers(self, subscribers: List[Subscription]) \
             -> Tuple[List[Subscription], List[SubscriberNotificationOutput]]:
         url_validator = URLValidator()
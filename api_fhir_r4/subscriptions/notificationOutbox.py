@@ -0,0 +1,103 @@
+import datetime
+import logging
+import time
+from typing import List
+
+from django.db import transaction
+
+from api_fhir_r4.configurations import R4SubscriptionConfig
+from api_fhir_r4.models import Subscription, SubscriptionNotificationOutbox, SubscriptionNotificationResult
+from api_fhir_r4.subscriptions.notificationClient import RestSubscriptionNotificationClient, \
+    SubscriberNotificationOutput
+from core.datetimes.ad_datetime import AdDatetime
+
+logger = logging.getLogger('openIMIS')
+
+
+class SubscriptionNotificationOutboxWorker:
+    """
+    Sends notifications stored in SubscriptionNotificationOutbox. Due entries are claimed in batches, a claimed
+    entry is hidden from other workers for `lease` seconds. Entries of a batch are sent concurrently with
+    asyncio. Failed notifications are retried with exponential backoff until `max_attempts` is reached, the
+    result of every attempt is saved as SubscriptionNotificationResult.
+    """
+
+    def __init__(self, client: RestSubscriptionNotificationClient = None, batch_size: int = 100,
+                 concurrency: int = None, max_attempts: int = None, retry_delay: int = None, lease: int = 300):
+        self.client = client or RestSubscriptionNotificationClient()
+        self.batch_size = batch_size
+        self.concurrency = concurrency or R4SubscriptionConfig.get_fhir_sub_notification_concurrency()
+        self.max_attempts = max_attempts or R4SubscriptionConfig.get_fhir_sub_notification_max_attempts()
+        self.retry_delay = retry_delay if retry_delay is not None \
+            else R4SubscriptionConfig.get_fhir_sub_notification_retry_delay()
+        self.lease = lease
+
+    def run(self, poll_interval: float = 5, once: bool = False) -> int:
+        """
+        Processes due entries until stopped. If `once` is set, returns the number of processed entries when no
+        entry is due anymore.
+        """
+        processed = 0
+        while True:
+            batch_processed = self.process_batch()
+            processed += batch_processed
+            if not batch_processed:
+                if once:
+                    return processed
+                time.sleep(poll_interval)
+
+    def process_batch(self) -> int:
+        entries = self.claim_batch()
+        if not entries:
+            return 0
+        active, inactive = [], []
+        for entry in entries:
+            subscription = entry.subscription
+            is_active = subscription.status == Subscription.SubscriptionStatus.ACTIVE and not subscription.is_deleted
+            (active if is_active else inactive).append(entry)
+        if inactive:
+            # Subscription was deactivated or deleted after the notification was stored
+            SubscriptionNotificationOutbox.objects.filter(id__in=[entry.id for entry in inactive]).delete()
+
+        outputs = self.client.send_notifications(
+            [(entry.payload, entry.subscription) for entry in active], self.concurrency) if active else []
+        self.handle_outputs(active, outputs)
+        return len(entries)
+
+    def claim_batch(self) -> List[SubscriptionNotificationOutbox]:
+        now = AdDatetime.now()
+        with transaction.atomic():
+            ids = list(SubscriptionNotificationOutbox.objects.due(now)
+                       .select_for_update(skip_locked=True)
+                       .order_by('next_attempt_time')
+                       .values_list('id', flat=True)[:self.batch_size])
+            if not ids:
+                return []
+            SubscriptionNotificationOutbox.objects.filter(id__in=ids) \
+                .update(next_attempt_time=now + datetime.timedelta(seconds=self.lease))
+        return list(SubscriptionNotificationOutbox.objects.filter(id__in=ids).select_related('subscription'))
+
+    def handle_outputs(self, entries: List[SubscriptionNotificationOutbox],
+                       outputs: List[SubscriberNotificationOutput]):
+        now = AdDatetime.now()
+        results = []
+        finished = []
+        for entry, output in zip(entries, outputs):
+            results.append(SubscriptionNotificationResult(
+                subscription=entry.subscription,
+                error=str(output.reason_of_failure) if output.reason_of_failure else None,
+                notified_successfully=output.notification_success,
+                notification_time=now
+            ))
+            entry.attempts += 1
+            if output.notification_success or entry.attempts >= self.max_attempts:
+                if not output.notification_success:
+                    logger.warning(f'Notification {entry.id} for {entry.subscription} dropped after '
+                                   f'{entry.attempts} attempts')
+                finished.append(entry.id)
+            else:
+                entry.next_attempt_time = now + datetime.timedelta(
+                    seconds=self.retry_delay * 2 ** (entry.attempts - 1))
+                entry.save(update_fields=['attempts', 'next_attempt_time'])
+        SubscriptionNotificationResult.objects.bulk_create(results)
+        SubscriptionNotificationOutbox.objects.filter(id__in=finished).delete()
@@ -1,12 +1,14 @@
+import logging
 from typing import Union
 
-from django.db.models import Q
+from django.core.exceptions import FieldError
+from django.db.models import Exists, OuterRef
 
-from api_fhir_r4.configurations import R4SubscriptionConfig
-from api_fhir_r4.models import Subscription
-from core.datetimes.ad_datetime import datetime
+from api_fhir_r4.subscriptions.subscriptionIndex import active_subscription_index
 from core.models import HistoryModel, VersionedModel
 
+logger = logging.getLogger('openIMIS')
+
 
 class SubscriptionCriteriaFilter:
     def __init__(self, imis_resource: Union[HistoryModel, VersionedModel], fhir_resource_name: str,
@@ -16,32 +18,45 @@ class SubscriptionCriteriaFilter:
         self.imis_resource = imis_resource
 
     def get_filtered_subscriptions(self):
-        subscriptions = self._get_all_active_subscriptions()
-        return self._get_matching_subscriptions(subscriptions)
+        entries = self._get_all_active_subscriptions()
+        return self._get_matching_subscriptions(entries)
 
     def _get_all_active_subscriptions(self):
-        queryset = Subscription.objects.filter(status=Subscription.SubscriptionStatus.ACTIVE.value,
-                                               expiring__gt=datetime.now(), is_deleted=False)
-        if self.fhir_resource_name:
-            queryset = queryset.filter(criteria__jsoncontains={
-                R4SubscriptionConfig.get_fhir_sub_criteria_key_resource(): self.fhir_resource_name})
-        if self.fhir_resource_type_name:
-            queryset = queryset.filter(
-                ~Q(criteria__jsoncontainskey=R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type() | Q(
-                    criteria__jsoncontains={
-                        R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type(): self.fhir_resource_type_name})))
-        return queryset.all()
-
-    def _get_matching_subscriptions(self, subscriptions):
-        return [subscription for subscription in subscriptions
-                if self._is_matching_subscription(subscription)]
-
-    def _is_matching_subscription(self, sub):
-        criteria = {criteria: sub.criteria[criteria] for criteria in sub.criteria if
-                    criteria != R4SubscriptionConfig.get_fhir_sub_criteria_key_resource()
-                    and criteria != R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type()}
-        return not criteria or self._is_resource_matching_criteria(criteria)
-
-    def _is_resource_matching_criteria(self, criteria):
-        criteria['uuid'] = self.imis_resource.uuid
-        return type(self.imis_resource).objects.filter(**criteria).exists()
+        return active_subscription_index.get_entries(self.fhir_resource_name, self.fhir_resource_type_name)
+
+    def _get_matching_subscriptions(self, entries):
+        """
+        Criteria are evaluated against the resource instance, criteria which can't be evaluated in memory
+        are evaluated by a single query for all the subscriptions.
+        """
+        model = type(self.imis_resource)
+        matching = set()
+        unresolved = []
+        for entry in entries:
+            if not entry.criteria:
+                matching.add(entry)
+                continue
+            predicate = entry.get_predicate(model)
+            result = predicate.matches(self.imis_resource) if predicate is not None else None
+            if result is None:
+                unresolved.append(entry)
+            elif result:
+                matching.add(entry)
+        if unresolved:
+            matching.update(self._get_entries_matching_in_db(unresolved))
+        return [entry.subscription for entry in entries if entry in matching]
+
+    def _get_entries_matching_in_db(self, entries):
+        model = type(self.imis_resource)
+        annotations = {}
+        for index, entry in enumerate(entries):
+            try:
+                annotations[f'matches_{index}'] = Exists(
+                    model.objects.filter(uuid=OuterRef('uuid'), **entry.criteria))
+            except (FieldError, ValueError, TypeError) as e:
+                logger.error(f'Invalid criteria of subscription {entry.subscription.id}: {e}')
+        if not annotations:
+            return []
+        matches = model.objects.filter(pk=self.imis_resource.pk).annotate(**annotations) \
+            .values(*annotations.keys()).first() or {}
+        return [entry for index, entry in enumerate(entries) if matches.get(f'matches_{index}')]
@@ -0,0 +1,209 @@
+import threading
+import time
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from api_fhir_r4.configurations import R4SubscriptionConfig
+from api_fhir_r4.models import Subscription
+from core.datetimes.ad_datetime import datetime
+
+
+def _not_none(compare):
+    return lambda value, criterion: value is not None and compare(value, criterion)
+
+
+def _as_text(compare):
+    return _not_none(lambda value, criterion: compare(str(value), str(criterion)))
+
+
+def _as_lower_text(compare):
+    return _not_none(lambda value, criterion: compare(str(value).lower(), str(criterion).lower()))
+
+
+class CriteriaPredicate:
+    """
+    Subscription criteria (queryset filter keyword arguments) compiled for a model, evaluated against a model
+    instance without querying the database. Only lookups on fields of the model itself are compiled, criteria
+    spanning relations are evaluated by the database, see SubscriptionCriteriaFilter.
+    """
+    LOOKUPS = {
+        'exact': lambda value, criterion: value == criterion,
+        'iexact': _as_lower_text(lambda value, criterion: value == criterion),
+        'in': lambda value, criterion: value in criterion,
+        'gt': _not_none(lambda value, criterion: value > criterion),
+        'gte': _not_none(lambda value, criterion: value >= criterion),
+        'lt': _not_none(lambda value, criterion: value < criterion),
+        'lte': _not_none(lambda value, criterion: value <= criterion),
+        'isnull': lambda value, criterion: (value is None) == criterion,
+        'contains': _as_text(lambda value, criterion: criterion in value),
+        'icontains': _as_lower_text(lambda value, criterion: criterion in value),
+        'startswith': _as_text(lambda value, criterion: value.startswith(criterion)),
+        'istartswith': _as_lower_text(lambda value, criterion: value.startswith(criterion)),
+        'endswith': _as_text(lambda value, criterion: value.endswith(criterion)),
+        'iendswith': _as_lower_text(lambda value, criterion: value.endswith(criterion)),
+    }
+    TEXT_LOOKUPS = {'iexact', 'contains', 'icontains', 'startswith', 'istartswith', 'endswith', 'iendswith'}
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    @classmethod
+    def compile(cls, model, criteria):
+        """
+        Returns CriteriaPredicate of the criteria, None if any of them can't be evaluated in memory.
+        """
+        checks = []
+        for key, criterion in criteria.items():
+            check = cls._compile_check(model, key, criterion)
+            if check is None:
+                return None
+            checks.append(check)
+        return cls(checks)
+
+    @classmethod
+    def _compile_check(cls, model, key, criterion):
+        parts = key.split('__')
+        lookup = parts.pop() if len(parts) == 2 and parts[1] in cls.LOOKUPS else 'exact'
+        if len(parts) != 1:
+            return None
+        try:
+            field = model._meta.pk if parts[0] == 'pk' else model._meta.get_field(parts[0])
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.is_relation and not (field.many_to_one or field.one_to_one):
+            return None
+        value_field = field.target_field if field.is_relation else field
+        try:
+            if lookup == 'isnull':
+                criterion = bool(criterion)
+            elif lookup == 'in':
+                criterion = [value_field.to_python(value) for value in criterion]
+            elif lookup not in cls.TEXT_LOOKUPS:
+                criterion = value_field.to_python(criterion)
+        except (ValidationError, TypeError, ValueError):
+            return None
+        return field.attname, value_field, cls.LOOKUPS[lookup], criterion
+
+    def matches(self, instance):
+        """
+        Returns whether the instance matches the criteria, None if it can't be decided from the instance.
+        """
+        deferred_fields = instance.get_deferred_fields()
+        for attname, value_field, compare, criterion in self.checks:
+            if attname in deferred_fields:
+                return None
+            try:
+                value = value_field.to_python(getattr(instance, attname))
+                if not compare(value, criterion):
+                    return False
+            except (ValidationError, TypeError, ValueError):
+                return None
+        return True
+
+
+class SubscriptionIndexEntry:
+    def __init__(self, subscription, resource_type, criteria):
+        self.subscription = subscription
+        self.resource_type = resource_type
+        self.criteria = criteria
+        self._predicates = {}
+
+    def get_predicate(self, model):
+        if model not in self._predicates:
+            self._predicates[model] = CriteriaPredicate.compile(model, self.criteria)
+        return self._predicates[model]
+
+
+class ActiveSubscriptionIndex:
+    """
+    Process wide index of active subscriptions grouped by subscribed resource and resource type. The index is
+    rebuilt with one query after a Subscription is saved or deleted in the process, changes made by other
+    processes are picked up after `fhir_sub_index_timeout` seconds.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._built_time = 0
+        self._generation = 0
+        self._connected = False
+        self._lock = threading.Lock()
+
+    def get_entries(self, resource_name, resource_type_name):
+        """
+        Returns entries of active, not expired subscriptions of the resource. Subscriptions of all the resource
+        types are returned if resource_type_name is not given, subscriptions of all the resources if
+        resource_name is not given.
+        """
+        index = self._get_index()
+        by_resource = [index.get(resource_name, {})] if resource_name else list(index.values())
+        entries = []
+        for by_type in by_resource:
+            if resource_type_name:
+                entries.extend(by_type.get(None, []))
+                entries.extend(by_type.get(resource_type_name, []))
+            else:
+                for type_entries in by_type.values():
+                    entries.extend(type_entries)
+        now = datetime.now()
+        return [entry for entry in entries if entry.subscription.expiring > now]
+
+    def invalidate(self):
+        self._generation += 1
+        self._index = None
+
+    def _get_index(self):
+        index = self._index
+        timeout = R4SubscriptionConfig.get_fhir_sub_index_timeout()
+        if index is not None and time.monotonic() - self._built_time < timeout:
+            return index
+        self._connect_invalidation()
+        with self._lock:
+            # Index may have been rebuilt by other thread while this one was waiting for the lock
+            index = self._index
+            if index is not None and time.monotonic() - self._built_time < timeout:
+                return index
+            generation = self._generation
+            index = self._build_index()
+            # Index built while a subscription was being changed is used only once
+            if generation == self._generation:
+                self._index = index
+                self._built_time = time.monotonic()
+            return index
+
+    def _build_index(self):
+        resource_key = R4SubscriptionConfig.get_fhir_sub_criteria_key_resource()
+        resource_type_key = R4SubscriptionConfig.get_fhir_sub_criteria_key_resource_type()
+        index = {}
+        subscriptions = Subscription.objects.filter(status=Subscription.SubscriptionStatus.ACTIVE.value,
+                                                    expiring__gt=datetime.now(), is_deleted=False).order_by('id')
+        for subscription in subscriptions:
+            criteria = subscription.criteria if isinstance(subscription.criteria, dict) else {}
+            resource_name = criteria.get(resource_key)
+            resource_type = criteria.get(resource_type_key)
+            if not isinstance(resource_name, str) or not isinstance(resource_type, (str, type(None))):
+                continue
+            filter_criteria = {key: value for key, value in criteria.items()
+                               if key != resource_key and key != resource_type_key}
+            index.setdefault(resource_name, {}).setdefault(resource_type, []).append(
+                SubscriptionIndexEntry(subscription, resource_type, filter_criteria))
+        return index
+
+    def _connect_invalidation(self):
+        if self._connected:
+            return
+        with self._lock:
+            if self._connected:
+                return
+            post_save.connect(self._on_subscription_changed, sender=Subscription, weak=False)
+            post_delete.connect(self._on_subscription_changed, sender=Subscription, weak=False)
+            self._connected = True
+
+    def _on_subscription_changed(self, sender, **kwargs):
+        self.invalidate()
+        # Other threads may rebuild the index before the change is committed
+        transaction.on_commit(self.invalidate)
+
+
+active_subscription_index = ActiveSubscriptionIndex()
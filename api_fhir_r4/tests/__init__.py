@@ -12,6 +12,7 @@ from api_fhir_r4.tests.mixin.communicationRequestTestMixin import CommunicationR
 from api_fhir_r4.tests.mixin.communicationTestMixin import CommunicationTestMixin
 from api_fhir_r4.tests.mixin.genericFhirAPITestMixin import GenericFhirAPITestMixin
 from api_fhir_r4.tests.mixin.fhirApiReadTestMixin import FhirApiReadTestMixin
+from api_fhir_r4.tests.mixin.fhirApiRetrieveTestMixin import FhirApiRetrieveTestMixin
 from api_fhir_r4.tests.mixin.fhirApiCreateTestMixin import FhirApiCreateTestMixin
 from api_fhir_r4.tests.mixin.fhirApiUpdateTestMixin import FhirApiUpdateTestMixin
 from api_fhir_r4.tests.mixin.fhirApiDeleteTestMixin import FhirApiDeleteTestMixin
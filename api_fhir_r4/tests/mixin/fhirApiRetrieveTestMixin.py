@@ -0,0 +1,33 @@
+from rest_framework import status
+
+
+class FhirApiRetrieveTestMixin(object):
+
+    @property
+    def base_url(self):
+        raise NotImplementedError()
+
+    def login(self):
+        raise NotImplementedError()
+
+    def create_retrieved_resource(self):
+        # Returns identifier of the resource requested by retrieve tests
+        raise NotImplementedError()
+
+    def test_get_by_identifier_should_return_200(self):
+        self.login()
+        identifier = self.create_retrieved_resource()
+        response = self.client.get(f'{self.base_url}{identifier}/', data=None, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_by_identifier_conditional(self):
+        self.login()
+        identifier = self.create_retrieved_resource()
+        response = self.client.get(f'{self.base_url}{identifier}/', data=None, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.get('ETag')
+
+        response = self.client.get(f'{self.base_url}{identifier}/', data=None, format='json',
+                                   HTTP_IF_NONE_MATCH=etag or 'W/"unknown"')
+        # Resources without validators are always returned
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED if etag else status.HTTP_200_OK)
@@ -75,6 +75,30 @@ class TestSubscriptionNotificationClient(LogInMixin, TestCase):
             url='http://test-subscription-endpoint.io/post_uri/',
             headers=self.EXPECTED_HEADER_2, data=b'{"notification_content":"content"}')
 
+    @async_to_sync
+    @patch("api_fhir_r4.subscriptions.notificationClient.aiohttp.ClientSession.post")
+    async def test_send_notifications(self, session):
+        session.return_value.__aenter__.return_value.json = CoroutineMock(
+            return_value={'Notification': 'Thanks for notification'})
+        session.return_value.__aenter__.return_value.status = 200
+        sub_client = RestSubscriptionNotificationClient()
+        notifications = [('{"id":"1"}', self._test_subscriptions[0]), ('{"id":"2"}', self._test_subscriptions[1])]
+
+        response = await sub_client.send_notifications_async(notifications, concurrency=1)
+
+        expected = [SubscriberNotificationOutput(self._test_subscriptions[0], True, None),
+                    SubscriberNotificationOutput(self._test_subscriptions[1], True, None)]
+        self.assertListEqual(expected, list(response))
+        session.assert_any_call(
+            url='http://test-subscription-endpoint.io/post_uri/', headers=self.EXPECTED_HEADER_1, data='{"id":"1"}')
+        session.assert_any_call(
+            url='http://test-subscription-endpoint.io/post_uri/', headers=self.EXPECTED_HEADER_2, data='{"id":"2"}')
+
+    def test_serialize_notification(self):
+        sub_client = RestSubscriptionNotificationClient()
+        self.assertEqual('{"notification_content":"content"}',
+                         sub_client.serialize_notification(self.NOTIFICATION_CONTENT))
+
     def _create_test_subscriptions(self):
         _valid_subscription = [self._create_valid(self.TEST_HEADERS_1), self._create_valid(self.TEST_HEADERS_2)]
         return _valid_subscription
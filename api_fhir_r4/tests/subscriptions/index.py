@@ -0,0 +1,85 @@
+import datetime
+import threading
+import time
+from unittest import mock
+
+from django.test import TestCase
+from insuree.test_helpers import create_test_insuree
+
+from api_fhir_r4.models import Subscription
+from api_fhir_r4.subscriptions.subscriptionCriteriaFilter import SubscriptionCriteriaFilter
+from api_fhir_r4.subscriptions.subscriptionIndex import active_subscription_index, ActiveSubscriptionIndex, \
+    CriteriaPredicate
+from api_fhir_r4.tests.mixin.logInMixin import LogInMixin
+
+
+class TestActiveSubscriptionIndex(LogInMixin, TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._test_user = self.get_or_create_user_api()
+        active_subscription_index.invalidate()
+        self._patient = self._create_subscription({'resource': 'Patient'})
+        self._patient_type = self._create_subscription({'resource': 'Patient', 'resource_type': 'type'})
+        self._organisation = self._create_subscription({'resource': 'Organisation', 'resource_type': 'bus'})
+
+    def tearDown(self) -> None:
+        active_subscription_index.invalidate()
+        super().tearDown()
+
+    def test_get_entries(self):
+        self.assertCountEqual([self._patient, self._patient_type], self._get_subscriptions('Patient', None))
+        self.assertEqual([self._patient], self._get_subscriptions('Patient', 'other'))
+        self.assertEqual([self._organisation], self._get_subscriptions('Organisation', 'bus'))
+        with self.assertNumQueries(0):
+            self._get_subscriptions('Patient', 'type')
+
+    def test_invalidated_on_save(self):
+        self._get_subscriptions('Patient', None)
+        self._patient.status = Subscription.SubscriptionStatus.INACTIVE
+        self._patient.save(username=self._test_user.username)
+        self.assertEqual([self._patient_type], self._get_subscriptions('Patient', None))
+
+    def test_built_once_by_concurrent_threads(self):
+        index = ActiveSubscriptionIndex()
+        with mock.patch.object(index, '_build_index', side_effect=lambda: time.sleep(0.05) or {}) as build_index, \
+                mock.patch.object(index, '_connect_invalidation'):
+            threads = [threading.Thread(target=index.get_entries, args=('Patient', None)) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        build_index.assert_called_once()
+
+    def test_criteria_predicate(self):
+        self.assertTrue(CriteriaPredicate.compile(Subscription, {'status': '1'}).matches(self._patient))
+        self.assertTrue(CriteriaPredicate.compile(Subscription, {'endpoint__istartswith': 'HTTP'})
+                        .matches(self._patient))
+        self.assertFalse(CriteriaPredicate.compile(Subscription, {'status__in': [0]}).matches(self._patient))
+        self.assertIsNone(CriteriaPredicate.compile(Subscription, {'notifications_sent__error': 'error'}))
+
+    def test_filter_resource(self):
+        insuree = create_test_insuree()
+        matching = self._create_subscription({'resource': 'Patient', 'chf_id': insuree.chf_id})
+        self._create_subscription({'resource': 'Patient', 'chf_id': 'other'})
+        matching_in_db = self._create_subscription({'resource': 'Patient', 'family__id': insuree.family_id})
+        self._create_subscription({'resource': 'Patient', 'family__id': -1})
+        self._get_subscriptions('Patient', None)
+
+        # Relation criteria of both subscriptions are evaluated by one query
+        with self.assertNumQueries(1):
+            subscriptions = SubscriptionCriteriaFilter(insuree, 'Patient', None).get_filtered_subscriptions()
+
+        self.assertCountEqual([self._patient, self._patient_type, matching, matching_in_db], subscriptions)
+
+    def _get_subscriptions(self, resource_name, resource_type_name):
+        return [entry.subscription for entry in active_subscription_index.get_entries(resource_name,
+                                                                                      resource_type_name)]
+
+    def _create_subscription(self, criteria):
+        sub = Subscription(
+            status=1, channel=0, endpoint='http://test-subscription-endpoint.io/post_uri/', criteria=criteria,
+            headers='{}', expiring=datetime.datetime.now() + datetime.timedelta(days=10)
+        )
+        sub.save(username=self._test_user.username)
+        return sub
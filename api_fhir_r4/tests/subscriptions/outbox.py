@@ -0,0 +1,97 @@
+import datetime
+
+from asynctest import MagicMock
+from django.test import TestCase
+
+from api_fhir_r4.converters import ClaimConverter
+from api_fhir_r4.models import Subscription, SubscriptionNotificationOutbox, SubscriptionNotificationResult
+from api_fhir_r4.subscriptions.notificationClient import SubscriberNotificationOutput
+from api_fhir_r4.subscriptions.notificationManager import RestSubscriptionNotificationManager
+from api_fhir_r4.subscriptions.notificationOutbox import SubscriptionNotificationOutboxWorker
+from api_fhir_r4.tests import CommunicationTestMixin
+from api_fhir_r4.tests.mixin.logInMixin import LogInMixin
+from core.datetimes.ad_datetime import AdDatetime
+
+
+class TestSubscriptionNotificationOutbox(CommunicationTestMixin, LogInMixin, TestCase):
+    TEST_HEADERS = """{"test-header": "123"}"""
+    TEST_PAYLOAD = '{"resourceType":"Claim"}'
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._test_user = self.get_or_create_user_api()
+        self._test_subscriptions = [self._create_subscription(), self._create_subscription()]
+
+    def test_enqueue_notifications(self):
+        invalid_subscription = self._create_subscription(endpoint='not-an-url')
+        mocked_client = MagicMock()
+        mocked_client.serialize_notification.return_value = self.TEST_PAYLOAD
+        manager = RestSubscriptionNotificationManager(fhir_converter=ClaimConverter(), client=mocked_client)
+
+        manager.enqueue_notifications_with_resource(
+            self.create_test_claim(), [*self._test_subscriptions, invalid_subscription])
+
+        mocked_client.propagate_notifications.assert_not_called()
+        entries = SubscriptionNotificationOutbox.objects.all()
+        self.assertEqual({sub.id for sub in self._test_subscriptions}, {entry.subscription_id for entry in entries})
+        self.assertTrue(all(entry.payload == self.TEST_PAYLOAD for entry in entries))
+        rejected = SubscriptionNotificationResult.objects.subscriber_notifications(invalid_subscription)
+        self.assertFalse(rejected.get().notified_successfully)
+
+    def test_worker_delivers_and_retries(self):
+        success, failure = [self._create_entry(sub) for sub in self._test_subscriptions]
+        mocked_client = MagicMock()
+        mocked_client.send_notifications.side_effect = lambda notifications, concurrency: [
+            SubscriberNotificationOutput(sub, True) if sub == self._test_subscriptions[0]
+            else SubscriberNotificationOutput(sub, False, {"ServerError": "Endpoint Unavailable"})
+            for _, sub in notifications
+        ]
+
+        worker = SubscriptionNotificationOutboxWorker(client=mocked_client, concurrency=5, max_attempts=3)
+        processed = worker.run(once=True)
+
+        self.assertEqual(2, processed)
+        mocked_client.send_notifications.assert_called_once()
+        notifications, concurrency = mocked_client.send_notifications.call_args[0]
+        self.assertEqual(5, concurrency)
+        self.assertEqual([self.TEST_PAYLOAD, self.TEST_PAYLOAD], [payload for payload, _ in notifications])
+        self.assertFalse(SubscriptionNotificationOutbox.objects.filter(id=success.id).exists())
+        failure.refresh_from_db()
+        self.assertEqual(1, failure.attempts)
+        self.assertGreater(failure.next_attempt_time, AdDatetime.now())
+        self.assertEqual(2, SubscriptionNotificationResult.objects.count())
+
+    def test_worker_drops_after_max_attempts(self):
+        entry = self._create_entry(self._test_subscriptions[0])
+        mocked_client = MagicMock()
+        mocked_client.send_notifications.return_value = [
+            SubscriberNotificationOutput(self._test_subscriptions[0], False, "Timeout")]
+
+        SubscriptionNotificationOutboxWorker(client=mocked_client, max_attempts=1).run(once=True)
+
+        self.assertFalse(SubscriptionNotificationOutbox.objects.filter(id=entry.id).exists())
+        result = SubscriptionNotificationResult.objects.subscriber_notifications(self._test_subscriptions[0]).get()
+        self.assertEqual("Timeout", result.error)
+
+    def test_worker_skips_inactive_subscription(self):
+        subscription = self._test_subscriptions[0]
+        entry = self._create_entry(subscription)
+        subscription.status = Subscription.SubscriptionStatus.INACTIVE
+        subscription.save(username=self._test_user.username)
+        mocked_client = MagicMock()
+
+        SubscriptionNotificationOutboxWorker(client=mocked_client).run(once=True)
+
+        mocked_client.send_notifications.assert_not_called()
+        self.assertFalse(SubscriptionNotificationOutbox.objects.filter(id=entry.id).exists())
+
+    def _create_entry(self, subscription):
+        return SubscriptionNotificationOutbox.objects.create(subscription=subscription, payload=self.TEST_PAYLOAD)
+
+    def _create_subscription(self, endpoint='http://test-subscription-endpoint.io/post_uri/'):
+        sub = Subscription(
+            status=1, channel=0, endpoint=endpoint,
+            headers=self.TEST_HEADERS, expiring=datetime.datetime.now() + datetime.timedelta(days=10)
+        )
+        sub.save(username=self._test_user.username)
+        return sub
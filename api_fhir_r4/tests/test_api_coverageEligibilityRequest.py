@@ -0,0 +1,67 @@
+import json
+import os
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.eligibility_cache import eligibility_response_cache
+from api_fhir_r4.tests.mixin.logInMixin import LogInMixin
+from insuree.test_helpers import create_test_insuree
+
+
+class CoverageEligibilityRequestBatchAPITests(APITestCase, LogInMixin):
+    base_url = GeneralConfiguration.get_base_url() + 'CoverageEligibilityRequest/'
+    _test_json_path = "/tests/test/test_coverageEligibilityRequest.json"
+    _test_json_path_credentials = "/tests/test/test_login.json"
+
+    def setUp(self):
+        super(CoverageEligibilityRequestBatchAPITests, self).setUp()
+        dir_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        self._test_request_data = json.loads(open(dir_path + self._test_json_path).read())
+        self._test_request_data_credentials = json.loads(open(dir_path + self._test_json_path_credentials).read())
+        self.get_or_create_user_api()
+        self.insuree = create_test_insuree()
+        eligibility_response_cache.clear()
+
+    def initialize_auth(self):
+        response = self.client.post(
+            GeneralConfiguration.get_base_url() + 'login/', data=self._test_request_data_credentials, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {
+            "Content-Type": "application/json",
+            'HTTP_AUTHORIZATION': f"Bearer {response.json()['token']}"
+        }
+
+    def create_batch_bundle(self, *chf_ids):
+        entries = []
+        for chf_id in chf_ids:
+            resource = dict(self._test_request_data, patient={'reference': f'Patient/{chf_id}'})
+            entries.append({'resource': resource, 'request': {'method': 'POST', 'url': 'CoverageEligibilityRequest'}})
+        entries.append({'resource': {'resourceType': 'Patient'}})
+        return {'resourceType': 'Bundle', 'type': 'batch', 'entry': entries}
+
+    def test_post_batch_should_require_login(self):
+        response = self.client.post(self.base_url + '$batch/', data=self.create_batch_bundle(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_post_batch(self):
+        headers = self.initialize_auth()
+        bundle = self.create_batch_bundle(self.insuree.chf_id, self.insuree.chf_id)
+
+        response = self.client.post(self.base_url + '$batch/', data=bundle, format='json', **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_json = response.json()
+        self.assertEqual('batch-response', response_json['type'])
+        self.assertEqual(['200 OK', '200 OK', '400 Bad Request'],
+                         [entry['response']['status'] for entry in response_json['entry']])
+        self.assertEqual('CoverageEligibilityResponse', response_json['entry'][0]['resource']['resourceType'])
+        self.assertEqual('OperationOutcome', response_json['entry'][2]['resource']['resourceType'])
+
+    def test_post_batch_route_requires_dollar_prefix(self):
+        headers = self.initialize_auth()
+        response = self.client.post(self.base_url + 'batch/', data=self.create_batch_bundle(), format='json',
+                                    **headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -121,3 +121,17 @@ class GroupAPITests(GenericFhirAPITestMixin, FhirApiReadTestMixin, APITestCase,
 
         response_json = response.json()
         self.assertIsNotNone(response_json["issue"][0]["details"]["text"])
+
+    def test_get_list_should_return_active_members(self):
+        self.login()
+        self.create_dependencies()
+        response = self.client.post(self.base_url, data=self._test_request_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(self.base_url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        groups = [entry['resource'] for entry in response.json()['entry']]
+        self.assertEqual(1, len(groups))
+        self.assertFalse(groups[0]['active'])
+        self.assertEqual(1, groups[0]['quantity'])
+        self.assertEqual(1, len(groups[0]['member']))
@@ -2,11 +2,12 @@ from django.utils.translation import gettext as _
 from rest_framework.test import APITestCase
 from fhir.resources.insuranceplan import InsurancePlan
 from api_fhir_r4.tests import GenericFhirAPITestMixin, FhirApiCreateTestMixin, \
-    FhirApiUpdateTestMixin, FhirApiReadTestMixin
+    FhirApiUpdateTestMixin, FhirApiReadTestMixin, FhirApiRetrieveTestMixin
 from api_fhir_r4.configurations import  GeneralConfiguration
+from product.test_helpers import create_test_product
 
 
-class InsurancePlanAPITests(GenericFhirAPITestMixin, FhirApiReadTestMixin, APITestCase):
+class InsurancePlanAPITests(GenericFhirAPITestMixin, FhirApiReadTestMixin, FhirApiRetrieveTestMixin, APITestCase):
 
     base_url = GeneralConfiguration.get_base_url()+'InsurancePlan/'
     _test_json_path = "/test/test_insurance_plan.json"
@@ -16,6 +17,9 @@ class InsurancePlanAPITests(GenericFhirAPITestMixin, FhirApiReadTestMixin, APITe
     def setUp(self):
         super(InsurancePlanAPITests, self).setUp()
 
+    def create_retrieved_resource(self):
+        return create_test_product('TESTRET').uuid
+
     def verify_updated_obj(self, updated_obj):
         self.assertTrue(isinstance(updated_obj, InsurancePlan))
         max_installments_data = None
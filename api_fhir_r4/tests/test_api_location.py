@@ -2,11 +2,11 @@ from rest_framework.test import APITestCase
 
 from location.models import Location
 from fhir.resources.location import Location as FHIRLocation
-from api_fhir_r4.tests import GenericFhirAPITestMixin, FhirApiCreateTestMixin
+from api_fhir_r4.tests import GenericFhirAPITestMixin, FhirApiCreateTestMixin, FhirApiRetrieveTestMixin
 from api_fhir_r4.configurations import GeneralConfiguration
 
 
-class LocationAPITests(GenericFhirAPITestMixin, FhirApiCreateTestMixin,
+class LocationAPITests(GenericFhirAPITestMixin, FhirApiCreateTestMixin, FhirApiRetrieveTestMixin,
                        APITestCase):
 
     base_url = GeneralConfiguration.get_base_url()+'Location/'
@@ -38,6 +38,9 @@ class LocationAPITests(GenericFhirAPITestMixin, FhirApiCreateTestMixin,
         imis_location_municipality.uuid = self._TEST_MUNICIPALITY_UUID
         imis_location_municipality.save()
 
+    def create_retrieved_resource(self):
+        return self._TEST_MUNICIPALITY_UUID
+
     def verify_updated_obj(self, updated_obj):
         self.assertTrue(isinstance(updated_obj, FHIRLocation))
         self.assertEqual(self._TEST_EXPECTED_NAME, updated_obj.name)
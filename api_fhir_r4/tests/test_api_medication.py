@@ -5,11 +5,13 @@ from api_fhir_r4.configurations import R4IdentifierConfig
 from fhir.resources.medication import Medication as FHIRMedication
 from api_fhir_r4.converters import MedicationConverter
 from api_fhir_r4.tests import GenericFhirAPITestMixin, \
-    FhirApiCreateTestMixin, FhirApiUpdateTestMixin, FhirApiReadTestMixin
+    FhirApiCreateTestMixin, FhirApiUpdateTestMixin, FhirApiReadTestMixin, FhirApiRetrieveTestMixin
 from api_fhir_r4.configurations import GeneralConfiguration
+from medical.test_helpers import create_test_item
 
 
-class MedicationAPITests(GenericFhirAPITestMixin, FhirApiCreateTestMixin, FhirApiUpdateTestMixin, FhirApiReadTestMixin, APITestCase):
+class MedicationAPITests(GenericFhirAPITestMixin, FhirApiCreateTestMixin, FhirApiUpdateTestMixin, FhirApiReadTestMixin,
+                         FhirApiRetrieveTestMixin, APITestCase):
 
     base_url = GeneralConfiguration.get_base_url()+'Medication/'
     _test_json_path = "/test/test_medication.json"
@@ -18,6 +20,9 @@ class MedicationAPITests(GenericFhirAPITestMixin, FhirApiCreateTestMixin, FhirAp
     def setUp(self):
         super(MedicationAPITests, self).setUp()
 
+    def create_retrieved_resource(self):
+        return create_test_item('D').uuid
+
     def verify_updated_obj(self, updated_obj):
         self.assertTrue(isinstance(updated_obj, FHIRMedication))
         code = MedicationConverter.get_fhir_identifier_by_code(
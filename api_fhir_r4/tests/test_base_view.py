@@ -0,0 +1,37 @@
+from django.contrib.auth.models import Permission
+from django.test import TestCase
+
+from api_fhir_r4.converters import BaseFHIRConverter
+from api_fhir_r4.views.fhir.base import BaseFHIRView
+
+
+class RelatedFieldsConverter(BaseFHIRConverter):
+    select_related_fields = ('content_type',)
+
+
+class RelatedFieldsSerializer:
+    fhirConverter = RelatedFieldsConverter
+
+
+class RelatedFieldsView(BaseFHIRView):
+    serializer_class = RelatedFieldsSerializer
+
+    def get_queryset(self):
+        return Permission.objects.all()
+
+
+class RelatedFieldsSubclassView(RelatedFieldsView):
+
+    def get_queryset(self):
+        return super().get_queryset().filter(codename='test')
+
+
+class BaseFHIRViewTestCase(TestCase):
+
+    def test_get_queryset_applies_converter_related_fields(self):
+        queryset = RelatedFieldsView().get_queryset()
+        self.assertEqual({'content_type': {}}, queryset.query.select_related)
+
+    def test_get_queryset_of_subclass_applies_converter_related_fields(self):
+        queryset = RelatedFieldsSubclassView().get_queryset()
+        self.assertEqual({'content_type': {}}, queryset.query.select_related)
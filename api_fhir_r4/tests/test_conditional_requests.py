@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from django.test import TestCase
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.conditional_requests import build_resource_validators, get_not_modified_response
+from api_fhir_r4.serializers import ClaimSerializer, PatientSerializer
+from insuree.models import Insuree
+
+
+class ConditionalRequestsTestCase(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.insuree = Insuree(id=10, validity_from=datetime(2021, 5, 1, 10, 0, 0))
+
+    def _request(self, url='/Patient/10/', **headers):
+        return Request(self.factory.get(url, **headers))
+
+    def test_validators_follow_version(self):
+        etag, last_modified = build_resource_validators([self.insuree], self._request(), 'uuid')
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(build_resource_validators([self.insuree], self._request(), 'uuid')[0], etag)
+        self.assertNotEqual(build_resource_validators([self.insuree], self._request(), 'code')[0], etag)
+        self.assertNotEqual(build_resource_validators([self.insuree], self._request('/Patient/10/?_pretty=true'),
+                                                      'uuid')[0], etag)
+
+        self.insuree.validity_from = datetime(2021, 6, 1, 10, 0, 0)
+        changed_etag, changed_last_modified = build_resource_validators([self.insuree], self._request(), 'uuid')
+        self.assertNotEqual(changed_etag, etag)
+        self.assertGreater(changed_last_modified, last_modified)
+
+    def test_validators_follow_related_objects(self):
+        etag, _ = build_resource_validators([self.insuree], self._request(), generations={0: 'a'})
+        self.assertNotEqual(build_resource_validators([self.insuree], self._request(), generations={0: 'b'})[0], etag)
+
+    def test_searchset_without_last_modified(self):
+        etag, last_modified = build_resource_validators([self.insuree], self._request(), 10, searchset=True)
+        self.assertIsNotNone(etag)
+        self.assertIsNone(last_modified)
+
+    def test_serializer_validators(self):
+        request = self._request()
+        self.assertIsNotNone(PatientSerializer().get_resource_validators([], request)[0])
+        # Representation of claim depends on objects which changes aren't tracked
+        self.assertEqual(ClaimSerializer().get_resource_validators([], request), (None, None))
+
+    def test_validators_not_available_without_version(self):
+        self.insuree.validity_from = None
+        self.assertEqual(build_resource_validators([self.insuree], self._request()), (None, None))
+
+    def test_if_none_match(self):
+        etag, last_modified = build_resource_validators([self.insuree], self._request())
+        response = get_not_modified_response(self._request(HTTP_IF_NONE_MATCH=etag), etag, last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIsNone(get_not_modified_response(self._request(HTTP_IF_NONE_MATCH='W/"other"'), etag, last_modified))
+
+    def test_if_modified_since(self):
+        etag, last_modified = build_resource_validators([self.insuree], self._request())
+        response = get_not_modified_response(
+            self._request(HTTP_IF_MODIFIED_SINCE=http_date(last_modified)), etag, last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertIsNone(get_not_modified_response(
+            self._request(HTTP_IF_MODIFIED_SINCE=http_date(last_modified - 60)), etag, last_modified))
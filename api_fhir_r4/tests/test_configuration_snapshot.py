@@ -0,0 +1,74 @@
+import copy
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from api_fhir_r4.configurations import GeneralConfiguration, ModuleConfiguration
+from api_fhir_r4.configurations.configurationSnapshot import ConfigurationSnapshot
+from api_fhir_r4.defaultConfig import DEFAULT_CFG
+
+
+class ConfigurationSnapshotTestCase(TestCase):
+    _TEST_BASE_URL = 'https://example.org/fhir/'
+
+    def setUp(self):
+        cache.delete(ConfigurationSnapshot.version_cache_key)
+        ModuleConfiguration._next_refresh_check = 0
+        ModuleConfiguration.build_configuration(DEFAULT_CFG)
+
+    def tearDown(self):
+        cache.delete(ConfigurationSnapshot.version_cache_key)
+        ModuleConfiguration._next_refresh_check = 0
+        ModuleConfiguration.build_configuration(DEFAULT_CFG)
+
+    def _get_test_cfg(self):
+        cfg = copy.deepcopy(DEFAULT_CFG)
+        cfg['base_url'] = self._TEST_BASE_URL
+        return cfg
+
+    def test_snapshot_is_immutable(self):
+        snapshot = ConfigurationSnapshot.get_current()
+        with self.assertRaises(AttributeError):
+            snapshot.base_url = self._TEST_BASE_URL
+        with self.assertRaises(TypeError):
+            snapshot.gender_codes['male'] = 'X'
+        self.assertEqual(DEFAULT_CFG['base_url'], snapshot.base_url)
+
+    def test_build_configuration_replaces_snapshot(self):
+        previous = ConfigurationSnapshot.get_current()
+        ModuleConfiguration.build_configuration(self._get_test_cfg())
+
+        self.assertIsNot(previous, ConfigurationSnapshot.get_current())
+        self.assertEqual(DEFAULT_CFG['base_url'], previous.base_url)
+        self.assertEqual(self._TEST_BASE_URL, GeneralConfiguration.get_system_base_url())
+
+    @mock.patch.object(ModuleConfiguration, 'refresh_check_interval', 0)
+    def test_refresh_if_changed(self):
+        with mock.patch.object(ModuleConfiguration, 'get_module_cfg', return_value=self._get_test_cfg()):
+            ModuleConfiguration.refresh_if_changed()
+            self.assertEqual(DEFAULT_CFG['base_url'], GeneralConfiguration.get_system_base_url())
+
+            # Configuration reloaded by other process
+            cache.set(ConfigurationSnapshot.version_cache_key, 'other-version')
+            ModuleConfiguration.refresh_if_changed()
+        self.assertEqual(self._TEST_BASE_URL, GeneralConfiguration.get_system_base_url())
+        self.assertEqual('other-version', ConfigurationSnapshot.get_current().version)
+
+    @mock.patch.object(ModuleConfiguration, 'refresh_check_interval', 60)
+    def test_refresh_checked_once_per_interval(self):
+        with mock.patch.object(ConfigurationSnapshot, 'get_published_version', return_value=None) \
+                as get_published_version:
+            ModuleConfiguration.refresh_if_changed()
+            ModuleConfiguration.refresh_if_changed()
+        get_published_version.assert_called_once()
+
+    def test_snapshot_values_are_attributes(self):
+        self.assertEqual(DEFAULT_CFG['base_url'], ConfigurationSnapshot.current.base_url)
+        self.assertEqual(DEFAULT_CFG['base_url'], vars(ConfigurationSnapshot.current)['base_url'])
+
+    def test_reload_configuration_publishes_version(self):
+        with mock.patch.object(ModuleConfiguration, 'get_module_cfg', return_value=self._get_test_cfg()):
+            ModuleConfiguration.reload_configuration()
+        self.assertEqual(ConfigurationSnapshot.get_current().version,
+                         ConfigurationSnapshot.get_published_version())
@@ -1,7 +1,14 @@
 import json
 import os
+from unittest import mock
 
+from policy.services import ByInsureeRequest, ByInsureeResponse, ByInsureeService
+from policy.test_helpers import create_test_policy
+from product.test_helpers import create_test_product
+
+from api_fhir_r4.configurations import R4CoverageEligibilityConfiguration as Config
 from api_fhir_r4.converters import CoverageEligibilityRequestConverter
+from api_fhir_r4.serializers import CoverageEligibilityRequestSerializer
 from api_fhir_r4.tests import CoverageEligibilityRequestTestMixin
 from fhir.resources.coverageeligibilityresponse import CoverageEligibilityResponse
 
@@ -35,3 +42,41 @@ class CoverageEligibilityRequestConverterTestCase(CoverageEligibilityRequestTest
         dict_coverage_eligibility_response = json.loads(self._test_coverage_eligibility_response_json_representation)
         fhir_coverage_eligibility_response = CoverageEligibilityResponse(**dict_coverage_eligibility_response)
         self.verify_fhir_instance(fhir_coverage_eligibility_response)
+
+    @mock.patch.object(CoverageEligibilityRequestConverter, 'build_fhir_insurance')
+    @mock.patch.object(CoverageEligibilityRequestConverter, 'evaluate_eligibility')
+    def test_to_fhir_many_evaluates_request_once(self, evaluate_eligibility, build_fhir_insurance):
+        evaluate_eligibility.return_value = self.create_test_imis_instance()
+        item = mock.Mock(status=Config.get_fhir_active_policy_status()[0], policy_uuid=None)
+        response = ByInsureeResponse(by_insuree_request=None, items=[item])
+
+        fhir_responses = CoverageEligibilityRequestConverter.to_fhir_many(
+            [(response, self._TEST_ELIGIBILITY_REQUEST), (response, self._TEST_ELIGIBILITY_REQUEST)])
+
+        self.assertEqual(2, len(fhir_responses))
+        evaluate_eligibility.assert_called_once()
+        self.assertEqual(2, build_fhir_insurance.call_count)
+        self.assertIn(str(self._TEST_INSUREE.uuid), fhir_responses[0].patient.reference)
+
+    def test_create_bundle_reports_invalid_entries(self):
+        serializer = CoverageEligibilityRequestSerializer()
+        bundle = {'resourceType': 'Bundle', 'type': 'batch', 'entry': [{'resource': {'resourceType': 'Patient'}}]}
+
+        with mock.patch.object(serializer, 'get_audit_user_id', return_value=self._TEST_ADMIN_USER_ID):
+            response_bundle = serializer.create_bundle(bundle)
+
+        self.assertEqual('batch-response', response_bundle['type'])
+        self.assertEqual('400 Bad Request', response_bundle['entry'][0]['response']['status'])
+        self.assertEqual('OperationOutcome', response_bundle['entry'][0]['resource']['resourceType'])
+
+    def test_insurees_eligibility_responses_match_by_insuree_service(self):
+        policy = create_test_policy(create_test_product('CERP1'), self._TEST_INSUREE)
+        request = mock.Mock(user=mock.Mock(id=self._TEST_ADMIN_USER_ID))
+        serializer = CoverageEligibilityRequestSerializer(context={'request': request})
+
+        responses = serializer.get_insurees_eligibility_responses({self._TEST_CHFID, 'UNKNOWN'})
+
+        expected = ByInsureeService(request.user).request(ByInsureeRequest(chf_id=self._TEST_CHFID))
+        self.assertEqual([policy.uuid], [item.policy_uuid for item in responses[self._TEST_CHFID].items])
+        self.assertEqual(expected.items, responses[self._TEST_CHFID].items)
+        self.assertEqual([], responses['UNKNOWN'].items)
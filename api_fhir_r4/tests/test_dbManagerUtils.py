@@ -0,0 +1,52 @@
+import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import Group, Permission
+from django.db.models import Prefetch
+from django.test import TestCase
+
+from api_fhir_r4.utils import DbManagerUtils
+
+
+class DbManagerUtilsTestCase(TestCase):
+
+    def test_get_valid_related_objects_uses_prefetched(self):
+        valid = SimpleNamespace(validity_to=None)
+        historical = SimpleNamespace(validity_to=datetime.datetime(2020, 1, 1))
+        related_manager = mock.MagicMock()
+        instance = SimpleNamespace(items=related_manager,
+                                   _prefetched_objects_cache={'items': [valid, historical]})
+
+        self.assertEqual([valid], DbManagerUtils.get_valid_related_objects(instance, 'items', 'item'))
+        related_manager.filter.assert_not_called()
+
+    def test_get_valid_related_objects_without_prefetch(self):
+        valid = SimpleNamespace(validity_to=None)
+        related_manager = mock.MagicMock()
+        related_manager.filter.return_value.select_related.return_value = [valid]
+        instance = SimpleNamespace(items=related_manager)
+
+        self.assertEqual([valid], DbManagerUtils.get_valid_related_objects(instance, 'items', 'item'))
+        related_manager.filter.assert_called_once_with(validity_to=None)
+        related_manager.filter.return_value.select_related.assert_called_once_with('item')
+
+    def test_apply_related_fields(self):
+        queryset = DbManagerUtils.apply_related_fields(
+            Permission.objects.all(), select_related=('content_type', 'group', 'missing'))
+
+        self.assertEqual({'content_type': {}}, queryset.query.select_related)
+
+    def test_apply_related_fields_prefetch(self):
+        queryset = Group.objects.prefetch_related(Prefetch('permissions', queryset=Permission.objects.all()))
+        queryset = DbManagerUtils.apply_related_fields(
+            queryset, prefetch_related=('permissions', 'user_set', 'user', 'missing'))
+
+        self.assertEqual(['permissions', 'user_set'], [
+            lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+            for lookup in queryset._prefetch_related_lookups
+        ])
+
+    def test_apply_related_fields_not_queryset(self):
+        objects = [Group(name='test')]
+        self.assertIs(objects, DbManagerUtils.apply_related_fields(objects, select_related=('permissions',)))
@@ -0,0 +1,75 @@
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from fhir.resources.claim import Claim, ClaimItem
+from fhir.resources.claimresponse import ClaimResponse, ClaimResponseTotal
+from fhir.resources.codeableconcept import CodeableConcept
+from fhir.resources.coding import Coding
+from fhir.resources.coverage import Coverage, CoverageClass
+from fhir.resources.fhirprimitiveextension import FHIRPrimitiveExtension
+from fhir.resources.extension import Extension
+from fhir.resources.humanname import HumanName
+from fhir.resources.identifier import Identifier
+from fhir.resources.money import Money
+from fhir.resources.patient import Patient
+from fhir.resources.period import Period
+from fhir.resources.reference import Reference
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.dict_emitter import FHIRDictEmitter
+from api_fhir_r4.serializers import BaseFHIRSerializer
+
+
+class FHIRDictEmitterTestCase(TestCase):
+
+    def assertEmittedAsDict(self, fhir_obj):
+        emitted = FHIRDictEmitter.emit(fhir_obj)
+        self.assertEqual(fhir_obj.dict(), emitted)
+        # Key order of the rendered JSON is kept as well
+        self.assertEqual(json.dumps(fhir_obj.dict(), default=str), json.dumps(emitted, default=str))
+
+    def test_emit_patient(self):
+        identifier = Identifier.construct()
+        identifier.type = CodeableConcept.construct(coding=[Coding.construct(system='system', code='UUID')])
+        identifier.value = '0a60f36c-62eb-11ea-bb93-93ec0339a3dd'
+        patient = Patient.construct(id='1', identifier=[identifier], active=True, birthDate='1990-03-24')
+        patient.name = [HumanName.construct(family='TEST', given=['OTHER'], use='usual')]
+        patient.extension = [Extension.construct(url='is-head', valueBoolean=False)]
+        patient.birthDate__ext = FHIRPrimitiveExtension.construct(
+            extension=[Extension.construct(url='birth-time', valueDateTime='1990-03-24T10:00:00')])
+        patient.telecom = []
+
+        self.assertEmittedAsDict(patient)
+
+    def test_emit_claim(self):
+        item = ClaimItem.construct(sequence=1, quantity=None, unitPrice=Money.construct(value=Decimal('10.50')))
+        item.productOrService = CodeableConcept.construct(text='SERVICE')
+        claim = Claim.construct(id='2', status='active', use='claim', created='2021-03-27', item=[item])
+        claim.patient = Reference.construct(reference='Patient/1', type='Patient')
+        claim.contained = [Patient.construct(id='1', gender='male')]
+
+        self.assertEmittedAsDict(claim)
+
+    def test_emit_claim_response_and_coverage(self):
+        total = ClaimResponseTotal.construct(
+            category=CodeableConcept.construct(coding=[]), amount=Money.construct(value=Decimal('20')))
+        claim_response = ClaimResponse.construct(
+            id='3', status='active', outcome='complete', use='claim', created='2021-03-27', total=[total])
+        coverage = Coverage.construct(
+            id='4', status='active', order=None, period=Period.construct(start='2021-01-01', end='2021-12-31'),
+            class_fhir=[CoverageClass.construct(value='PRODUCT', name='Product')])
+
+        self.assertEmittedAsDict(claim_response)
+        self.assertEmittedAsDict(coverage)
+
+    def test_fhir_obj_to_dict_selected_per_resource(self):
+        serializer = BaseFHIRSerializer()
+        patient = Patient.construct(id='1')
+
+        with mock.patch.object(GeneralConfiguration, 'get_dict_emitter_resources', return_value=['Patient']), \
+                mock.patch.object(FHIRDictEmitter, 'emit', return_value={}) as emit:
+            serializer.fhir_obj_to_dict(patient)
+            serializer.fhir_obj_to_dict(Claim.construct(id='2'))
+        emit.assert_called_once_with(patient)
@@ -0,0 +1,79 @@
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.serializers import ValidationError
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.converters import ClaimConverter
+from api_fhir_r4.element_selection import ElementSelection
+
+
+class _TopLevelConverter:
+    pass
+
+
+class _NestedConverter:
+    pass
+
+
+class ElementSelectionTestCase(TestCase):
+    _TEST_PATIENT = {
+        'resourceType': 'Patient',
+        'id': '1',
+        'name': [{'text': 'John'}],
+        'birthDate': '2000-01-02',
+        '_birthDate': {'extension': []},
+        'photo': [{'url': 'http://localhost/photo.jpg'}],
+        'text': {'status': 'generated'},
+    }
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def _selection(self, url):
+        return ElementSelection.from_request(Request(self.factory.get(url)))
+
+    def test_no_selection(self):
+        self.assertIsNone(self._selection('/Patient/'))
+        self.assertIsNone(self._selection('/Patient/?_summary=false'))
+        self.assertIsNone(self._selection('/Patient/?_summary=count'))
+
+    def test_selection_without_request(self):
+        self.assertIsNone(ElementSelection.from_request(None))
+        self.assertEqual(ElementSelection.from_request(self.factory.get('/Patient/?_summary=true')).summary,
+                         ElementSelection.SUMMARY_TRUE)
+
+    def test_invalid_summary(self):
+        with self.assertRaises(ValidationError):
+            self._selection('/Patient/?_summary=full')
+
+    def test_elements(self):
+        pruned = self._selection('/Patient/?_elements=birthDate, name').prune(self._TEST_PATIENT)
+        self.assertEqual(set(pruned), {'resourceType', 'id', 'meta', 'name', 'birthDate', '_birthDate'})
+        self.assertEqual(pruned['meta']['tag'], [ElementSelection.subsetted_tag])
+
+    def test_summary(self):
+        pruned = self._selection('/Patient/?_summary=true').prune(self._TEST_PATIENT)
+        self.assertEqual(set(pruned), {'resourceType', 'id', 'meta', 'name', 'birthDate', '_birthDate'})
+        pruned = self._selection('/Patient/?_summary=text').prune(self._TEST_PATIENT)
+        self.assertEqual(set(pruned), {'resourceType', 'id', 'meta', 'text'})
+        pruned = self._selection('/Patient/?_summary=data').prune(self._TEST_PATIENT)
+        self.assertEqual(set(pruned), (set(self._TEST_PATIENT) | {'meta'}) - {'text'})
+
+    def test_requested_only_for_top_level_converter(self):
+        selection = self._selection('/Patient/?_elements=name')
+        self.assertTrue(ElementSelection.is_requested(_TopLevelConverter, 'Patient', 'photo'))
+        with selection.activate(_TopLevelConverter):
+            self.assertTrue(ElementSelection.is_requested(_TopLevelConverter, 'Patient', 'name'))
+            self.assertFalse(ElementSelection.is_requested(_TopLevelConverter, 'Patient', 'photo'))
+            self.assertTrue(ElementSelection.is_requested(_NestedConverter, 'Patient', 'photo'))
+        self.assertTrue(ElementSelection.is_requested(_TopLevelConverter, 'Patient', 'photo'))
+
+    def test_claim_provisions_prefetched_only_for_items(self):
+        def prefetched(url):
+            lookups = ClaimConverter.get_prefetch_related_lookups(self._selection(url))
+            return {lookup.prefetch_to for lookup in lookups}
+
+        self.assertIn('items', prefetched('/Claim/'))
+        self.assertIn('services', prefetched('/Claim/?_elements=item'))
+        self.assertNotIn('items', prefetched('/Claim/?_elements=patient'))
+        self.assertNotIn('services', prefetched('/Claim/?_summary=true'))
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from claim.models import Claim, ClaimItem
+from django.db.models.signals import post_save
+from django.test import TestCase
+from insuree.test_helpers import create_test_insuree
+from policy.models import Policy
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.eligibility_cache import EligibilityResponseCache
+
+
+class EligibilityResponseCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.cache = EligibilityResponseCache()
+        self.insuree = create_test_insuree(with_family=True)
+        self.key = (self.insuree.chf_id, 'STEST', 'ITEST', 'uuid')
+        self.response = {'resourceType': 'CoverageEligibilityResponse'}
+
+    def test_get_cached(self):
+        self.assertIsNone(self.cache.get(self.key))
+        self.cache.set(self.key, self.response, self.insuree.chf_id)
+        with self.assertNumQueries(0):
+            self.assertIs(self.response, self.cache.get(self.key))
+
+    def test_invalidated_on_insuree_save(self):
+        self.cache.set(self.key, self.response, self.insuree.chf_id)
+        self.insuree.save()
+        self.assertIsNone(self.cache.get(self.key))
+
+    def test_invalidated_on_claim_and_policy_save(self):
+        self.cache.set(self.key, self.response, self.insuree.chf_id)
+        post_save.send(sender=Claim, instance=mock.Mock(insuree_id=self.insuree.id))
+        self.assertIsNone(self.cache.get(self.key))
+
+        self.cache.set(self.key, self.response, self.insuree.chf_id)
+        post_save.send(sender=Policy, instance=mock.Mock(family_id=self.insuree.family_id))
+        self.assertIsNone(self.cache.get(self.key))
+
+    def test_other_insuree_kept(self):
+        self.cache.set(self.key, self.response, self.insuree.chf_id)
+        post_save.send(sender=Claim, instance=mock.Mock(insuree_id=self.insuree.id + 1))
+        self.assertIs(self.response, self.cache.get(self.key))
+
+    def test_set_without_timeout(self):
+        with mock.patch.object(GeneralConfiguration, 'get_eligibility_cache_timeout', return_value=0):
+            self.cache.set(self.key, self.response, self.insuree.chf_id)
+        self.assertIsNone(self.cache.get(self.key))
+
+    def test_invalidated_on_claim_item_save(self):
+        self.cache.set(self.key, self.response, self.insuree.chf_id)
+        with mock.patch.object(self.cache, 'invalidate') as invalidate, \
+                mock.patch('api_fhir_r4.eligibility_cache.Claim.objects') as claims:
+            claims.filter.return_value.values_list.return_value.first.return_value = self.insuree.id
+            post_save.send(sender=ClaimItem, instance=mock.Mock(claim_id=1))
+        invalidate.assert_called_once_with(insuree_id=self.insuree.id)
+
+    def test_least_recently_used_evicted(self):
+        other_key = (self.insuree.chf_id, 'STEST2', None, 'uuid')
+        last_key = (self.insuree.chf_id, 'STEST3', None, 'uuid')
+        with mock.patch.object(EligibilityResponseCache, 'max_entries', 2):
+            self.cache.set(self.key, self.response, self.insuree.chf_id)
+            self.cache.set(other_key, self.response, self.insuree.chf_id)
+            self.cache.get(self.key)
+            self.cache.set(last_key, self.response, self.insuree.chf_id)
+
+        self.assertIs(self.response, self.cache.get(self.key))
+        self.assertIsNone(self.cache.get(other_key))
+        self.assertIs(self.response, self.cache.get(last_key))
@@ -0,0 +1,146 @@
+import datetime
+from unittest import mock
+
+from claim.models import Claim
+from claim.test_helpers import create_test_claim, create_test_claimservice
+from django.test import TestCase
+from insuree.models import InsureePolicy
+from insuree.test_helpers import create_test_insuree
+from medical.models import Service
+from medical.test_helpers import create_test_service
+from policy.services import EligibilityRequest, EligibilityResponse
+from policy.test_helpers import create_test_policy
+from product.test_helpers import create_test_product, create_test_product_service
+
+from api_fhir_r4.configurations import R4CoverageEligibilityConfiguration as Config
+from api_fhir_r4.converters import CoverageEligibilityRequestConverter
+from api_fhir_r4.eligibility_engine import EligibilityEngine
+
+
+class EligibilityEngineLimitTestCase(TestCase):
+    _TODAY = datetime.date(2021, 6, 15)
+
+    def limit_row(self, effective_date, waiting_period=0, limit=None):
+        return {
+            'effective_date': effective_date,
+            'waiting_period_adult': waiting_period,
+            'waiting_period_child': waiting_period,
+            'limit_no_adult': limit,
+            'limit_no_child': limit,
+        }
+
+    def test_add_months(self):
+        self.assertEqual(datetime.date(2021, 4, 30), EligibilityEngine.add_months(datetime.date(2021, 1, 31), 3))
+        self.assertEqual(datetime.date(2022, 2, 28), EligibilityEngine.add_months(datetime.date(2021, 11, 30), 3))
+
+    def test_get_limit_used(self):
+        service = mock.Mock(id=1)
+        limits = {1: [self.limit_row(datetime.date(2021, 1, 1), waiting_period=2, limit=5)]}
+
+        min_date, left = EligibilityEngine.get_limit(service, limits, {1: 3}, True, self._TODAY)
+
+        self.assertEqual(datetime.date(2021, 3, 1), min_date)
+        self.assertEqual(2, left)
+
+    def test_get_limit_unlimited_and_waiting(self):
+        service = mock.Mock(id=1)
+        limits = {1: [
+            self.limit_row(datetime.date(2021, 1, 1)),
+            self.limit_row(datetime.date(2021, 6, 1), waiting_period=6, limit=1),
+        ]}
+
+        min_date, left = EligibilityEngine.get_limit(service, limits, {1: 3}, True, self._TODAY)
+
+        self.assertEqual(datetime.date(2021, 1, 1), min_date)
+        self.assertIsNone(left)
+
+    def test_get_limit_not_covered(self):
+        self.assertEqual((None, 0), EligibilityEngine.get_limit(mock.Mock(id=1), {}, {}, True, self._TODAY))
+        self.assertEqual((None, None), EligibilityEngine.get_limit(None, {}, {}, True, self._TODAY))
+
+
+class EligibilityEngineTestCase(TestCase):
+    _TEST_SERVICE_CODE = 'ENGS1'
+
+    def setUp(self):
+        self.insuree = create_test_insuree(custom_props={'dob': datetime.date(1980, 1, 1)})
+        self.product = create_test_product('ENGP1', custom_props={
+            'max_no_consultation': 2,
+            'max_amount_consultation': 500,
+        })
+        self.policy = create_test_policy(self.product, self.insuree)
+        self.service = create_test_service(Service.CATEGORY_CONSULTATION,
+                                           custom_props={'code': self._TEST_SERVICE_CODE})
+        create_test_product_service(self.product, self.service, custom_props={
+            'limit_no_adult': 3,
+            'waiting_period_adult': 0,
+        })
+        claim = create_test_claim(custom_props={
+            'insuree_id': self.insuree.id,
+            'status': Claim.STATUS_CHECKED,
+            'category': Service.CATEGORY_CONSULTATION,
+        })
+        create_test_claimservice(claim, custom_props={'service_id': self.service.id, 'qty_provided': 2})
+
+    def test_evaluate_many(self):
+        request = EligibilityRequest(chf_id=self.insuree.chf_id, service_code=self._TEST_SERVICE_CODE.lower())
+        unknown = EligibilityRequest(chf_id='UNKNOWN', service_code=self._TEST_SERVICE_CODE)
+
+        evaluations = EligibilityEngine.evaluate_many({'request': request, 'unknown': unknown})
+
+        self.assertNotIn('unknown', evaluations)
+        evaluation = evaluations['request']
+        insuree_policy = InsureePolicy.objects.get(insuree=self.insuree, policy=self.policy, validity_to=None)
+        self.assertEqual(self.product.id, evaluation.prod_id)
+        self.assertEqual(1, evaluation.total_consultations_left)
+        self.assertEqual(500, evaluation.consultation_amount_left)
+        self.assertEqual(insuree_policy.effective_date, evaluation.min_date_service)
+        self.assertEqual(1, evaluation.service_left)
+        self.assertTrue(evaluation.is_service_ok)
+        self.assertTrue(evaluation.is_item_ok)
+
+    def test_evaluate_many_query_count(self):
+        requests = {
+            index: EligibilityRequest(chf_id=self.insuree.chf_id, service_code=self._TEST_SERVICE_CODE)
+            for index in range(5)
+        }
+        # insurees, totals, services, service limits and usage
+        with self.assertNumQueries(5):
+            self.assertEqual(5, len(EligibilityEngine.evaluate_many(requests)))
+
+
+class EligibilityEngineCrossCheckTestCase(TestCase):
+
+    def setUp(self):
+        self.request = EligibilityRequest(chf_id='CHF01', service_code='S1')
+        self.requests = {('CHF01', 'S1', None): self.request}
+
+    @mock.patch.object(Config, 'get_fhir_eligibility_engine_cross_check', return_value=True)
+    @mock.patch.object(Config, 'get_fhir_eligibility_engine', return_value='orm')
+    @mock.patch.object(CoverageEligibilityRequestConverter, 'call_eligibility_procedure')
+    @mock.patch.object(EligibilityEngine, 'evaluate_many')
+    def test_differences_logged(self, evaluate_many, call_eligibility_procedure, *args):
+        engine_evaluation = EligibilityResponse(self.request, prod_id=1, service_left=2, is_service_ok=True)
+        evaluate_many.return_value = {('CHF01', 'S1', None): engine_evaluation}
+        call_eligibility_procedure.return_value = EligibilityResponse(
+            self.request, prod_id=1, service_left=1, is_service_ok=True)
+
+        with self.assertLogs('api_fhir_r4.converters.coverageEligibilityRequestConverter', 'WARNING') as logs:
+            evaluations = CoverageEligibilityRequestConverter.evaluate_eligibility_requests(self.requests)
+
+        self.assertIs(engine_evaluation, evaluations[('CHF01', 'S1', None)])
+        self.assertEqual(1, len(logs.output))
+        self.assertIn("'service_left': (1, 2)", logs.output[0])
+
+    @mock.patch.object(Config, 'get_fhir_eligibility_engine_cross_check', return_value=True)
+    @mock.patch.object(Config, 'get_fhir_eligibility_engine', return_value='stored_procedure')
+    @mock.patch.object(CoverageEligibilityRequestConverter, 'evaluate_eligibility')
+    @mock.patch.object(EligibilityEngine, 'evaluate_many')
+    def test_equal_results_not_logged(self, evaluate_many, evaluate_eligibility, *args):
+        evaluate_many.return_value = {('CHF01', 'S1', None): EligibilityResponse(self.request, prod_id=1)}
+        evaluate_eligibility.return_value = EligibilityResponse(self.request, prod_id=1)
+
+        with mock.patch('api_fhir_r4.converters.coverageEligibilityRequestConverter.logger') as logger:
+            CoverageEligibilityRequestConverter.evaluate_eligibility_requests(self.requests)
+
+        logger.warning.assert_not_called()
@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from api_fhir_r4.configurations.configurationSnapshot import ConfigurationSnapshot
+from api_fhir_r4.fragments import FragmentCache
+
+
+class FragmentCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.cache = FragmentCache()
+
+    def test_get_built_once(self):
+        builder = mock.Mock(side_effect=lambda: object())
+
+        fragment = self.cache.get(('identifier-type', 'system', 'UUID'), builder)
+
+        self.assertIs(fragment, self.cache.get(('identifier-type', 'system', 'UUID'), builder))
+        builder.assert_called_once()
+
+    def test_get_rebuilt_for_new_configuration(self):
+        builder = mock.Mock(side_effect=lambda: object())
+        first_snapshot = ConfigurationSnapshot({}, version='first')
+        second_snapshot = ConfigurationSnapshot({}, version='second')
+
+        with mock.patch.object(ConfigurationSnapshot, 'get_current', return_value=first_snapshot):
+            fragment = self.cache.get(('mapped-coding', 'code'), builder)
+        with mock.patch.object(ConfigurationSnapshot, 'get_current', return_value=second_snapshot):
+            self.assertIsNot(fragment, self.cache.get(('mapped-coding', 'code'), builder))
+        self.assertEqual(2, builder.call_count)
+
+    def test_clear(self):
+        builder = mock.Mock(side_effect=lambda: object())
+        self.cache.get(('key',), builder)
+        self.cache.clear()
+        self.cache.get(('key',), builder)
+        self.assertEqual(2, builder.call_count)
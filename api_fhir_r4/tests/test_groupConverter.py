@@ -1,4 +1,4 @@
-from api_fhir_r4.converters import GroupConverter
+from api_fhir_r4.converters import GroupConverter, ReferenceConverterMixin
 
 from fhir.resources.group import Group
 from api_fhir_r4.tests import GroupTestMixin
@@ -12,3 +12,20 @@ class GroupConverterTestCase(GroupTestMixin,
     converter = GroupConverter
     fhir_resource = Group
     json_repr = 'test/test_group.json'
+
+    def test_to_fhir_many(self):
+        imis_instance = self.create_test_imis_instance()
+        fhir_instances = self.converter.to_fhir_many([imis_instance], ReferenceConverterMixin.UUID_REFERENCE_TYPE)
+
+        self.assertEqual(1, len(fhir_instances))
+        self.verify_fhir_instance(fhir_instances[0])
+
+    def test_to_fhir_obj_uses_list_annotations(self):
+        imis_instance = self.create_test_imis_instance()
+        imis_instance.has_active_policy = True
+        imis_instance.active_member_count = 3
+
+        fhir_instance = self.converter.to_fhir_obj(imis_instance, ReferenceConverterMixin.UUID_REFERENCE_TYPE)
+
+        self.assertTrue(fhir_instance.active)
+        self.assertEqual(3, fhir_instance.quantity)
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.identity_map import IdentityMap
+
+
+class IdentityMapTestCase(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_for_request(self):
+        request = self.factory.get('/Patient/')
+        identity_map = IdentityMap.for_request(request)
+
+        self.assertIsNotNone(identity_map)
+        self.assertIs(identity_map, IdentityMap.for_request(request))
+        self.assertIsNone(IdentityMap.for_request(self.factory.post('/Patient/')))
+        self.assertIsNone(IdentityMap.for_request(None))
+
+    def test_activate_for_request_keeps_active_map(self):
+        identity_map = IdentityMap()
+        with identity_map.activate():
+            with IdentityMap.activate_for_request(self.factory.get('/Patient/')) as active:
+                self.assertIs(identity_map, active)
+        self.assertIsNone(IdentityMap.get_active())
+
+    def test_get_reference_built_once(self):
+        identity_map = IdentityMap()
+        builder = mock.Mock(return_value='reference')
+
+        self.assertEqual('reference', identity_map.get_reference(('key',), builder))
+        self.assertEqual('reference', identity_map.get_reference(('key',), builder))
+        builder.assert_called_once()
+
+    def test_get_related_object_loaded_once(self):
+        content_type = ContentType.objects.get_for_model(Permission)
+        permission_ids = Permission.objects.filter(content_type=content_type).values_list('id', flat=True)[:2]
+        first, second = [Permission.objects.get(id=permission_id) for permission_id in permission_ids]
+
+        with IdentityMap().activate():
+            with self.assertNumQueries(1):
+                first_content_type = IdentityMap.get_related_object(first, 'content_type')
+                second_content_type = IdentityMap.get_related_object(second, 'content_type')
+
+        self.assertEqual(content_type, first_content_type)
+        self.assertIs(first_content_type, second_content_type)
+
+    def test_get_related_object_without_identity_map(self):
+        permission = Permission.objects.select_related('content_type').first()
+        with self.assertNumQueries(0):
+            self.assertEqual(permission.content_type, IdentityMap.get_related_object(permission, 'content_type'))
@@ -47,3 +47,41 @@ class ContainedContentSerializerMixinTestCase(TestCase):
 
         expected_outcome = {'contained': []}
         self.assertEqual(dict(representation), expected_outcome)
+
+
+class JoinedQuerysetsTestCase(TestCase):
+
+    class _TrackedList(list):
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.slices = []
+
+        def __getitem__(self, k):
+            if isinstance(k, slice):
+                self.slices.append((k.start, k.stop))
+            return super().__getitem__(k)
+
+    def setUp(self):
+        from api_fhir_r4.multiserializer.mixins import JoinedQuerysets
+        self.first = self._TrackedList(range(0, 5))
+        self.second = self._TrackedList(range(5, 8))
+        self.third = self._TrackedList(range(8, 20))
+        self.joined = JoinedQuerysets(self.first, self.second, self.third)
+
+    def test_count(self):
+        self.assertEqual(self.joined.count(), 20)
+        self.assertEqual(len(self.joined), 20)
+
+    def test_slices_equal_to_chained_list(self):
+        expected = list(range(20))
+        for start, stop in [(0, 3), (3, 10), (5, 8), (4, 6), (7, 25), (18, 20), (25, 30), (0, None), (6, None)]:
+            self.assertEqual(self.joined[start:stop], expected[start:stop], f"slice {start}:{stop}")
+        self.assertEqual(self.joined[7], 7)
+        with self.assertRaises(IndexError):
+            self.joined[20]
+
+    def test_slice_pushed_down(self):
+        self.joined[6:10]
+        self.assertEqual(self.first.slices, [])
+        self.assertEqual(self.second.slices, [(1, 5)])
+        self.assertEqual(self.third.slices, [(0, 2)])
@@ -0,0 +1,149 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.db.models.query import QuerySet
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.serializers import ValidationError
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.paginations import FhirBundleResultsSetPagination, CachedCountQueryset, invalidate_cached_counts
+from insuree.models import Insuree
+
+
+class _TestPatientSerializer(serializers.Serializer):
+    def to_representation(self, obj):
+        return {'resourceType': 'Patient', 'id': obj.uuid, 'name': [{'text': obj.name}]}
+
+
+class FhirBundleResultsSetPaginationTestCase(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.pagination = FhirBundleResultsSetPagination()
+        self.pagination.cursor_ordering = ('validity_from', 'id')
+
+    def _request(self, url):
+        return Request(self.factory.get(url))
+
+    def test_keyset_ordering_with_tie_breaker(self):
+        ordering = self.pagination.get_keyset_ordering(Insuree.objects.order_by('validity_from'))
+        self.assertEqual(ordering, ('validity_from', 'id'))
+
+    def test_keyset_ordering_descending(self):
+        ordering = self.pagination.get_keyset_ordering(Insuree.objects.order_by('-validity_from'))
+        self.assertEqual(ordering, ('-validity_from', '-id'))
+
+    def test_keyset_ordering_not_available(self):
+        self.assertIsNone(self.pagination.get_keyset_ordering(Insuree.objects.all()))
+        self.assertIsNone(self.pagination.get_keyset_ordering(Insuree.objects.order_by('family__validity_from')))
+
+    def test_cursor_round_trip(self):
+        position = ['2021-01-01T10:00:00', 15]
+        cursor = self.pagination.encode_cursor(position)
+        decoded = self.pagination.decode_cursor(self._request(f'/Patient/?cursor={cursor}'))
+        self.assertEqual(decoded, position)
+
+    def test_cursor_tampered(self):
+        cursor = self.pagination.encode_cursor(['2021-01-01T10:00:00', 15])
+        with self.assertRaises(ValidationError):
+            self.pagination.decode_cursor(self._request(f'/Patient/?cursor={cursor[:-2]}xx'))
+
+    def test_cursor_from_different_ordering(self):
+        cursor = self.pagination.encode_cursor(['2021-01-01T10:00:00', 15])
+        self.pagination.cursor_ordering = ('date_created', 'id')
+        with self.assertRaises(ValidationError):
+            self.pagination.decode_cursor(self._request(f'/Patient/?cursor={cursor}'))
+
+    def test_next_link_carries_cursor(self):
+        self.pagination.request = self._request('/Patient/?_count=10&page-offset=3')
+        self.pagination.cursor_next_position = ['2021-01-01T10:00:00', 15]
+        next_link = self.pagination.get_next_link()
+        self.assertIn('cursor=', next_link)
+        self.assertNotIn('page-offset', next_link)
+        self.assertIsNone(self.pagination.get_previous_link())
+
+    def test_cursor_pagination_opt_in(self):
+        self.assertFalse(self.pagination.is_cursor_pagination_requested(self._request('/Patient/?_count=10')))
+        self.assertTrue(self.pagination.is_cursor_pagination_requested(self._request('/Patient/?cursor=')))
+        self.assertFalse(self.pagination.is_cursor_pagination_requested(
+            self._request('/Patient/?cursor=&page-offset=2')))
+        with patch.object(GeneralConfiguration, 'get_keyset_pagination_default', return_value=True):
+            self.assertTrue(self.pagination.is_cursor_pagination_requested(self._request('/Patient/?_count=10')))
+
+    def test_streamed_bundle_equal_to_regular_bundle(self):
+        page = [SimpleNamespace(uuid=f'uuid-{i}', name=f'name-{i}') for i in range(3)]
+        self.pagination.request = self._request('/Patient/?_count=3')
+        self.pagination.bundle_total = 10
+        self.pagination.cursor_next_position = ['2021-01-01T10:00:00', 15]
+
+        streamed = b''.join(self.pagination.stream_bundle_set(_TestPatientSerializer(page, many=True)))
+        regular = self.pagination.get_paginated_response(_TestPatientSerializer(page, many=True).data).data
+        self.assertEqual(json.loads(streamed), json.loads(json.dumps(regular)))
+
+    def test_streaming_response_opt_in(self):
+        serializer = _TestPatientSerializer([], many=True)
+        self.pagination.request = self._request('/Patient/?_count=100')
+        self.assertFalse(self.pagination.is_streaming_response(serializer))
+        with patch.object(GeneralConfiguration, 'get_bundle_streaming_min_page_size', return_value=100):
+            self.assertTrue(self.pagination.is_streaming_response(serializer))
+            self.pagination.request = self._request('/Patient/?_count=100&_pretty=true')
+            self.assertFalse(self.pagination.is_streaming_response(serializer))
+
+    def test_streamed_bundle_without_entries(self):
+        self.pagination.request = self._request('/Patient/?_count=3')
+        self.pagination.bundle_total = 0
+
+        streamed = json.loads(b''.join(self.pagination.stream_bundle_set(_TestPatientSerializer([], many=True))))
+        self.assertEqual(streamed['total'], 0)
+        self.assertNotIn('entry', streamed)
+
+    def test_trusted_bundle_equal_to_validated_bundle(self):
+        page = [SimpleNamespace(uuid=f'uuid-{i}', name=f'name-{i}') for i in range(3)]
+        data = _TestPatientSerializer(page, many=True).data
+        self.pagination.request = self._request('/Patient/?_count=3')
+        self.pagination.bundle_total = 10
+        self.pagination.cursor_next_position = ['2021-01-01T10:00:00', 15]
+
+        trusted = self.pagination.build_bundle_set(data)
+        with patch.object(GeneralConfiguration, 'get_bundle_strict_validation', return_value=True):
+            validated = self.pagination.build_bundle_set(data)
+        self.assertEqual(json.loads(json.dumps(trusted)), json.loads(json.dumps(validated)))
+        self.assertEqual(list(trusted), list(validated))
+
+    def test_summary_count(self):
+        page = [SimpleNamespace(uuid=f'uuid-{i}', name=f'name-{i}') for i in range(25)]
+        results = self.pagination.paginate_queryset(page, self._request('/Patient/?_summary=count&_count=10'))
+        self.assertEqual(results, [])
+        bundle = self.pagination.build_bundle_set(_TestPatientSerializer(results, many=True).data)
+        self.assertEqual(bundle['total'], 25)
+        self.assertNotIn('entry', bundle)
+        self.assertEqual([link['relation'] for link in bundle['link']], ['self'])
+
+    def test_total_none(self):
+        page = [SimpleNamespace(uuid=f'uuid-{i}', name=f'name-{i}') for i in range(25)]
+        results = self.pagination.paginate_queryset(page, self._request('/Patient/?_total=none&_count=10&page-offset=2'))
+        self.assertEqual(len(results), 10)
+        bundle = self.pagination.build_bundle_set(_TestPatientSerializer(results, many=True).data)
+        self.assertNotIn('total', bundle)
+        self.assertEqual([link['relation'] for link in bundle['link']], ['self', 'next', 'previous'])
+
+        results = self.pagination.paginate_queryset(page, self._request('/Patient/?_total=none&_count=10&page-offset=3'))
+        self.assertEqual(len(results), 5)
+        self.assertIsNone(self.pagination.get_next_link())
+
+    def test_total_invalid(self):
+        with self.assertRaises(ValidationError):
+            self.pagination.paginate_queryset([], self._request('/Patient/?_total=exact'))
+
+    def test_cached_count_invalidated(self):
+        with patch.object(QuerySet, 'count', return_value=5) as real_count:
+            queryset = CachedCountQueryset(Insuree.objects.filter(validity_to__isnull=True))
+            self.assertEqual(queryset.count(), 5)
+            real_count.return_value = 6
+            self.assertEqual(queryset.count(), 5)
+            invalidate_cached_counts(Insuree)
+            self.assertEqual(queryset.count(), 6)
@@ -1,5 +1,6 @@
 from unittest import mock
 
+from api_fhir_r4.configurations import GeneralConfiguration
 from api_fhir_r4.converters import PatientConverter
 
 from fhir.resources.patient import Patient
@@ -20,3 +21,14 @@ class PatientConverterTestCase(PatientTestMixin,
         mock_gender.get.return_value = self._TEST_GENDER
         super(PatientConverterTestCase, self).test_to_imis_obj()
 
+
+    def test_imis_extension_handlers(self):
+        handlers = self.converter.get_imis_extension_handlers()
+        url = f"{GeneralConfiguration.get_system_base_url()}StructureDefinition/patient-is-head"
+
+        self.assertEqual(self.converter.build_imis_is_head_extension, handlers[url])
+        self.assertIs(handlers, self.converter.get_imis_extension_handlers())
+        with mock.patch.object(GeneralConfiguration, 'get_system_base_url', return_value='https://example.org/'):
+            handlers = self.converter.get_imis_extension_handlers()
+            self.assertIn('https://example.org/StructureDefinition/patient-is-head', handlers)
+            self.assertNotIn(url, handlers)
@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.test import TestCase
+
+from api_fhir_r4.configurations import GeneralConfiguration
+from api_fhir_r4.reference_data import ReferenceDataResolver
+
+
+class ReferenceDataResolverTestCase(TestCase):
+
+    def setUp(self):
+        self.resolver = ReferenceDataResolver()
+        self.group = Group.objects.create(name='reference-data-test')
+
+    def test_get_cached(self):
+        self.assertEqual(self.group, self.resolver.get(Group, id=self.group.id))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.group, self.resolver.get(Group, id=str(self.group.id)))
+
+    def test_get_returns_copies(self):
+        cached = self.resolver.get(Group, id=self.group.id)
+        cached.name = 'changed'
+        self.assertEqual('reference-data-test', self.resolver.get(Group, id=self.group.id).name)
+
+    def test_least_recently_used_evicted(self):
+        other = Group.objects.create(name='reference-data-other')
+        with mock.patch.object(ReferenceDataResolver, 'max_entries', 1):
+            self.resolver.get(Group, id=self.group.id)
+            self.resolver.get(Group, id=other.id)
+            with self.assertNumQueries(1):
+                self.resolver.get(Group, id=self.group.id)
+
+    def test_get_invalidated_on_save(self):
+        self.resolver.get(Group, name='reference-data-test')
+        self.group.save()
+        with self.assertNumQueries(1):
+            self.resolver.get(Group, name='reference-data-test')
+
+    def test_get_raises_does_not_exist(self):
+        with self.assertRaises(Group.DoesNotExist):
+            self.resolver.get(Group, name='missing')
+
+    def test_get_without_timeout(self):
+        with mock.patch.object(GeneralConfiguration, 'get_reference_data_cache_timeout', return_value=0):
+            self.resolver.get(Group, id=self.group.id)
+            with self.assertNumQueries(1):
+                self.resolver.get(Group, id=self.group.id)
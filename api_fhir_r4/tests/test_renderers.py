@@ -0,0 +1,54 @@
+import decimal
+import json
+import uuid
+from datetime import date, datetime
+
+from django.test import TestCase
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_fhir_r4.renderers import FHIRJSONRenderer, FHIRApplicationJSONRenderer, FHIRContentNegotiation
+
+
+class FHIRJSONRendererTestCase(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.renderers = [FHIRJSONRenderer(), FHIRApplicationJSONRenderer()]
+
+    def _request(self, url, **headers):
+        return Request(self.factory.get(url, **headers))
+
+    def test_render_non_native_types(self):
+        uid = uuid.uuid4()
+        data = {'id': uid, 'amount': decimal.Decimal('10.50'), 'birthDate': date(2000, 1, 2),
+                'issued': datetime(2021, 1, 1, 10, 0, 0)}
+        rendered = json.loads(FHIRJSONRenderer().render(data))
+        self.assertEqual(rendered, {'id': str(uid), 'amount': 10.5, 'birthDate': '2000-01-02',
+                                    'issued': '2021-01-01T10:00:00'})
+
+    def test_render_pretty(self):
+        data = {'resourceType': 'Patient', 'id': '1'}
+        renderer = FHIRJSONRenderer()
+        compact = renderer.render(data, renderer_context={'request': self._request('/Patient/')})
+        pretty = renderer.render(data, renderer_context={'request': self._request('/Patient/?_pretty=true')})
+        self.assertNotIn(b'\n', compact)
+        self.assertIn(b'\n  "id"', pretty)
+        self.assertEqual(json.loads(compact), json.loads(pretty))
+
+    def test_format_parameter_takes_precedence(self):
+        request = self._request('/Patient/?_format=application/fhir json', HTTP_ACCEPT='application/json')
+        renderer, media_type = FHIRContentNegotiation().select_renderer(request, self.renderers)
+        self.assertIsInstance(renderer, FHIRJSONRenderer)
+        self.assertEqual(media_type, 'application/fhir+json')
+
+    def test_accept_header(self):
+        request = self._request('/Patient/', HTTP_ACCEPT='application/json')
+        renderer, media_type = FHIRContentNegotiation().select_renderer(request, self.renderers)
+        self.assertEqual(media_type, 'application/json')
+
+    def test_unsupported_format(self):
+        request = self._request('/Patient/?_format=xml')
+        with self.assertRaises(NotAcceptable):
+            FHIRContentNegotiation().select_renderer(request, self.renderers)
@@ -0,0 +1,143 @@
+import uuid
+from datetime import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from fhir.resources.patient import Patient
+
+from api_fhir_r4.converters import BaseFHIRConverter
+from api_fhir_r4.resource_cache import RenderedResourceCache, LRUCache
+from api_fhir_r4.serializers import BaseFHIRSerializer
+from insuree.models import Family, Insuree
+from insuree.test_helpers import create_test_insuree
+
+
+class _TestConverter(BaseFHIRConverter):
+    calls = 0
+    many_calls = []
+
+    @classmethod
+    def to_fhir_many(cls, objects, reference_type):
+        cls.many_calls.append(len(objects))
+        return super().to_fhir_many(objects, reference_type)
+
+    @classmethod
+    def to_fhir_obj(cls, obj, reference_type):
+        cls.calls += 1
+        return Patient.construct(id=str(obj.uuid), birthDate='2000-01-02')
+
+
+class _TestPatientSerializer(BaseFHIRSerializer):
+    fhirConverter = _TestConverter()
+    cache_resources = True
+
+
+class _TestChunkedPatientSerializer(BaseFHIRSerializer):
+    fhirConverter = _TestConverter()
+    conversion_chunk_size = 2
+
+
+class RenderedResourceCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.resource_cache = RenderedResourceCache()
+        self.insurees = [
+            Insuree(id=i, uuid=str(uuid.uuid4()), validity_from=datetime(2021, 5, 1, 10, 0, 0)) for i in range(3)]
+        self.variant = ('PatientConverter', 'uuid')
+
+    def _cache_all(self):
+        cached, entry_keys = self.resource_cache.get_many(self.insurees, self.variant)
+        self.assertEqual(cached, {})
+        self.resource_cache.set_many({idx: {'id': obj.uuid} for idx, obj in enumerate(self.insurees)}, entry_keys)
+
+    def test_cached_entries(self):
+        self._cache_all()
+        cached, _ = self.resource_cache.get_many(self.insurees, self.variant)
+        self.assertEqual(cached, {idx: {'id': obj.uuid} for idx, obj in enumerate(self.insurees)})
+
+        # Entries are available in other processes through Django cache
+        cached, _ = RenderedResourceCache().get_many(self.insurees, self.variant)
+        self.assertEqual(len(cached), 3)
+
+    def test_different_variant(self):
+        self._cache_all()
+        cached, _ = self.resource_cache.get_many(self.insurees, ('PatientConverter', 'code'))
+        self.assertEqual(cached, {})
+
+    def test_new_version(self):
+        self._cache_all()
+        self.insurees[1].validity_from = datetime(2021, 6, 1, 10, 0, 0)
+        cached, _ = self.resource_cache.get_many(self.insurees, self.variant)
+        self.assertEqual(set(cached), {0, 2})
+
+    def test_invalidate(self):
+        self._cache_all()
+        RenderedResourceCache().invalidate(self.insurees[0])
+        cached, _ = self.resource_cache.get_many(self.insurees, self.variant)
+        self.assertEqual(set(cached), {1, 2})
+
+    def test_saved_objects_invalidated(self):
+        insuree = create_test_insuree(with_family=True)
+        dependencies = ('family',)
+
+        def cache_insuree():
+            cached, entry_keys = self.resource_cache.get_many([insuree], self.variant, dependencies)
+            self.resource_cache.set_many({0: {'id': insuree.uuid}}, entry_keys)
+            return cached
+
+        cache_insuree()
+        self.assertEqual(len(cache_insuree()), 1)
+        # Change of related object the representation depends on
+        insuree.family.save()
+        self.assertEqual(cache_insuree(), {})
+        self.assertEqual(len(cache_insuree()), 1)
+        insuree.save()
+        self.assertEqual(cache_insuree(), {})
+
+    def test_serializer_models_invalidated_before_reads(self):
+        insuree = create_test_insuree(with_family=True)
+        reading_cache = RenderedResourceCache()
+        cached, entry_keys = reading_cache.get_many([insuree], self.variant, ('family',))
+        reading_cache.set_many({0: {'id': insuree.uuid}}, entry_keys)
+
+        # Other process connected at startup which hasn't read any representation
+        with mock.patch.object(_TestPatientSerializer, 'resource_cache_model', Insuree), \
+                mock.patch.object(_TestPatientSerializer, 'resource_cache_dependencies', ('family',)):
+            self.resource_cache.connect_serializers([_TestPatientSerializer, _TestChunkedPatientSerializer])
+        self.assertEqual({Insuree, Family}, self.resource_cache._connected_models)
+        insuree.family.save()
+
+        self.assertEqual(RenderedResourceCache().get_many([insuree], self.variant, ('family',))[0], {})
+
+    def test_serializer_converts_only_misses(self):
+        _TestConverter.calls = 0
+        _TestConverter.many_calls = []
+        first = _TestPatientSerializer(self.insurees[:2], many=True).data
+        self.assertEqual(_TestConverter.calls, 2)
+        second = _TestPatientSerializer(self.insurees, many=True).data
+        self.assertEqual(_TestConverter.calls, 3)
+        # Missing objects of the list are converted together
+        self.assertEqual(_TestConverter.many_calls, [2, 1])
+        self.assertEqual(second[:2], first)
+        self.assertEqual(_TestPatientSerializer(self.insurees[2]).data['id'], self.insurees[2].uuid)
+        self.assertEqual(_TestConverter.calls, 3)
+
+    def test_list_converted_in_chunks(self):
+        _TestConverter.many_calls = []
+        entries = _TestChunkedPatientSerializer(self.insurees, many=True).iter_representation(self.insurees)
+
+        self.assertEqual(next(entries)['id'], self.insurees[0].uuid)
+        # Entries of the first chunk are yielded before the next chunk is converted
+        self.assertEqual(_TestConverter.many_calls, [2])
+        self.assertEqual(len(list(entries)), 2)
+        self.assertEqual(_TestConverter.many_calls, [2, 1])
+
+    def test_lru_size(self):
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
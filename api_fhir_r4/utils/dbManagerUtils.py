@@ -1,4 +1,9 @@
+from functools import lru_cache
+
 from django.core.exceptions import MultipleObjectsReturned
+from django.db.models import Prefetch, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields.reverse_related import ForeignObjectRel
 from django.http import Http404
 from django.shortcuts import get_object_or_404, get_list_or_404
 
@@ -16,3 +21,68 @@ class DbManagerUtils(object):
         except Http404:
             result = None
         return result
+
+    @classmethod
+    def get_valid_related_objects(cls, instance, related_name, *select_related):
+        """
+        Returns related objects which are not historical (validity_to is null). Objects prefetched with
+        prefetch_related(related_name) are used if available, otherwise they are queried together with
+        `select_related` relations.
+        """
+        prefetched = getattr(instance, '_prefetched_objects_cache', {})
+        if related_name in prefetched:
+            return [obj for obj in prefetched[related_name] if obj.validity_to is None]
+        return list(getattr(instance, related_name).filter(validity_to=None).select_related(*select_related))
+
+    @classmethod
+    def apply_related_fields(cls, queryset, select_related=(), prefetch_related=()):
+        """
+        Adds select_related() and prefetch_related() lookups to queryset. Lookups which don't match relations of
+        the queryset model and lookups already prefetched by the queryset are skipped.
+        """
+        if not isinstance(queryset, QuerySet) or queryset.query.is_sliced:
+            return queryset
+        model = queryset.model
+
+        select_related = [path for path in select_related if _is_relation_path(model, path, True)]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        prefetched = {cls._get_prefetch_to(lookup) for lookup in queryset._prefetch_related_lookups}
+        prefetch_related = [
+            lookup for lookup in prefetch_related
+            if cls._get_prefetch_to(lookup) not in prefetched
+            and _is_relation_path(model, cls._get_prefetch_through(lookup), False)
+        ]
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    @classmethod
+    def _get_prefetch_to(cls, lookup):
+        return lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+
+    @classmethod
+    def _get_prefetch_through(cls, lookup):
+        return lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+
+
+@lru_cache(maxsize=None)
+def _is_relation_path(model, path, single_valued):
+    for field_name in path.split(LOOKUP_SEP):
+        field = _get_relation_field(model, field_name)
+        if field is None:
+            return False
+        if single_valued and not (field.many_to_one or field.one_to_one):
+            return False
+        model = field.related_model
+    return True
+
+
+def _get_relation_field(model, name):
+    # Reverse relations are traversed by accessor name (e.g. `user_set`), not by query name
+    for field in model._meta.get_fields():
+        accessor = field.get_accessor_name() if isinstance(field, ForeignObjectRel) else field.name
+        if accessor == name:
+            return field if field.is_relation and field.related_model is not None else None
+    return None
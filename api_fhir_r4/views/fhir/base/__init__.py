@@ -1,16 +1,82 @@
+from functools import wraps
+
 from rest_framework.views import APIView
 
+from api_fhir_r4.conditional_requests import get_not_modified_response, set_validator_headers
+from api_fhir_r4.configurations import ModuleConfiguration
+from api_fhir_r4.element_selection import ElementSelection
 from api_fhir_r4.multiserializer import MultiSerializerSerializerClass
 from api_fhir_r4.paginations import FhirBundleResultsSetPagination
 from api_fhir_r4.permissions import FHIRApiPermissions
+from api_fhir_r4.renderers import FHIRJSONRenderer, FHIRApplicationJSONRenderer, FHIRContentNegotiation
 from api_fhir_r4.views import CsrfExemptSessionAuthentication
 
 
 class BaseFHIRView(APIView):
     pagination_class = FhirBundleResultsSetPagination
     permission_classes = (FHIRApiPermissions,)
+    renderer_classes = (FHIRJSONRenderer, FHIRApplicationJSONRenderer)
+    content_negotiation_class = FHIRContentNegotiation
     authentication_classes = [CsrfExemptSessionAuthentication] + APIView.settings.DEFAULT_AUTHENTICATION_CLASSES
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Querysets returned by views load relations used by the converter, see get_fhir_converter()
+        if 'get_queryset' in cls.__dict__:
+            cls.get_queryset = _with_converter_related_fields(cls.__dict__['get_queryset'])
+
+    def initial(self, request, *args, **kwargs):
+        # Configuration changed by other process is picked up before the request is handled
+        ModuleConfiguration.refresh_if_changed()
+        super().initial(request, *args, **kwargs)
+
+    def get_fhir_converter(self):
+        """
+        Converter of objects returned by get_queryset(), its select_related_fields and prefetch_related_fields
+        are applied to the queryset.
+        """
+        return getattr(getattr(self, 'serializer_class', None), 'fhirConverter', None)
+
+    def get_paginated_bundle_response(self, serializer):
+        """
+        Equivalent of get_paginated_response(serializer.data), serializer data is evaluated by paginator
+        which allows streaming of large search Bundles. Conditional requests are answered with 304 Not Modified
+        before any resource of the page is converted. Validators are sent only for serializers with
+        `cache_resources`, multi-serializer views and views using ListModelMixin.list() don't send them.
+        """
+        # Request is required by serializers to determine requested elements
+        serializer.context.setdefault('request', self.request)
+        etag, last_modified = serializer.child.get_resource_validators(
+            serializer.instance or [], self.request, self.paginator.get_bundle_total(), searchset=True)
+        not_modified = get_not_modified_response(self.request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = self.paginator.get_serializer_paginated_response(serializer)
+        return set_validator_headers(response, etag, last_modified)
+
 
 class BaseMultiserializerFHIRView(BaseFHIRView):
     serializer_class = MultiSerializerSerializerClass
+
+    def get_fhir_converter(self):
+        # Querysets of multi-serializer views are bound to serializers, see get_eligible_serializers_iterator()
+        return None
+
+    def get_eligible_serializers_iterator(self):
+        for serializer, (queryset, eligibility_validator, permission_classes) \
+                in super().get_eligible_serializers_iterator():
+            converter = getattr(serializer, 'fhirConverter', None)
+            if hasattr(converter, 'apply_related_fields'):
+                queryset = converter.apply_related_fields(queryset, ElementSelection.from_request(self.request))
+            yield serializer, (queryset, eligibility_validator, permission_classes)
+
+
+def _with_converter_related_fields(get_queryset):
+    @wraps(get_queryset)
+    def wrapper(self, *args, **kwargs):
+        queryset = get_queryset(self, *args, **kwargs)
+        converter = self.get_fhir_converter()
+        if hasattr(converter, 'apply_related_fields'):
+            queryset = converter.apply_related_fields(queryset, ElementSelection.from_request(self.request))
+        return queryset
+    return wrapper
@@ -1,6 +1,5 @@
 import datetime
 
-from django.db.models import Prefetch
 from rest_framework import mixins
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
@@ -12,8 +11,8 @@ from api_fhir_r4.permissions import FHIRApiClaimPermissions
 from api_fhir_r4.serializers import ClaimSerializer
 from api_fhir_r4.views.fhir.base import BaseFHIRView
 from api_fhir_r4.views.filters import ValidityFromRequestParameterFilter
-from claim.models import Claim, ClaimItem, ClaimService
-from insuree.models import Insuree, InsureePolicy
+from claim.models import Claim
+from insuree.models import Insuree
 
 
 class ClaimViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, mixins.ListModelMixin,
@@ -45,7 +44,7 @@ class ClaimViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, mixins.ListModel
                 queryset = queryset.filter(insuree=for_patient)
 
         serializer = ClaimSerializer(self.paginate_queryset(queryset), many=True, context={'contained': contained})
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_bundle_response(serializer)
 
     def retrieve(self, request, *args, **kwargs):
         contained = bool(request.GET.get("contained"))
@@ -54,17 +53,5 @@ class ClaimViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, mixins.ListModel
         return Response(serializer.data)
 
     def get_queryset(self):
-        queryset = Claim.get_queryset(None, self.request.user).order_by('validity_from') \
-            .select_related('insuree') \
-            .select_related('health_facility') \
-            .select_related('icd') \
-            .select_related('icd_1') \
-            .select_related('icd_2') \
-            .select_related('icd_3') \
-            .select_related('icd_4') \
-            .prefetch_related(Prefetch('items', queryset=ClaimItem.objects.filter(validity_to__isnull=True))) \
-            .prefetch_related(Prefetch('services', queryset=ClaimService.objects.filter(validity_to__isnull=True))) \
-            .prefetch_related(Prefetch('insuree__insuree_policies',
-                                       queryset=InsureePolicy.objects.filter(validity_to__isnull=True).select_related(
-                                           "policy")))
+        queryset = Claim.get_queryset(None, self.request.user).order_by('validity_from')
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
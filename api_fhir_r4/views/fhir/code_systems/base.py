@@ -0,0 +1,18 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from api_fhir_r4.renderers import FHIRJSONRenderer, FHIRApplicationJSONRenderer, FHIRContentNegotiation
+from api_fhir_r4.serializers import CodeSystemSerializer
+from api_fhir_r4.views import CsrfExemptSessionAuthentication
+
+
+class BaseCodeSystemViewSet(viewsets.ViewSet):
+    """
+    Base of views listing a code table as CodeSystem, rendered and negotiated the same way as BaseFHIRView.
+    """
+    serializer_class = CodeSystemSerializer
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = [CsrfExemptSessionAuthentication] + APIView.settings.DEFAULT_AUTHENTICATION_CLASSES
+    renderer_classes = (FHIRJSONRenderer, FHIRApplicationJSONRenderer)
+    content_negotiation_class = FHIRContentNegotiation
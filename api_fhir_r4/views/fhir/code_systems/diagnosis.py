@@ -1,21 +1,13 @@
 from api_fhir_r4.serializers import CodeSystemSerializer
+from api_fhir_r4.views.fhir.code_systems.base import BaseCodeSystemViewSet
 
-from rest_framework import viewsets
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
 from api_fhir_r4.permissions import FHIRApiClaimPermissions
 
-from rest_framework.views import APIView
-from api_fhir_r4.views import CsrfExemptSessionAuthentication
 from django.core.exceptions import PermissionDenied
 
 
-class CodeSystemOpenIMISDiagnosisViewSet(viewsets.ViewSet):
-
-    serializer_class = CodeSystemSerializer
-    permission_classes = (IsAuthenticated,)
-    authentication_classes = [CsrfExemptSessionAuthentication] + APIView.settings.DEFAULT_AUTHENTICATION_CLASSES
-
+class CodeSystemOpenIMISDiagnosisViewSet(BaseCodeSystemViewSet):
     def list(self, request, *args, **kwargs):
         # we don't use typical instance, we only indicate the model and the field to be mapped into CodeSystem
         if not request.user.has_perms(FHIRApiClaimPermissions.permissions_get):
@@ -1,4 +1,6 @@
 from rest_framework import mixins
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from api_fhir_r4.permissions import FHIRApiCoverageEligibilityRequestPermissions
@@ -16,3 +18,12 @@ class CoverageEligibilityRequestViewSet(BaseFHIRView, mixins.CreateModelMixin, G
     def get_queryset(self):
         queryset = Insuree.get_queryset(None, self.request.user)
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
+
+    @action(detail=False, methods=['post'], url_path=r'\$batch', url_name='batch')
+    def batch(self, request, *args, **kwargs):
+        """
+        Evaluates many CoverageEligibilityRequests sent in one `batch` Bundle, e.g. a queue of patients
+        checked at a facility front desk.
+        """
+        serializer = self.get_serializer()
+        return Response(serializer.create_bundle(request.data))
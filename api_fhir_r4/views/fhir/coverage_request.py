@@ -42,7 +42,7 @@ class CoverageRequestQuerySet(BaseFHIRView, mixins.RetrieveModelMixin, mixins.Li
                 queryset = queryset.filter(validity_from__lt=datevar)
 
         serializer = CoverageSerializer(self.paginate_queryset(queryset), many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_bundle_response(serializer)
 
     def get_queryset(self):
         queryset = Policy.get_queryset(None, self.request.user)
@@ -1,3 +1,5 @@
+from django.db.models import Count, Exists, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets
 
 from api_fhir_r4.mixins import MultiIdentifierRetrieverMixin, MultiIdentifierUpdateMixin
@@ -6,7 +8,8 @@ from api_fhir_r4.permissions import FHIRApiGroupPermissions
 from api_fhir_r4.serializers import GroupSerializer
 from api_fhir_r4.views.fhir.base import BaseFHIRView
 from api_fhir_r4.views.filters import ValidityFromRequestParameterFilter
-from insuree.models import Family
+from insuree.models import Family, Insuree, InsureePolicy
+from policy.models import Policy
 
 
 class GroupViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
@@ -22,8 +25,9 @@ class GroupViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
             return self.retrieve(request, *args, **{**kwargs, 'identifier': identifier})
         else:
             queryset = queryset.filter(validity_to__isnull=True)
+        queryset = self._with_family_aggregates(queryset)
         serializer = GroupSerializer(self.paginate_queryset(queryset), many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_bundle_response(serializer)
 
     def retrieve(self, *args, **kwargs):
         response = super().retrieve(self, *args, **kwargs)
@@ -32,3 +36,22 @@ class GroupViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
     def get_queryset(self):
         queryset = Family.objects.all().order_by('validity_from')
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
+
+    def _with_family_aggregates(self, queryset):
+        # Values used by GroupConverter for `active`, `quantity` and `member`, loaded with the page
+        active_policies = InsureePolicy.objects.filter(
+            insuree__family_id=OuterRef('pk'),
+            policy__status=Policy.STATUS_ACTIVE,
+            validity_to__isnull=True,
+        )
+        member_count = Insuree.objects \
+            .filter(family_id=OuterRef('pk'), validity_to__isnull=True) \
+            .order_by() \
+            .values('family_id') \
+            .annotate(count=Count('id')) \
+            .values('count')
+        active_members = Insuree.objects.filter(validity_to__isnull=True).order_by('id')
+        return queryset \
+            .annotate(has_active_policy=Exists(active_policies),
+                      active_member_count=Coalesce(Subquery(member_count, output_field=IntegerField()), 0)) \
+            .prefetch_related(Prefetch('members', queryset=active_members, to_attr='active_members'))
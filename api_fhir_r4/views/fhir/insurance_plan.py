@@ -22,7 +22,7 @@ class ProductViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin, viewsets.ReadO
         else:
             queryset = queryset.filter(validity_to__isnull=True)
         serializer = InsurancePlanSerializer(self.paginate_queryset(queryset), many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_bundle_response(serializer)
 
     def retrieve(self, *args, **kwargs):
         response = super().retrieve(self, *args, **kwargs)
@@ -5,6 +5,7 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 
 from api_fhir_r4.converters import OperationOutcomeConverter
+from api_fhir_r4.element_selection import ElementSelection
 from api_fhir_r4.mixins import MultiIdentifierRetrieverMixin, MultiIdentifierUpdateMixin
 from api_fhir_r4.model_retrievers import UUIDIdentifierModelRetriever, CHFIdentifierModelRetriever
 from api_fhir_r4.permissions import FHIRApiInsureePermissions
@@ -53,12 +54,11 @@ class InsureeViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
                     .filter(has_claim_in_range=True)
 
         serializer = PatientSerializer(self.paginate_queryset(queryset), many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_bundle_response(serializer)
 
     def get_queryset(self):
-        queryset = Insuree.get_queryset(None, self.request.user) \
-            .select_related('gender') \
-            .select_related('photo') \
-            .select_related('family__location')
+        queryset = Insuree.get_queryset(None, self.request.user)
+        if ElementSelection.includes_element(ElementSelection.from_request(self.request), 'Patient', 'photo'):
+            queryset = queryset.select_related('photo')
 
         return ValidityFromRequestParameterFilter(self.request).filter_queryset(queryset)
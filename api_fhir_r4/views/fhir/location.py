@@ -18,17 +18,18 @@ class LocationViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
     def list(self, request, *args, **kwargs):
         identifier = request.GET.get("identifier")
         physical_type = request.GET.get('physicalType')
+        if physical_type and physical_type == 'si':
+            self.serializer_class = LocationSiteSerializer
         queryset = self.get_queryset(physical_type)
         if identifier:
             return self.retrieve(request, *args, **{**kwargs, 'identifier': identifier})
         else:
             queryset = queryset.filter(validity_to__isnull=True).order_by('validity_from')
         if physical_type and physical_type == 'si':
-            self.serializer_class = LocationSiteSerializer
             serializer = LocationSiteSerializer(self.paginate_queryset(queryset), many=True)
         else:
             serializer = LocationSerializer(self.paginate_queryset(queryset), many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_bundle_response(serializer)
 
     def retrieve(self, *args, **kwargs):
         physical_type = self.request.GET.get('physicalType')
@@ -3,7 +3,6 @@ from collections import defaultdict, OrderedDict
 from datetime import datetime as py_datetime
 from django.db.models import Q
 from django.http import Http404
-from itertools import chain
 from rest_framework.request import Request
 from rest_framework.response import Response
 
@@ -118,7 +117,7 @@ class OrganisationViewSet(BaseMultiserializerFHIRView,
                     filtered_querysets[ModuleConfiguration, InsuranceOrganizationSerializer] = \
                         self._get_insurance_organisations_as_list()
 
-        page = self.paginate_queryset(list(chain(*filtered_querysets.values())))
+        page = self.paginate_queryset(self._join_querysets([*filtered_querysets.values()]))
         data = self.__dispatch_page_data(page)
         serialized_data = self._serialize_dispatched_data(data, dict(filtered_querysets.keys()))
         data = self.get_paginated_response(serialized_data)
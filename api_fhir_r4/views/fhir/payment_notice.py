@@ -29,7 +29,7 @@ class PaymentNoticeViewSet(BaseFHIRView, MultiIdentifierRetrieverMixin,
         else:
             queryset = queryset.filter(is_deleted=False)
         serializer = PaymentNoticeSerializer(self.paginate_queryset(queryset), many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_bundle_response(serializer)
 
     def retrieve(self, *args, **kwargs):
         response = super().retrieve(self, *args, **kwargs)